@@ -8,6 +8,7 @@ from app.settings import Settings
 
 from app.applications import *  # noqa
 from app.image_upload import *  # noqa
+from app.outbox import *  # noqa
 from app.users.auth import *  # noqa
 
 # this is the Alembic Config object, which provides
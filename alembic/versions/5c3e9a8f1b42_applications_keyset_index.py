@@ -0,0 +1,36 @@
+"""applications keyset index
+
+Revision ID: 5c3e9a8f1b42
+Revises: d81e6a0c5f27
+Create Date: 2026-10-18 17:42:09.114387
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c3e9a8f1b42"
+down_revision: Union[str, None] = "d81e6a0c5f27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # rows without created_at would break the (created_at, id) ordering
+    op.execute("UPDATE applications SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column("applications", "created_at", existing_type=sa.DateTime(), nullable=False)
+    op.create_index(
+        "ix_applications_created_at_id",
+        "applications",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_applications_created_at_id", table_name="applications")
+    op.alter_column("applications", "created_at", existing_type=sa.DateTime(), nullable=True)
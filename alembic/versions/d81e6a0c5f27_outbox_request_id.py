@@ -0,0 +1,27 @@
+"""outbox request id
+
+Revision ID: d81e6a0c5f27
+Revises: 9b2f41c7d8e3
+Create Date: 2026-10-18 15:21:47.602931
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d81e6a0c5f27"
+down_revision: Union[str, None] = "9b2f41c7d8e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("outbox", sa.Column("request_id", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("outbox", "request_id")
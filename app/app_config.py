@@ -5,3 +5,4 @@
 from app.users.auth import fastapi_users
 
 current_user = fastapi_users.current_user()
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
@@ -1,12 +1,22 @@
 from .models import ApplicationModel
-from .schemas import ApplicationCreateSchema, ApplicationSchema, ApplicationResponseSchema
+from .schemas import (
+    ApplicationBatchCreateSchema,
+    ApplicationBatchResponseSchema,
+    ApplicationCreateSchema,
+    ApplicationPageSchema,
+    ApplicationSchema,
+    ApplicationResponseSchema,
+)
 from .service import ApplicationService
 # from .application_repository import ApplicationRepository
 
 __all__ = [
     "ApplicationModel",
+    "ApplicationBatchCreateSchema",
+    "ApplicationBatchResponseSchema",
     "ApplicationCreateSchema",
     "ApplicationSchema",
+    "ApplicationPageSchema",
     "ApplicationResponseSchema",
     "ApplicationService",
 ]
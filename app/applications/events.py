@@ -0,0 +1,31 @@
+# Event published for a created application, shared by the direct publish path in `ApplicationService`
+# and the outbox write in `ApplicationRepository`. Partitioned by user so a user's events stay ordered.
+import datetime
+from typing import Literal
+from uuid import UUID
+
+from app.applications.models import ApplicationModel
+from app.broker.events import EventEnvelope
+
+
+class ApplicationCreated(EventEnvelope):
+    type: Literal["application.created"] = "application.created"
+    version: Literal[1] = 1
+    id: int
+    title: str
+    description: str | None = None
+    created_at: datetime.datetime
+    user_id: UUID
+
+    def partition_key(self) -> str:
+        return str(self.user_id)
+
+
+def application_created_event(application: ApplicationModel, user_id: UUID) -> ApplicationCreated:
+    return ApplicationCreated(
+        id=application.id,
+        title=application.title,
+        description=application.description,
+        created_at=application.created_at or datetime.datetime.now(datetime.UTC),
+        user_id=user_id,
+    )
@@ -24,11 +24,21 @@ from typing import Annotated, List
 
 import logging
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 
 from app.app_config import current_user
-from app.applications import ApplicationCreateSchema, ApplicationSchema, ApplicationResponseSchema, ApplicationService
+from app.applications import (
+    ApplicationBatchCreateSchema,
+    ApplicationBatchResponseSchema,
+    ApplicationCreateSchema,
+    ApplicationPageSchema,
+    ApplicationSchema,
+    ApplicationResponseSchema,
+    ApplicationService,
+)
+from app.applications.repository import APPLICATIONS_LIST_TAG, application_tag, title_tag
 from app.dependency import get_application_service
+from app.infrastructure.cache import cached_response
 from app.users.auth import User
 from app.settings import DescriptionSettings
 
@@ -51,11 +61,26 @@ async def post_application(
     return await application_service.create_application(body, user.id)
 
 
+@router.post(
+    "/applications:batch",
+    response_model=ApplicationBatchResponseSchema,
+)
+async def post_applications_batch(
+    body: ApplicationBatchCreateSchema,
+    application_service: Annotated[
+        ApplicationService, Depends(get_application_service)
+    ],
+    user: User = Depends(current_user),
+) -> ApplicationBatchResponseSchema:
+    return await application_service.create_applications(body.items, user.id)
+
+
 @router.get(
     "/applications",
     response_model=List[ApplicationSchema],
 )
 async def get_all_applications(
+    request: Request,
     application_service: Annotated[
         ApplicationService, Depends(get_application_service)
     ],
@@ -63,9 +88,36 @@ async def get_all_applications(
     size: int = Query(10, ge=1, le=100, description=settings.SIZE_DESCRIPTION),
 ) -> List[ApplicationSchema]:
     logger.info(f"Getting applications with page={page}, size={size}")
-    result = await application_service.get_all_applications(page=page, size=size)
-    logger.info(f"Retrieved {len(result)} applications")
-    return result
+    return await cached_response(
+        request,
+        lambda: application_service.get_all_applications(page=page, size=size),
+        List[ApplicationSchema],
+        tags=[APPLICATIONS_LIST_TAG],
+        expire=120,
+        on_hit=lambda: application_service.log_endpoint_call("get_all_applications"),
+    )
+
+
+@router.get(
+    "/applications/cursor",
+    response_model=ApplicationPageSchema,
+)
+async def get_applications_page(
+    request: Request,
+    application_service: Annotated[
+        ApplicationService, Depends(get_application_service)
+    ],
+    cursor: str | None = Query(None, description=settings.CURSOR_DESCRIPTION),
+    size: int = Query(10, ge=1, le=100, description=settings.SIZE_DESCRIPTION),
+) -> ApplicationPageSchema:
+    return await cached_response(
+        request,
+        lambda: application_service.get_applications_page(size=size, cursor=cursor),
+        ApplicationPageSchema,
+        tags=[APPLICATIONS_LIST_TAG],
+        expire=120,
+        on_hit=lambda: application_service.log_endpoint_call("get_applications_page"),
+    )
 
 
 @router.get(
@@ -73,12 +125,23 @@ async def get_all_applications(
     response_model=List[ApplicationSchema],
 )
 async def get_application_by_title(
+    request: Request,
     title: str,
     application_service: Annotated[
         ApplicationService, Depends(get_application_service)
     ],
 ) -> List[ApplicationSchema]:
-    return await application_service.get_application_by_title(title=title)
+    return await cached_response(
+        request,
+        lambda: application_service.get_application_by_title(title=title),
+        List[ApplicationSchema],
+        tags=[title_tag(title)],
+        expire=120,
+        on_hit=lambda: application_service.log_endpoint_call(
+            "get_application_by_title", resource=title),
+        # evicted with any of the applications, even after a rename
+        result_tags=lambda applications: [application_tag(a.id) for a in applications],
+    )
 
 
 @router.get(
@@ -86,13 +149,19 @@ async def get_application_by_title(
     response_model=ApplicationSchema,
 )
 async def get_application_by_id(
+    request: Request,
     application_id: int,
     application_service: Annotated[
         ApplicationService, Depends(get_application_service)
     ],
 ) -> ApplicationSchema:
-    return await application_service.get_application_by_id(
-        application_id=application_id
+    return await cached_response(
+        request,
+        lambda: application_service.get_application_by_id(application_id=application_id),
+        ApplicationSchema,
+        tags=[application_tag(application_id)],
+        expire=120,
+        on_hit=lambda: application_service.log_endpoint_call("get_application_by_id"),
     )
 
 
@@ -2,7 +2,7 @@
 # creation timestamp, and user ID.
 from datetime import datetime as dt
 
-from sqlalchemy import Column, Integer, String, DateTime, UUID as SQLUUID
+from sqlalchemy import Column, Index, Integer, String, DateTime, UUID as SQLUUID
 
 from app.infrastructure.database import Base
 
@@ -13,5 +13,10 @@ class ApplicationModel(Base):
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(String)
-    created_at = Column(DateTime, default=dt.utcnow)
+    created_at = Column(DateTime, default=dt.utcnow, nullable=False)
     user_id = Column(SQLUUID, nullable=False)
+
+    __table_args__ = (
+        # keyset pagination walks (created_at, id) newest first
+        Index("ix_applications_created_at_id", "created_at", "id"),
+    )
@@ -1,23 +1,39 @@
 # The `ApplicationRepository` class provides methods for interacting with application data in a
 # database, including creating, retrieving, updating, and deleting applications, with caching
 # functionality implemented for certain operations.
+from datetime import datetime
 from typing import Sequence
 import logging
 from uuid import UUID
 
 from fastapi import HTTPException
-from fastapi_cache.decorator import cache
-from sqlalchemy import insert, select, update, delete
+from sqlalchemy import insert, select, tuple_, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.applications import ApplicationModel, ApplicationCreateSchema
+from app.applications import ApplicationModel, ApplicationCreateSchema, ApplicationSchema
+from app.applications.events import application_created_event
+from app.infrastructure.cache import cached, invalidate_tags
+from app.infrastructure.database.routing import replica_read
+from app.outbox import OutboxRepository
 
 logger = logging.getLogger(__name__)
 
+# every page of the offset and keyset listings
+APPLICATIONS_LIST_TAG = "applications:list"
+
+
+def application_tag(application_id: int) -> str:
+    return f"application:{application_id}"
+
+
+def title_tag(title: str) -> str:
+    return f"applications:title:{title}"
+
 
 class ApplicationRepository:
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, outbox: OutboxRepository | None = None):
         self.db_session = db_session
+        self.outbox = outbox
         self.logger = logger
 
     async def create_application(
@@ -34,13 +50,45 @@ class ApplicationRepository:
         )
         async with self.db_session as session:
             result = await session.execute(query)
-            await session.commit()
             added_application = result.scalar_one_or_none()
+            if self.outbox:
+                await self.outbox.add_event(
+                    session, application_created_event(added_application, user_id)
+                )
+            await session.commit()
             self.logger.info("Application added by user: %s", user_id)
-            return added_application
+        await invalidate_tags(APPLICATIONS_LIST_TAG, title_tag(added_application.title))
+        return added_application
+
+    async def create_applications(
+        self, applications: Sequence[ApplicationCreateSchema], user_id: UUID
+    ) -> list[ApplicationModel]:
+        # batched INSERT ... RETURNING; the rows come back in the order of the parameters
+        query = insert(ApplicationModel).returning(ApplicationModel, sort_by_parameter_order=True)
+        parameters = [
+            {
+                "title": application.title,
+                "description": application.description,
+                "user_id": user_id,
+            }
+            for application in applications
+        ]
+        async with self.db_session as session:
+            result = await session.execute(query, parameters)
+            added_applications = list(result.scalars().all())
+            if self.outbox:
+                await self.outbox.add_events(
+                    session,
+                    [application_created_event(added, user_id) for added in added_applications],
+                )
+            await session.commit()
+            self.logger.info(
+                "%d applications added by user: %s", len(added_applications), user_id)
+        await invalidate_tags(
+            APPLICATIONS_LIST_TAG, *{title_tag(added.title) for added in added_applications})
+        return added_applications
 
     @staticmethod
-    @cache(expire=120)
     async def get_user_application(
         application_id: int, user_id: UUID, session: AsyncSession
     ) -> ApplicationModel:
@@ -50,7 +98,14 @@ class ApplicationRepository:
         result = await session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_application_by_id(self, application_id: int) -> ApplicationModel:
+    @cached(
+        expire=120,
+        namespace="applications",
+        tags=lambda application_id: [application_tag(application_id)],
+        near=True,
+    )
+    @replica_read
+    async def get_application_by_id(self, application_id: int) -> ApplicationSchema:
         query = select(ApplicationModel).where(
             ApplicationModel.id == application_id)
         async with self.db_session as session:
@@ -62,14 +117,21 @@ class ApplicationRepository:
                 raise HTTPException(
                     status_code=404, detail="Application not found")
             self.logger.info("Application found by id: %s", application_id)
-        return application
+        return ApplicationSchema.model_validate(application)
 
-    @cache(expire=120)
+    @cached(
+        expire=120,
+        namespace="applications",
+        tags=lambda **_: [APPLICATIONS_LIST_TAG],
+        near=True,
+        early_refresh=True,
+    )
+    @replica_read
     async def get_all_applications(
         self,
         page: int,
         size: int,
-    ) -> Sequence[ApplicationModel]:
+    ) -> list[ApplicationSchema]:
         offset = (page - 1) * size
         async with self.db_session as session:
             query = select(ApplicationModel).offset(offset).limit(size)
@@ -80,13 +142,47 @@ class ApplicationRepository:
                 raise HTTPException(
                     status_code=404, detail="No applications found")
 
-        return applications
+        return [ApplicationSchema.model_validate(application) for application in applications]
 
-    @cache(expire=120)
+    @cached(
+        expire=120, namespace="applications", tags=lambda **_: [APPLICATIONS_LIST_TAG], near=True
+    )
+    @replica_read
+    async def get_applications_after(
+        self,
+        size: int,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[ApplicationSchema]:
+        """
+        Newest first, starting after the (created_at, id) of the previous page's last row. Served
+        by ix_applications_created_at_id, so deep pages cost the same as the first one.
+        """
+        query = (
+            select(ApplicationModel)
+            .order_by(ApplicationModel.created_at.desc(), ApplicationModel.id.desc())
+            .limit(size)
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(ApplicationModel.created_at, ApplicationModel.id) < tuple_(*after)
+            )
+        async with self.db_session as session:
+            result = await session.execute(query)
+            return [ApplicationSchema.model_validate(row) for row in result.scalars()]
+
+    @cached(
+        expire=120,
+        namespace="applications",
+        tags=lambda title: [title_tag(title)],
+        # a rename evicts the lookups of the old title through the application tag
+        result_tags=lambda applications: [application_tag(a.id) for a in applications],
+        early_refresh=True,
+    )
+    @replica_read
     async def get_application_by_title(
         self,
         title: str,
-    ) -> Sequence[ApplicationModel]:
+    ) -> list[ApplicationSchema]:
         query = select(ApplicationModel).where(ApplicationModel.title == title)
         async with self.db_session as session:
             result = await session.execute(query)
@@ -96,18 +192,19 @@ class ApplicationRepository:
                 raise HTTPException(
                     status_code=404, detail="No applications found")
             self.logger.info("Application found with title: %s", title)
-            return result.scalars().all()
+            return [ApplicationSchema.model_validate(row) for row in result.scalars()]
 
     async def delete_user_application(self, application_id: int, user_id: UUID) -> dict:
-        query = select(ApplicationModel).where(
-            ApplicationModel.id == application_id, ApplicationModel.user_id == user_id
+        # one round trip: the ownership check is part of the statement
+        query = (
+            delete(ApplicationModel)
+            .where(ApplicationModel.id == application_id, ApplicationModel.user_id == user_id)
+            .returning(ApplicationModel.id)
         )
 
         async with self.db_session as session:
             result = await session.execute(query)
-            application = result.scalar_one_or_none()
-
-            if not application:
+            if result.scalar_one_or_none() is None:
                 self.logger.error(
                     "Application delete attempt failed",
                     extra={
@@ -118,10 +215,7 @@ class ApplicationRepository:
                 )
                 raise HTTPException(
                     status_code=404, detail="Application not found")
-
-            delete_query = delete(ApplicationModel).where(
-                ApplicationModel.id == application_id
-            )
+            await session.commit()
             self.logger.info(
                 "Application deleted",
                 extra={
@@ -129,9 +223,8 @@ class ApplicationRepository:
                     "user_id": str(user_id),
                 },
             )
-            await session.execute(delete_query)
-            await session.commit()
 
+        await invalidate_tags(application_tag(application_id), APPLICATIONS_LIST_TAG)
         return {"status": "success", "message": "Application deleted"}
 
     async def edit_application_info(
@@ -141,10 +234,30 @@ class ApplicationRepository:
         new_title: str | None = None,
         new_description: str | None = None,
     ) -> ApplicationModel:
-        async with self.db_session as session:
-            application = await self.get_user_application(
-                application_id, user_id, session
+        update_data = {}
+        if new_title is not None:
+            update_data["title"] = new_title
+        if new_description is not None:
+            update_data["description"] = new_description
+
+        if update_data:
+            # one round trip: the ownership check is part of the statement and the updated row
+            # comes back with it
+            query = (
+                update(ApplicationModel)
+                .where(ApplicationModel.id == application_id, ApplicationModel.user_id == user_id)
+                .values(**update_data)
+                .returning(ApplicationModel)
+                .execution_options(populate_existing=True)
             )
+        else:
+            query = select(ApplicationModel).where(
+                ApplicationModel.id == application_id, ApplicationModel.user_id == user_id
+            )
+
+        async with self.db_session as session:
+            result = await session.execute(query)
+            application = result.scalar_one_or_none()
 
             if not application:
                 self.logger.warning(
@@ -159,18 +272,8 @@ class ApplicationRepository:
                     status_code=404, detail="Application not found or access denied"
                 )
 
-            update_data = {}
-            if new_title is not None:
-                update_data["title"] = new_title
-            if new_description is not None:
-                update_data["description"] = new_description
-
             if update_data:
-                await session.execute(
-                    update(ApplicationModel)
-                    .where(ApplicationModel.id == application_id)
-                    .values(**update_data)
-                )
+                await session.commit()
                 self.logger.info(
                     "Application updated",
                     extra={
@@ -179,7 +282,11 @@ class ApplicationRepository:
                         "update_data": update_data,
                     },
                 )
-                await session.commit()
-                await session.refresh(application)
+                # the entries of the old title carry the application tag
+                await invalidate_tags(
+                    application_tag(application_id),
+                    title_tag(application.title),
+                    APPLICATIONS_LIST_TAG,
+                )
 
             return application
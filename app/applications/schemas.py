@@ -2,7 +2,9 @@
 # description, created_at, and kafka_status.
 from datetime import datetime as dt
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.settings import settings
 
 
 class ApplicationSchema(BaseModel):
@@ -15,6 +17,12 @@ class ApplicationSchema(BaseModel):
         from_attributes = True
 
 
+class ApplicationPageSchema(BaseModel):
+    items: list[ApplicationSchema]
+    # opaque token for the next page, None on the last page
+    next_cursor: str | None = None
+
+
 class ApplicationCreateSchema(BaseModel):
     title: str
     description: str | None
@@ -25,7 +33,22 @@ class ApplicationResponseSchema(BaseModel):
     title: str
     description: str | None
     created_at: dt
+    # True means "accepted" (queued) or "delivered" (acked by the broker),
+    # depending on KAFKA_PRODUCER_DELIVERY_MODE
     kafka_status: bool
 
     class Config:
         from_attributes = True
+
+
+class ApplicationBatchCreateSchema(BaseModel):
+    items: list[ApplicationCreateSchema] = Field(
+        min_length=1, max_length=settings.APPLICATIONS_BATCH_MAX_ITEMS)
+
+
+class ApplicationBatchResponseSchema(BaseModel):
+    # one entry per request item, in request order; the batch is created atomically, so the
+    # per-item status is the event delivery in `kafka_status`
+    items: list[ApplicationResponseSchema]
+    created: int
+    kafka_failed: int
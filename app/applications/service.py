@@ -1,28 +1,32 @@
 # This code snippet defines a Python class `ApplicationService` that serves as a service layer for
 # handling application-related operations. Here's a breakdown of what the code is doing:
-import datetime
 import logging
 from dataclasses import dataclass
+from datetime import datetime
 from typing import List, Sequence
 from uuid import UUID
 
 from fastapi import HTTPException
 
 from app.applications import (
+    ApplicationBatchResponseSchema,
     ApplicationCreateSchema,
+    ApplicationPageSchema,
     ApplicationSchema,
     ApplicationResponseSchema,
     ApplicationModel
 )
+from app.applications.events import application_created_event
 from app.applications.repository import ApplicationRepository
 from app.mongo import UserLogService
+from app.pagination import decode_cursor, encode_cursor
 from app.broker.producer import KafkaProducer
 from app.exceptions import (
+    InvalidCursorError,
     KafkaMessageError,
     RecordMongoException,
     ApplicationNotFound
 )
-from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +37,8 @@ class ApplicationService:
     kafka_producer: KafkaProducer
     logger: logger  # type: ignore
     user_log_service: UserLogService
+    # the repository commits the event to the outbox, the relay publishes it
+    publish_via_outbox: bool = False
 
     async def create_application(
             self,
@@ -48,26 +54,17 @@ class ApplicationService:
             self.logger.error(
                 "Error during data record, MongoDB: {}".format(e))
 
-        message = {
-            "id": created_application.id,
-            "title": created_application.title,
-            "description": created_application.description,
-            "created_at": datetime.datetime.now(datetime.UTC),
-            "user_id": str(user_id),
-        }
-
-        kafka_status = False
-        try:
-            await self.kafka_producer.produce(
-                topic=settings.KAFKA_TOPIC,
-                key=str(created_application.id),
-                value=message,
-            )
-            kafka_status = True
-        except KafkaMessageError as e:
-            self.logger.error(
-                "Error while sending message to Kafka: {}".format(e),
-            )
+        kafka_status = self.publish_via_outbox
+        if not self.publish_via_outbox:
+            try:
+                await self.kafka_producer.publish(
+                    application_created_event(created_application, user_id)
+                )
+                kafka_status = True
+            except KafkaMessageError as e:
+                self.logger.error(
+                    "Error while sending message to Kafka: {}".format(e),
+                )
 
         return ApplicationResponseSchema(
             id=created_application.id,
@@ -77,6 +74,58 @@ class ApplicationService:
             kafka_status=kafka_status,
         )
 
+    async def create_applications(
+            self,
+            bodies: Sequence[ApplicationCreateSchema],
+            user_id: UUID,
+    ) -> ApplicationBatchResponseSchema:
+        created_applications = await self.application_repository.create_applications(
+            bodies, user_id
+        )
+        try:
+            await self.user_log_service.log_endpoint_calls(
+                endpoint="create_application",
+                user_id=user_id,
+                resources=[str(created.id) for created in created_applications],
+            )
+        except RecordMongoException as e:
+            self.logger.error(
+                "Error during data record, MongoDB: {}".format(e))
+
+        if self.publish_via_outbox:
+            kafka_statuses = [True] * len(created_applications)
+        else:
+            kafka_statuses = await self.kafka_producer.publish_batch(
+                [application_created_event(created, user_id) for created in created_applications]
+            )
+
+        items = [
+            ApplicationResponseSchema(
+                id=created.id,
+                title=created.title,
+                description=created.description,
+                created_at=created.created_at,
+                kafka_status=kafka_status,
+            )
+            for created, kafka_status in zip(created_applications, kafka_statuses)
+        ]
+        return ApplicationBatchResponseSchema(
+            items=items,
+            created=len(items),
+            kafka_failed=kafka_statuses.count(False),
+        )
+
+    async def log_endpoint_call(
+            self, endpoint: str, user_id: UUID | None = None, resource: str | None = None
+    ):
+        # reads answered from the response cache skip the methods below but are still audited
+        try:
+            await self.user_log_service.log_endpoint_call(
+                endpoint=endpoint, user_id=user_id, resource=resource)
+        except RecordMongoException as e:
+            self.logger.error(
+                "Error during data record, MongoDB: {}".format(e))
+
     async def get_application_by_id(self, application_id: int) -> ApplicationSchema:
         try:
             application = await self.application_repository.get_application_by_id(
@@ -101,7 +150,8 @@ class ApplicationService:
             applications = await self.application_repository.get_application_by_title(
                 title=title,
             )
-            await self.user_log_service.log_endpoint_call(endpoint="get_application_by_title", user_id=None)
+            await self.user_log_service.log_endpoint_call(
+                endpoint="get_application_by_title", user_id=None, resource=title)
         except ApplicationNotFound as e:
             self.logger.warning("Application with title: %s not found", title)
             raise HTTPException(
@@ -131,6 +181,34 @@ class ApplicationService:
 
         return [ApplicationSchema.model_validate(app) for app in applications]
 
+    async def get_applications_page(
+            self, size: int, cursor: str | None = None
+    ) -> ApplicationPageSchema:
+        after = None
+        if cursor:
+            try:
+                values = decode_cursor(cursor)
+                after = (datetime.fromisoformat(values["t"]), int(values["id"]))
+            except (InvalidCursorError, KeyError, TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        # one extra row tells whether there is a next page
+        applications = await self.application_repository.get_applications_after(
+            size=size + 1, after=after)
+        items = [ApplicationSchema.model_validate(app) for app in applications]
+        try:
+            await self.user_log_service.log_endpoint_call(endpoint="get_applications_page", user_id=None)
+        except RecordMongoException as e:
+            self.logger.error(
+                "Error during data record, MongoDB: {}".format(e))
+
+        next_cursor = None
+        if len(items) > size:
+            items = items[:size]
+            next_cursor = encode_cursor(
+                {"t": items[-1].created_at.isoformat(), "id": items[-1].id})
+        return ApplicationPageSchema(items=items, next_cursor=next_cursor)
+
     async def delete_user_application(self, application_id: int, user_id: UUID):
         try:
             await self.application_repository.delete_user_application(
@@ -0,0 +1,103 @@
+# Pre-populates the application caches after a deploy or a Redis flush: the first list pages as the
+# handlers request them, the first cursor page, and the titles the audit log shows were requested
+# most. Entries are reloaded even if present, so running it every minute keeps hot keys from ever
+# expiring under load. On Redis each run first takes a lease for `interval` seconds, so of all API
+# replicas only one warms per interval.
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.applications.repository import ApplicationRepository
+from app.infrastructure.cache import refreshing
+from app.mongo.analytics import UserLogAnalytics
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+LEASE_KEY = "warmup:lease"
+
+
+@dataclass
+class CacheWarmer:
+    session_factory: async_sessionmaker[AsyncSession]
+    analytics: UserLogAnalytics | None = None
+    pages: int = 5
+    page_size: int = 10
+    top_titles: int = 20
+    lookback: timedelta = timedelta(hours=24)
+    # seconds the run holds the Redis lease, 0 warms on every call
+    interval: float = 0
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        session_factory: async_sessionmaker[AsyncSession],
+        analytics: UserLogAnalytics | None = None,
+    ) -> "CacheWarmer":
+        return cls(
+            session_factory=session_factory,
+            analytics=analytics,
+            pages=settings.CACHE_WARMUP_PAGES,
+            page_size=settings.CACHE_WARMUP_PAGE_SIZE,
+            top_titles=settings.CACHE_WARMUP_TOP_TITLES,
+            lookback=timedelta(hours=settings.CACHE_WARMUP_LOOKBACK_HOURS),
+            interval=settings.CACHE_WARMUP_INTERVAL,
+        )
+
+    async def claim(self) -> bool:
+        """Take this interval's lease, False if another replica already holds it."""
+        backend = FastAPICache.get_backend()
+        if not self.interval or not isinstance(backend, RedisBackend):
+            return True
+        try:
+            # expires on its own, the next interval is up for grabs again
+            return bool(await backend.redis.set(
+                f"{FastAPICache.get_prefix()}:{LEASE_KEY}", 1, nx=True, px=int(self.interval * 1000)))
+        except RedisError as e:
+            logger.warning(f"Could not take the cache warm-up lease: {e}")
+            return False
+
+    async def popular_titles(self) -> list[str]:
+        if not self.analytics or not self.top_titles:
+            return []
+        until = datetime.utcnow()
+        try:
+            top = await self.analytics.top_resources(
+                "get_application_by_title", until - self.lookback, until, limit=self.top_titles)
+        except Exception as e:
+            # the pages are still worth warming without the audit log
+            logger.warning(f"Could not read the most requested titles: {e}")
+            return []
+        return [row.resource for row in top]
+
+    async def warm(self) -> int:
+        if not await self.claim():
+            logger.debug("Cache warm-up of this interval runs on another replica")
+            return 0
+        titles = await self.popular_titles()
+        warmed = 0
+        with refreshing():
+            async with self.session_factory() as session:
+                repository = ApplicationRepository(session)
+                for page in range(1, self.pages + 1):
+                    try:
+                        await repository.get_all_applications(page=page, size=self.page_size)
+                    except HTTPException:
+                        # past the last page
+                        break
+                    warmed += 1
+                # the keyset handler fetches one extra row to find the next page
+                await repository.get_applications_after(size=self.page_size + 1)
+                warmed += 1
+                for title in titles:
+                    await repository.get_application_by_title(title)
+                    warmed += 1
+        logger.info("Warmed %s cache entries", warmed)
+        return warmed
@@ -0,0 +1,83 @@
+# Codec registry shared by the Kafka producer and consumer. The producer tags every record with the
+# name of the codec it used in the `content-encoding` header, the consumer picks the decoder from that
+# header and falls back to the legacy JSON encoding for records produced before the header existed.
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Iterable
+
+import msgpack
+
+from app.exceptions import CodecNotFoundError
+
+CODEC_HEADER = "content-encoding"
+LEGACY_CODEC = "json"
+
+
+class Codec(ABC):
+    name: str
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes: ...
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any: ...
+
+
+class JsonCodec(Codec):
+    """Compact JSON: no indentation, no key sorting. Reads the legacy indented payloads too.
+    Values JSON has no type for are written with str(), as in the legacy payloads."""
+
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(
+            value, separators=(",", ":"), ensure_ascii=False, default=str
+        ).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+
+    def encode(self, value: Any) -> bytes:
+        # str() like the JSON codec, so both write datetimes and UUIDs the same way
+        return msgpack.packb(value, default=str, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+_registry: dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec) -> Codec:
+    _registry[codec.name] = codec
+    return codec
+
+
+def get_codec(name: str) -> Codec:
+    try:
+        return _registry[name]
+    except KeyError:
+        raise CodecNotFoundError(name) from None
+
+
+def registered_codecs() -> dict[str, Codec]:
+    return dict(_registry)
+
+
+def codec_header(codec: Codec) -> tuple[str, bytes]:
+    return CODEC_HEADER, codec.name.encode()
+
+
+def codec_from_headers(headers: Iterable[tuple[str, bytes]] | None) -> Codec:
+    for key, value in headers or ():
+        if key == CODEC_HEADER:
+            return get_codec(value.decode())
+    return get_codec(LEGACY_CODEC)
+
+
+register_codec(JsonCodec())
+register_codec(MsgpackCodec())
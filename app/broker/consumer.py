@@ -1,41 +1,289 @@
 # This class defines a Kafka consumer in Python using aiokafka library for consuming messages from a
-# Kafka topic.
+# Kafka topic. Records are fetched in batches, dispatched to the handlers registered per event type
+# concurrently across keys (in order within a key) and committed once their handlers succeeded or the
+# failed record was forwarded to the next retry tier (see `app.broker.retry`).
 import asyncio
-import json
+import logging
+import time
+from collections import defaultdict, deque
+from itertools import takewhile
+from typing import Sequence
 
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener
+from aiokafka.errors import KafkaError as AIOKafkaError
+from aiokafka.structs import ConsumerRecord, TopicPartition
 
+from app.broker import metrics
+from app.broker.codecs import codec_from_headers
+from app.broker.events import TopicRouter
+from app.broker.handlers import Event, HandlerRegistry, event_type_of, registry
+from app.broker.producer import KafkaProducer
+from app.broker.retry import RetryPolicy, dead_letter_topic, not_before, original_topic
+from app.broker.tracing import read_trace
 from app.exceptions import ConsumerError
-from app.settings import settings
+from app.monitoring.tracing import request_id_var
+from app.settings import Settings, settings as app_settings
+
+logger = logging.getLogger(__name__)
+
+
+class _DrainOnRevoke(ConsumerRebalanceListener):
+    def __init__(self, consumer: "KafkaConsumer"):
+        self.consumer = consumer
+
+    async def on_partitions_revoked(self, revoked):
+        # let in-flight batches finish and commit before another member takes the partitions
+        await self.consumer.drain(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        pass
 
 
 class KafkaConsumer:
-    def __init__(self):
+    def __init__(
+        self,
+        settings: Settings = app_settings,
+        handlers: HandlerRegistry = registry,
+        topics: Sequence[str] | None = None,
+        producer: KafkaProducer | None = None,
+    ):
+        self.settings = settings
+        self.handlers = handlers
+        self.topics = list(
+            topics or settings.KAFKA_CONSUMER_TOPICS or TopicRouter.from_settings(settings).topics()
+        )
+        self.retry_policy = RetryPolicy(tuple(settings.KAFKA_RETRY_DELAYS))
         self.consumer = None
+        # forwards failed records to the retry and dead-letter topics
+        self.producer = producer
+        self._owns_producer = producer is None
+        self.logger = logger
+        self._fetch_task: asyncio.Task | None = None
+        self._queues: dict[TopicPartition, deque] = defaultdict(deque)
+        self._workers: dict[TopicPartition, asyncio.Task] = {}
+        self._in_flight = 0
+        self._paused = False
+        self._delayed: set[TopicPartition] = set()
+        # fetched retry records that did not come due yet, they do not count towards the watermark
+        self._delayed_records = 0
+        self._key_slots = asyncio.Semaphore(settings.KAFKA_CONSUMER_MAX_CONCURRENCY)
 
     async def start(self):
+        if self.producer is None:
+            self.producer = KafkaProducer.from_settings(self.settings)
+        if self.producer.producer is None:
+            await self.producer.start()
+
         self.consumer = AIOKafkaConsumer(
-            settings.KAFKA_TOPIC,
-            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
-            group_id=settings.KAFKA_GROUP_ID,
-            value_deserializer=lambda v: json.loads(v.decode()),
+            bootstrap_servers=self.settings.KAFKA_BOOTSTRAP_SERVERS,
+            group_id=self.settings.KAFKA_GROUP_ID,
+            enable_auto_commit=False,
+            max_poll_records=self.settings.KAFKA_CONSUMER_MAX_RECORDS,
         )
+        topics = self.topics + [
+            retry_topic for topic in self.topics for retry_topic in self.retry_policy.topics(topic)
+        ]
+        self.consumer.subscribe(topics, listener=_DrainOnRevoke(self))
         await self.consumer.start()
-        asyncio.create_task(self.consume_messages())
+        self._fetch_task = asyncio.create_task(self.consume_messages())
 
     async def stop(self):
+        if self._fetch_task:
+            self._fetch_task.cancel()
+            await asyncio.gather(self._fetch_task, return_exceptions=True)
+            self._fetch_task = None
         if self.consumer:
+            await self.drain(list(self._workers))
             await self.consumer.stop()
+        if self.producer and self._owns_producer:
+            await self.producer.stop()
+
+    @staticmethod
+    def decode(msg):
+        # records without the codec header were produced as legacy JSON
+        return codec_from_headers(msg.headers).decode(msg.value)
 
     async def consume_messages(self):
+        high_watermark = self.settings.KAFKA_CONSUMER_HIGH_WATERMARK
+        while True:
+            try:
+                batches = await self.consumer.getmany(
+                    timeout_ms=self.settings.KAFKA_CONSUMER_FETCH_TIMEOUT_MS,
+                    max_records=self.settings.KAFKA_CONSUMER_MAX_RECORDS,
+                )
+            except AIOKafkaError as e:
+                self.logger.error(str(ConsumerError(str(e))))
+                await asyncio.sleep(2)
+                continue
+
+            for tp, records in batches.items():
+                self._queues[tp].append(records)
+                self._in_flight += len(records)
+                if self.retry_policy.is_retry_topic(tp.topic):
+                    self._delayed_records += len(records)
+                metrics.observe_fetch(
+                    tp.topic, tp.partition, records, self.consumer.highwater(tp))
+                worker = self._workers.get(tp)
+                if worker is None or worker.done():
+                    self._workers[tp] = asyncio.create_task(self._process_partition(tp))
+
+            in_flight = self._in_flight - self._delayed_records
+            metrics.consumer_in_flight.set(in_flight)
+            if not self._paused and in_flight >= high_watermark:
+                self._pause(in_flight)
+            elif self._paused and in_flight <= high_watermark // 2:
+                self._resume(in_flight)
+
+    def _pause(self, in_flight: int):
+        self._paused = True
+        self.consumer.pause(*self.consumer.assignment())
+        self.logger.warning("Paused fetching, %s records in flight", in_flight)
+
+    def _resume(self, in_flight: int):
+        self._paused = False
+        # partitions waiting for their retry delay stay paused
+        self.consumer.resume(*(tp for tp in self.consumer.paused() if tp not in self._delayed))
+        self.logger.info("Resumed fetching, %s records in flight", in_flight)
+
+    async def drain(self, partitions):
+        workers = []
+        for tp in partitions:
+            worker = self._workers.pop(tp, None)
+            if worker is None:
+                continue
+            if tp in self._delayed:
+                # the records of a delayed retry partition that are not due yet did not run, the
+                # next owner fetches them again from the last commit
+                worker.cancel()
+            workers.append(worker)
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _process_partition(self, tp: TopicPartition):
+        queue = self._queues[tp]
+        retrying = self.retry_policy.is_retry_topic(tp.topic)
+        while queue:
+            records = queue.popleft()
+            if retrying:
+                try:
+                    await self._wait_until_due(tp, records[0])
+                except asyncio.CancelledError:
+                    waiting = len(records) + sum(len(batch) for batch in queue)
+                    self._in_flight -= waiting
+                    self._delayed_records -= waiting
+                    queue.clear()
+                    raise
+                # handle the records as they come due rather than waiting for the last one
+                now = time.time()
+                due = [records[0], *takewhile(lambda record: not_before(record) <= now, records[1:])]
+                if len(due) < len(records):
+                    queue.appendleft(records[len(due):])
+                records = due
+                self._delayed_records -= len(records)
+
+            failed_offset = await self._process_batch(records)
+            self._in_flight -= len(records)
+            if failed_offset is None:
+                await self._commit(tp, records[-1].offset + 1)
+                continue
+
+            # the failed record could not even be forwarded: keep everything before it and
+            # fetch the rest again
+            await self._commit(tp, failed_offset)
+            while queue:
+                dropped = len(queue.popleft())
+                self._in_flight -= dropped
+                if retrying:
+                    self._delayed_records -= dropped
+            self.consumer.seek(tp, failed_offset)
+            await asyncio.sleep(self.settings.KAFKA_CONSUMER_RETRY_BACKOFF)
+
+    async def _wait_until_due(self, tp: TopicPartition, head: ConsumerRecord):
+        # retry records are written in due order, nothing of the partition is due before its head
+        delay = not_before(head) - time.time()
+        if delay <= 0:
+            return
+        # hold back only this partition, fetching and the other partitions keep going
+        self._delayed.add(tp)
+        self.consumer.pause(tp)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._delayed.discard(tp)
+            if not self._paused and tp in self.consumer.assignment():
+                self.consumer.resume(tp)
+
+    async def _process_batch(self, records: list[ConsumerRecord]) -> int | None:
+        by_key: dict[bytes | None, list[ConsumerRecord]] = defaultdict(list)
+        for record in records:
+            by_key[record.key].append(record)
+
+        failures = await asyncio.gather(
+            *(self._process_key(key_records) for key_records in by_key.values())
+        )
+        failed = [offset for offset in failures if offset is not None]
+        return min(failed) if failed else None
+
+    async def _process_key(self, records: list[ConsumerRecord]) -> int | None:
+        async with self._key_slots:
+            for record in records:
+                event_type = event_type_of(record)
+                produced_at, request_id = read_trace(record)
+                if produced_at is not None:
+                    metrics.consumer_end_to_end_seconds.observe(
+                        max(time.time() - produced_at / 1000, 0), event_type=event_type)
+                # handler logs carry the ID of the request that wrote the event
+                token = request_id_var.set(request_id)
+                started = time.perf_counter()
+                error = None
+                try:
+                    await self.handlers.dispatch(self._to_event(record))
+                except Exception as e:
+                    error = e
+                    metrics.consumer_handler_errors.inc(event_type=event_type)
+                    self.logger.error(
+                        f"Handler failed for {record.topic}[{record.partition}]@{record.offset}: {e}"
+                    )
+                finally:
+                    request_id_var.reset(token)
+                    metrics.consumer_handler_seconds.observe(
+                        time.perf_counter() - started, event_type=event_type)
+
+                if error is not None and not await self._forward(record, error):
+                    # later records of the same key must not overtake the failed one
+                    return record.offset
+        return None
+
+    async def _forward(self, record: ConsumerRecord, error: Exception) -> bool:
+        topic, headers = self.retry_policy.next_hop(record, error)
+        try:
+            await self.producer.send(topic, record.key, record.value, headers, wait=True)
+        except Exception as e:
+            self.logger.error(
+                f"Could not forward {record.topic}[{record.partition}]@{record.offset} "
+                f"to {topic}: {e}"
+            )
+            return False
+
+        source = original_topic(record)
+        if topic == dead_letter_topic(source):
+            metrics.consumer_dead_lettered.inc(topic=source)
+            self.logger.warning(
+                f"Moved {record.topic}[{record.partition}]@{record.offset} to {topic}")
+        else:
+            metrics.consumer_retried.inc(topic=source, tier=topic.rsplit(".", 1)[-1])
+        return True
+
+    def _to_event(self, record: ConsumerRecord) -> Event:
+        return Event(
+            type=event_type_of(record),
+            key=record.key.decode() if record.key is not None else None,
+            record=record,
+        )
+
+    async def _commit(self, tp: TopicPartition, offset: int):
         try:
-            async for msg in self.consumer:
-                print("\n" + "=" * 50)
-                print("Received Kafka message:")
-                print(f"Topic: {msg.topic}")
-                print(f"Key: {msg.key.decode()}")
-                print(f"Value: {msg.value}")
-                print("=" * 50 + "\n")
-        except ConsumerError as e:
-            print(f"Consumer error: {str(e)}")
-            await asyncio.sleep(2)
+            await self.consumer.commit({tp: offset})
+            metrics.observe_commit(tp.topic, tp.partition, offset)
+        except Exception as e:
+            # the partition was most likely revoked, the new owner resumes from the last commit
+            self.logger.warning(f"Commit of {tp} at {offset} failed: {e}")
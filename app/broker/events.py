@@ -0,0 +1,68 @@
+# Typed event envelopes. Every event type carries its name and schema version in the payload and in
+# the `event-type` / `schema-version` headers, is routed to its own topic through `TopicRouter` and
+# picks its own partition key, so consumers subscribe only to the streams they need and can skip
+# records by header without decoding them.
+import datetime
+from dataclasses import dataclass, field
+from typing import Any, ClassVar
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field
+
+from app.broker.handlers import EVENT_TYPE_HEADER
+from app.settings import Settings
+
+SCHEMA_VERSION_HEADER = "schema-version"
+
+
+def envelope_headers(event_type: str, version: int) -> list[tuple[str, bytes]]:
+    return [(EVENT_TYPE_HEADER, event_type.encode()), (SCHEMA_VERSION_HEADER, str(version).encode())]
+
+
+class EventEnvelope(BaseModel):
+    type: str
+    version: int = 1
+    event_id: UUID = Field(default_factory=uuid4)
+    occurred_at: datetime.datetime = Field(
+        default_factory=lambda: datetime.datetime.now(datetime.UTC))
+
+    registry: ClassVar[dict[tuple[str, int], type["EventEnvelope"]]] = {}
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        super().__pydantic_init_subclass__(**kwargs)
+        key = (cls.model_fields["type"].default, cls.model_fields["version"].default)
+        EventEnvelope.registry[key] = cls
+
+    def partition_key(self) -> str:
+        return str(self.event_id)
+
+    def headers(self) -> list[tuple[str, bytes]]:
+        return envelope_headers(self.type, self.version)
+
+    def payload(self) -> dict:
+        return self.model_dump(mode="json")
+
+
+def parse_event(payload: dict[str, Any]) -> EventEnvelope:
+    """Validate a decoded payload into the envelope registered for its type and version."""
+    envelope = EventEnvelope.registry.get((payload.get("type"), payload.get("version", 1)))
+    if envelope is None:
+        raise ValueError(f"Unknown event {payload.get('type')} v{payload.get('version')}")
+    return envelope.model_validate(payload)
+
+
+@dataclass(frozen=True)
+class TopicRouter:
+    default: str
+    routes: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "TopicRouter":
+        return cls(default=settings.KAFKA_TOPIC, routes=dict(settings.KAFKA_EVENT_TOPICS))
+
+    def topic_for(self, event_type: str) -> str:
+        return self.routes.get(event_type, self.default)
+
+    def topics(self) -> list[str]:
+        return sorted({self.default, *self.routes.values()})
@@ -0,0 +1,76 @@
+# Registry of consumer handlers keyed by event type. The `KafkaConsumer` resolves the event type of
+# every record and awaits all handlers registered for it; records without a registered handler go to
+# the fallback handlers.
+import logging
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Awaitable, Callable
+
+from aiokafka.structs import ConsumerRecord
+
+from app.broker.codecs import codec_from_headers
+from app.broker.retry import original_topic, text_header
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPE_HEADER = "event-type"
+
+
+@dataclass
+class Event:
+    type: str
+    key: str | None
+    record: ConsumerRecord
+
+    @cached_property
+    def value(self) -> Any:
+        # decoded on first access, handlers that only look at the headers never pay for it
+        return codec_from_headers(self.record.headers).decode(self.record.value)
+
+
+Handler = Callable[[Event], Awaitable[None]]
+
+
+def event_type_of(record: ConsumerRecord) -> str:
+    # untyped legacy records are identified by the topic they were published to
+    return text_header(record, EVENT_TYPE_HEADER) or original_topic(record)
+
+
+@dataclass
+class HandlerRegistry:
+    handlers: dict[str, list[Handler]] = field(default_factory=dict)
+    fallback: list[Handler] = field(default_factory=list)
+
+    def register(self, event_type: str | None = None) -> Callable[[Handler], Handler]:
+        """Register the decorated coroutine for `event_type`, or as a fallback when omitted."""
+
+        def decorator(handler: Handler) -> Handler:
+            if event_type is None:
+                self.fallback.append(handler)
+            else:
+                self.handlers.setdefault(event_type, []).append(handler)
+            return handler
+
+        return decorator
+
+    def handlers_for(self, event_type: str) -> list[Handler]:
+        return self.handlers.get(event_type) or self.fallback
+
+    async def dispatch(self, event: Event) -> None:
+        for handler in self.handlers_for(event.type):
+            await handler(event)
+
+
+registry = HandlerRegistry()
+
+
+@registry.register()
+async def log_event(event: Event) -> None:
+    logger.info(
+        "Received %s from %s[%s]@%s key=%s",
+        event.type,
+        event.record.topic,
+        event.record.partition,
+        event.record.offset,
+        event.key,
+    )
@@ -0,0 +1,80 @@
+# Kafka pipeline metrics shared by `KafkaConsumer`, `KafkaProducer` and the outbox relay, exposed
+# through the /metrics endpoints of the API and of every consumer worker process.
+from app.monitoring.metrics import registry
+
+PARTITION_LABELS = ("topic", "partition")
+
+consumer_committed_offset = registry.gauge(
+    "kafka_consumer_committed_offset", "Last committed offset per partition", PARTITION_LABELS)
+consumer_highwater = registry.gauge(
+    "kafka_consumer_highwater", "High watermark per partition", PARTITION_LABELS)
+consumer_lag = registry.gauge(
+    "kafka_consumer_lag", "High watermark minus committed offset", PARTITION_LABELS)
+consumer_messages = registry.counter(
+    "kafka_consumer_messages_total", "Records fetched per partition", PARTITION_LABELS)
+consumer_bytes = registry.counter(
+    "kafka_consumer_bytes_total", "Key and value bytes fetched per partition", PARTITION_LABELS)
+consumer_in_flight = registry.gauge(
+    "kafka_consumer_in_flight", "Records fetched but not yet processed")
+consumer_handler_seconds = registry.histogram(
+    "kafka_consumer_handler_seconds", "Handler latency per event type", ("event_type",))
+consumer_end_to_end_seconds = registry.histogram(
+    "kafka_consumer_end_to_end_seconds", "Time from API write to handler start per event type",
+    ("event_type",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+consumer_handler_errors = registry.counter(
+    "kafka_consumer_handler_errors_total", "Failed handler calls per event type", ("event_type",))
+consumer_retried = registry.counter(
+    "kafka_consumer_retried_total", "Failed records forwarded to a retry topic", ("topic", "tier"))
+consumer_dead_lettered = registry.counter(
+    "kafka_consumer_dead_lettered_total", "Records forwarded to the dead-letter topic", ("topic",))
+
+producer_send_seconds = registry.histogram(
+    "kafka_producer_send_seconds", "Time from send to broker acknowledgement", ("topic",))
+producer_record_bytes = registry.histogram(
+    "kafka_producer_record_bytes", "Serialized record value size", ("topic",),
+    buckets=(64, 128, 256, 512, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+producer_batch_records = registry.histogram(
+    "kafka_producer_batch_records", "Records published per batch publish call", ("source",),
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+)
+producer_errors = registry.counter(
+    "kafka_producer_errors_total", "Failed sends per topic", ("topic",))
+
+
+def observe_fetch(topic: str, partition: int, records: list, highwater: int | None):
+    consumer_messages.inc(len(records), topic=topic, partition=partition)
+    consumer_bytes.inc(
+        sum(max(r.serialized_key_size, 0) + max(r.serialized_value_size, 0) for r in records),
+        topic=topic,
+        partition=partition,
+    )
+    if highwater is not None:
+        consumer_highwater.set(highwater, topic=topic, partition=partition)
+        # before the first commit the fetch position is the best known committed offset
+        committed = consumer_committed_offset.value(
+            records[0].offset if records else highwater, topic=topic, partition=partition)
+        consumer_lag.set(max(highwater - committed, 0), topic=topic, partition=partition)
+
+
+def observe_commit(topic: str, partition: int, offset: int):
+    consumer_committed_offset.set(offset, topic=topic, partition=partition)
+    highwater = consumer_highwater.value(topic=topic, partition=partition)
+    consumer_lag.set(max(highwater - offset, 0), topic=topic, partition=partition)
+
+
+def partition_report() -> list[dict]:
+    report = []
+    for topic, partition in consumer_messages.labelsets():
+        labels = {"topic": topic, "partition": partition}
+        report.append({
+            **labels,
+            "committed_offset": consumer_committed_offset.value(**labels),
+            "highwater": consumer_highwater.value(**labels),
+            "lag": consumer_lag.value(**labels),
+            "messages_per_sec": consumer_messages.rate(**labels),
+            "bytes_per_sec": consumer_bytes.rate(**labels),
+        })
+    return report
@@ -1,33 +1,247 @@
 # The `KafkaProducer` class is an asynchronous Python class that handles producing messages to a Kafka
-# topic using aiokafka.
-import json
+# topic using aiokafka. A single instance is created in the app lifespan and shared by every request.
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, Sequence
 
 from aiokafka import AIOKafkaProducer
+from aiokafka.errors import KafkaError as AIOKafkaError
+from aiokafka.structs import RecordMetadata
 
-from app.exceptions import ProducerError
+from app.broker import metrics
+from app.broker.codecs import codec_header, get_codec
+from app.broker.events import EventEnvelope, TopicRouter
+from app.broker.tracing import trace_headers
+from app.exceptions import ProducerError, KafkaMessageError
+from app.monitoring.tracing import get_request_id
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_ACCEPTED = "accepted"
+DELIVERY_DELIVERED = "delivered"
+
+DeliveryCallback = Callable[[str, Optional[RecordMetadata], Optional[BaseException]], None]
+
+
+@dataclass
+class DeliveryStats:
+    sent: int = 0
+    delivered: int = 0
+    failed: int = 0
+    in_flight: int = 0
 
 
 class KafkaProducer:
-    def __init__(self, bootstrap_servers: str):
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        linger_ms: int = 0,
+        max_batch_size: int = 16384,
+        compression_type: str | None = None,
+        acks: int | str = 1,
+        delivery_mode: str = DELIVERY_DELIVERED,
+        max_in_flight: int = 1000,
+        on_delivery: DeliveryCallback | None = None,
+        codec: str = "json",
+        router: TopicRouter | None = None,
+    ):
         self.bootstrap_servers = bootstrap_servers
+        self.linger_ms = linger_ms
+        self.max_batch_size = max_batch_size
+        self.compression_type = compression_type
+        self.acks = acks
+        self.delivery_mode = delivery_mode
+        self.on_delivery = on_delivery
+        self.codec = get_codec(codec)
+        self.router = router or TopicRouter(default="applications")
+        self.stats = DeliveryStats()
+        # bounds the number of records queued in the accumulator but not yet acknowledged
+        self._in_flight = asyncio.Semaphore(max_in_flight)
         self.producer = None
 
+    @classmethod
+    def from_settings(cls, settings: Settings, **kwargs) -> "KafkaProducer":
+        acks = settings.KAFKA_PRODUCER_ACKS
+        return cls(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            linger_ms=settings.KAFKA_PRODUCER_LINGER_MS,
+            max_batch_size=settings.KAFKA_PRODUCER_MAX_BATCH_SIZE,
+            compression_type=settings.KAFKA_PRODUCER_COMPRESSION_TYPE,
+            acks=int(acks) if acks.isdigit() else acks,
+            delivery_mode=settings.KAFKA_PRODUCER_DELIVERY_MODE,
+            max_in_flight=settings.KAFKA_PRODUCER_MAX_IN_FLIGHT,
+            codec=settings.KAFKA_MESSAGE_CODEC,
+            router=TopicRouter.from_settings(settings),
+            **kwargs,
+        )
+
     async def start(self):
         self.producer = AIOKafkaProducer(
             bootstrap_servers=self.bootstrap_servers,
-            value_serializer=lambda x: json.dumps(
-                x, indent=4, sort_keys=True, default=str
-            ).encode("utf-8"),
+            linger_ms=self.linger_ms,
+            max_batch_size=self.max_batch_size,
+            compression_type=self.compression_type,
+            acks=self.acks,
         )
-        await self.producer.start()
+        try:
+            await self.producer.start()
+        except Exception:
+            # nothing was sent, close the client without flushing and leave the producer unset
+            producer, self.producer = self.producer, None
+            await producer.stop()
+            raise
 
     async def stop(self):
         if self.producer:
+            # deliver whatever is still lingering in the accumulator before closing
+            await self.producer.flush()
             await self.producer.stop()
+            self.producer = None
+
+    async def produce(
+        self,
+        topic: str,
+        key: str,
+        value: dict,
+        wait: bool | None = None,
+        request_id: str | None = None,
+        produced_at: datetime | None = None,
+        headers: list[tuple[str, bytes]] | None = None,
+    ) -> asyncio.Future:
+        """
+        Queue a record and return its delivery future. Unless `wait` says otherwise, the
+        configured delivery mode decides whether the broker ack is awaited before returning.
+        `request_id` and `produced_at` default to the current HTTP request and now; the outbox
+        relay passes the values recorded when the event was written.
+        """
+        payload = self.codec.encode(value)
+        headers = [
+            codec_header(self.codec),
+            *trace_headers(request_id or get_request_id(), produced_at),
+            *(headers or ()),
+        ]
+        return await self.send(topic, key.encode("utf-8"), payload, headers, wait)
+
+    async def publish(self, event: EventEnvelope, wait: bool | None = None) -> asyncio.Future:
+        """Produce a typed event to the topic routed for its type, keyed by its partition key."""
+        return await self.produce(
+            topic=self.router.topic_for(event.type),
+            key=event.partition_key(),
+            value=event.payload(),
+            wait=wait,
+            headers=event.headers(),
+        )
+
+    async def publish_batch(
+        self, events: Sequence[EventEnvelope], wait: bool | None = None
+    ) -> list[bool]:
+        """
+        Queue every event before waiting for any ack, so they share the producer batches of their
+        partitions, and return whether each one was accepted or, in delivered mode, acked.
+        """
+        if wait is None:
+            wait = self.delivery_mode == DELIVERY_DELIVERED
+        deliveries: list[asyncio.Future | None] = []
+        for event in events:
+            try:
+                deliveries.append(await self.publish(event, wait=False))
+            except KafkaMessageError as e:
+                logger.error(f"Failed to queue {event.type} event: {e}")
+                deliveries.append(None)
+        if not wait:
+            return [delivery is not None for delivery in deliveries]
 
-    async def produce(self, topic: str, key: str, value: dict):
+        queued = [delivery for delivery in deliveries if delivery is not None]
+        await asyncio.gather(*(asyncio.shield(d) for d in queued), return_exceptions=True)
+        return [
+            delivery is not None and not delivery.cancelled() and delivery.exception() is None
+            for delivery in deliveries
+        ]
+
+    async def send(
+        self,
+        topic: str,
+        key: bytes | None,
+        payload: bytes,
+        headers: list[tuple[str, bytes]],
+        wait: bool | None = None,
+    ) -> asyncio.Future:
+        """Queue an already encoded record, e.g. one forwarded to a retry or dead-letter topic."""
         if not self.producer:
             raise ProducerError("Kafka Producer stopped")
+        if wait is None:
+            wait = self.delivery_mode == DELIVERY_DELIVERED
+
+        metrics.producer_record_bytes.observe(len(payload), topic=topic)
+
+        await self._in_flight.acquire()
+        started = time.perf_counter()
+        try:
+            delivery = await self.producer.send(
+                topic, value=payload, key=key, headers=headers)
+        except AIOKafkaError as e:
+            self._in_flight.release()
+            self.stats.failed += 1
+            metrics.producer_errors.inc(topic=topic)
+            raise KafkaMessageError(str(e)) from e
+
+        self.stats.sent += 1
+        self.stats.in_flight += 1
+        delivery.add_done_callback(lambda fut: self._on_delivery(topic, fut, started))
+
+        if wait:
+            try:
+                await asyncio.shield(delivery)
+            except AIOKafkaError as e:
+                raise KafkaMessageError(str(e)) from e
+        return delivery
+
+    def _on_delivery(self, topic: str, delivery: asyncio.Future, started: float):
+        self._in_flight.release()
+        self.stats.in_flight -= 1
+        metrics.producer_send_seconds.observe(time.perf_counter() - started, topic=topic)
+
+        if delivery.cancelled():
+            error = asyncio.CancelledError()
+        else:
+            error = delivery.exception()
+        metadata = None
+        if error is None:
+            self.stats.delivered += 1
+            metadata = delivery.result()
+            logger.debug(
+                "Message delivered to %s [%s] @ %s",
+                topic, metadata.partition, metadata.offset,
+            )
+        else:
+            self.stats.failed += 1
+            metrics.producer_errors.inc(topic=topic)
+            logger.error(f"Failed to deliver message to {topic}: {error}")
+
+        if self.on_delivery:
+            try:
+                self.on_delivery(topic, metadata, error)
+            except Exception as e:
+                logger.error(f"Delivery callback failed: {e}")
+
+
+async def startup_kafka_producer(app, settings: Settings):
+    app.kafka_producer = KafkaProducer.from_settings(settings)
+    # a failed start cleans up after itself
+    await app.kafka_producer.start()
+    logger.info("Kafka producer started")
+
 
-        await self.producer.send_and_wait(topic, value=value, key=key.encode("utf-8"))
-        print(f"Message sent to  {topic}: {value}")
+async def shutdown_kafka_producer(app):
+    producer = getattr(app, "kafka_producer", None)
+    if producer is None:
+        return
+    try:
+        await producer.stop()
+        logger.info("Kafka producer flushed and stopped")
+    except Exception as e:
+        logger.error(f"Error while stopping Kafka producer: {e}")
@@ -0,0 +1,119 @@
+"""
+    Replays dead-letter records in bulk. Every record is forwarded to the topic it originally failed
+    on (or to `--target`) with the retry headers stripped, so it goes through all retry tiers again.
+    Records are read with a dedicated consumer group and committed once the broker acknowledged the
+    whole batch; the replay stops after `--limit` records or once the topic stayed idle for
+    `--idle-timeout` seconds.
+
+        python -m app.broker.replay applications.dlq --limit 10000
+"""
+import argparse
+import asyncio
+import logging
+
+from aiokafka import AIOKafkaConsumer
+
+from app.broker.producer import KafkaProducer
+from app.broker.retry import original_headers, original_topic
+from app.monitoring.tracing import configure_logging
+from app.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+async def replay_records(
+    consumer: AIOKafkaConsumer,
+    producer: KafkaProducer,
+    limit: int | None = None,
+    target: str | None = None,
+    idle_timeout: float = 5,
+    max_records: int = 500,
+) -> int:
+    replayed = 0
+    while limit is None or replayed < limit:
+        batches = await consumer.getmany(timeout_ms=int(idle_timeout * 1000), max_records=max_records)
+        if not batches:
+            break
+
+        for tp, records in batches.items():
+            if limit is not None:
+                records = records[: limit - replayed]
+            if not records:
+                continue
+            deliveries = [
+                await producer.send(
+                    target or original_topic(record),
+                    record.key,
+                    record.value,
+                    original_headers(record),
+                    wait=False,
+                )
+                for record in records
+            ]
+            await asyncio.gather(*deliveries)
+            await consumer.commit({tp: records[-1].offset + 1})
+            replayed += len(records)
+            logger.info("Replayed %s records from %s", replayed, tp)
+    return replayed
+
+
+async def replay(
+    settings: Settings,
+    source: str,
+    limit: int | None = None,
+    target: str | None = None,
+    group_id: str = "dlq-replay",
+    idle_timeout: float = 5,
+) -> int:
+    consumer = AIOKafkaConsumer(
+        source,
+        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+        group_id=group_id,
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+        max_poll_records=settings.KAFKA_CONSUMER_MAX_RECORDS,
+    )
+    producer = KafkaProducer.from_settings(settings)
+    await producer.start()
+    try:
+        await consumer.start()
+        try:
+            return await replay_records(
+                consumer,
+                producer,
+                limit=limit,
+                target=target,
+                idle_timeout=idle_timeout,
+                max_records=settings.KAFKA_CONSUMER_MAX_RECORDS,
+            )
+        finally:
+            await consumer.stop()
+    finally:
+        await producer.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source", help="dead-letter topic, e.g. applications.dlq")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--target", default=None, help="override the original topic")
+    parser.add_argument("--group-id", default="dlq-replay")
+    parser.add_argument("--idle-timeout", type=float, default=5)
+    args = parser.parse_args()
+
+    configure_logging()
+    replayed = asyncio.run(
+        replay(
+            get_settings(),
+            args.source,
+            limit=args.limit,
+            target=args.target,
+            group_id=args.group_id,
+            idle_timeout=args.idle_timeout,
+        )
+    )
+    print(f"Replayed {replayed} records from {args.source}")
+
+
+if __name__ == "__main__":
+    main()
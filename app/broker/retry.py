@@ -0,0 +1,95 @@
+# Tiered retry topics and the dead-letter topic. A record whose handlers fail is forwarded to
+# `<topic>.retry.1`, which the consumer only processes once the first delay has passed, then to
+# `<topic>.retry.2` and so on; after the last tier it lands in `<topic>.dlq`. The source partition
+# commits past the failed record right away and keeps flowing, at the cost of later records of the
+# same key overtaking the failed one.
+import time
+from dataclasses import dataclass
+
+from aiokafka.structs import ConsumerRecord
+
+ORIGINAL_TOPIC_HEADER = "retry-original-topic"
+ATTEMPT_HEADER = "retry-attempt"
+NOT_BEFORE_HEADER = "retry-not-before"
+ERROR_HEADER = "retry-error"
+
+RETRY_HEADERS = (ORIGINAL_TOPIC_HEADER, ATTEMPT_HEADER, NOT_BEFORE_HEADER, ERROR_HEADER)
+
+
+def retry_topic(topic: str, tier: int) -> str:
+    return f"{topic}.retry.{tier}"
+
+
+def dead_letter_topic(topic: str) -> str:
+    return f"{topic}.dlq"
+
+
+def header(record: ConsumerRecord, name: str) -> bytes | None:
+    for key, value in record.headers or ():
+        if key == name:
+            return value
+    return None
+
+
+# a malformed header must not take down the partition worker, it reads as missing
+def int_header(record: ConsumerRecord, name: str) -> int | None:
+    value = header(record, name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def text_header(record: ConsumerRecord, name: str) -> str | None:
+    value = header(record, name)
+    try:
+        return value.decode() if value is not None else None
+    except UnicodeDecodeError:
+        return None
+
+
+def original_topic(record: ConsumerRecord) -> str:
+    return text_header(record, ORIGINAL_TOPIC_HEADER) or record.topic
+
+
+def attempt(record: ConsumerRecord) -> int:
+    return int_header(record, ATTEMPT_HEADER) or 0
+
+
+def not_before(record: ConsumerRecord) -> float:
+    """Epoch seconds before which a retry record must not be handled, 0 for regular records."""
+    value = int_header(record, NOT_BEFORE_HEADER)
+    return value / 1000 if value is not None else 0
+
+
+def original_headers(record: ConsumerRecord) -> list[tuple[str, bytes]]:
+    return [(key, value) for key, value in record.headers or () if key not in RETRY_HEADERS]
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    delays: tuple[float, ...] = (5, 60, 600)
+
+    def topics(self, topic: str) -> list[str]:
+        return [retry_topic(topic, tier) for tier in range(1, len(self.delays) + 1)]
+
+    def is_retry_topic(self, topic: str) -> bool:
+        return ".retry." in topic
+
+    def next_hop(
+        self, record: ConsumerRecord, error: BaseException
+    ) -> tuple[str, list[tuple[str, bytes]]]:
+        """Topic and headers the failed `record` is forwarded to."""
+        topic = original_topic(record)
+        tier = attempt(record) + 1
+        headers = original_headers(record) + [
+            (ORIGINAL_TOPIC_HEADER, topic.encode()),
+            (ATTEMPT_HEADER, str(tier).encode()),
+            (ERROR_HEADER, f"{type(error).__name__}: {error}"[:512].encode()),
+        ]
+        if tier > len(self.delays):
+            return dead_letter_topic(topic), headers
+
+        due = time.time() + self.delays[tier - 1]
+        headers.append((NOT_BEFORE_HEADER, str(int(due * 1000)).encode()))
+        return retry_topic(topic, tier), headers
@@ -0,0 +1,32 @@
+# Trace headers attached by `KafkaProducer.produce`: the time the event was written by the API and
+# the ID of the HTTP request that wrote it. `KafkaConsumer` reads them back to measure end-to-end
+# produce→consume latency and to log handler output under the originating request ID.
+import time
+from datetime import datetime, timezone
+
+from aiokafka.structs import ConsumerRecord
+
+from app.broker.retry import int_header, text_header
+
+PRODUCED_AT_HEADER = "produced-at"
+REQUEST_ID_HEADER = "request-id"
+
+
+def to_epoch_ms(moment: datetime | None = None) -> int:
+    if moment is None:
+        return int(time.time() * 1000)
+    if moment.tzinfo is None:
+        # naive datetimes in this project are UTC (datetime.utcnow defaults)
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def trace_headers(request_id: str | None, produced_at: datetime | None = None) -> list[tuple[str, bytes]]:
+    headers = [(PRODUCED_AT_HEADER, str(to_epoch_ms(produced_at)).encode())]
+    if request_id:
+        headers.append((REQUEST_ID_HEADER, request_id.encode()))
+    return headers
+
+
+def read_trace(record: ConsumerRecord) -> tuple[int | None, str | None]:
+    return int_header(record, PRODUCED_AT_HEADER), text_header(record, REQUEST_ID_HEADER)
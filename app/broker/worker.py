@@ -0,0 +1,176 @@
+"""
+    Standalone Kafka consumer worker. Runs N consumer processes, each with its own event loop and
+    its own member in the consumer group, and restarts any process that crashes. Consumer capacity
+    is then scaled independently of the API, which can turn its embedded consumer off through
+    `KAFKA_EMBEDDED_CONSUMER=false`.
+
+        python -m app.broker.worker --processes 4
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import signal
+import time
+from typing import Callable
+
+import uvicorn
+from aiokafka.errors import KafkaConnectionError
+from fastapi import FastAPI
+
+from app.broker.consumer import KafkaConsumer
+from app.monitoring.handlers import router as metrics_router
+from app.monitoring.tracing import configure_logging
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsServer(uvicorn.Server):
+    """Leaves SIGTERM and SIGINT to the worker instead of taking them over while it serves."""
+
+    @contextlib.contextmanager
+    def capture_signals(self):
+        yield
+
+
+def metrics_server(port: int) -> uvicorn.Server:
+    app = FastAPI()
+    app.include_router(metrics_router)
+    config = uvicorn.Config(app, host="0.0.0.0", port=port, log_level="warning")
+    return MetricsServer(config)
+
+
+async def serve_metrics(server: uvicorn.Server):
+    try:
+        await server.serve()
+    except (OSError, SystemExit) as e:
+        # uvicorn exits the process when the port cannot be bound, the worker keeps consuming
+        logger.error(f"Metrics server on port {server.config.port} failed: {e!r}")
+
+
+async def consume_until_stopped(index: int = 0, retries: int = 10, delay: float = 2):
+    settings = get_settings()
+    consumer = KafkaConsumer()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    for attempt in range(retries):
+        try:
+            await consumer.start()
+            break
+        except KafkaConnectionError as e:
+            logger.error(
+                f"Connection attempt {attempt + 1}/{retries} failed: {str(e)}")
+            await consumer.stop()
+            if attempt == retries - 1:
+                raise RuntimeError(
+                    "Failed to connect to Kafka after multiple attempts"
+                ) from e
+            await asyncio.sleep(delay)
+
+    server = None
+    if settings.KAFKA_WORKER_METRICS_PORT:
+        server = metrics_server(settings.KAFKA_WORKER_METRICS_PORT + index)
+        serving = asyncio.create_task(serve_metrics(server))
+
+    logger.info("Consumer worker started")
+    await stop.wait()
+    await consumer.stop()
+    if server:
+        server.should_exit = True
+        await serving
+    logger.info("Consumer worker stopped")
+
+
+def run_consumer_process(index: int):
+    configure_logging(
+        fmt=f"%(asctime)s [worker-{index}] %(levelname)s [%(request_id)s] %(name)s: %(message)s",
+    )
+    asyncio.run(consume_until_stopped(index))
+
+
+class WorkerSupervisor:
+    def __init__(
+        self,
+        processes: int,
+        restart_delay: float = 1.0,
+        target: Callable[[int], None] = run_consumer_process,
+        context=None,
+    ):
+        self.processes = processes
+        self.restart_delay = restart_delay
+        self.target = target
+        self.context = context or multiprocessing.get_context("spawn")
+        self.workers: dict[int, multiprocessing.Process] = {}
+        self.restart_at: dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self, index: int):
+        process = self.context.Process(
+            target=self.target, args=(index,), name=f"consumer-worker-{index}"
+        )
+        process.start()
+        self.workers[index] = process
+        logger.info("Started consumer worker %s (pid %s)", index, process.pid)
+
+    def start(self):
+        for index in range(self.processes):
+            self.spawn(index)
+
+    def check(self, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        for index, process in list(self.workers.items()):
+            if process.is_alive():
+                continue
+            if index not in self.restart_at:
+                logger.error(
+                    "Consumer worker %s exited with code %s, restarting in %ss",
+                    index, process.exitcode, self.restart_delay,
+                )
+                self.restart_at[index] = now + self.restart_delay
+            if now >= self.restart_at[index]:
+                del self.restart_at[index]
+                self.spawn(index)
+
+    def stop(self, timeout: float = 30):
+        self.stopping = True
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.workers.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+
+    def run(self, interval: float = 0.5):
+        def request_stop(signum, frame):
+            self.stopping = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        self.start()
+        while not self.stopping:
+            self.check()
+            time.sleep(interval)
+        self.stop()
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=settings.KAFKA_WORKER_PROCESSES)
+    parser.add_argument(
+        "--restart-delay", type=float, default=settings.KAFKA_WORKER_RESTART_DELAY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    WorkerSupervisor(args.processes, args.restart_delay).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,41 +10,57 @@
 import logging
 
 from fastapi import Depends, Request
-from motor.motor_asyncio import AsyncIOMotorClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.applications import ApplicationService
 from app.applications.repository import ApplicationRepository
-from app.mongo import UserLogService
+from app.mongo import LogPolicies, UserLogService
+from app.mongo.analytics import UserLogAnalytics
+from app.broker.events import TopicRouter
 from app.broker.producer import KafkaProducer
 from app.image_upload.repository import ImageRepository
 from app.image_upload.service import ImageService
 from app.infrastructure.database import get_db_connection
+from app.outbox import OutboxRepository
 from app.settings import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
+user_log_policies = LogPolicies.from_settings(settings)
 
 
 async def get_log_service(request: Request) -> UserLogService:
-    client = AsyncIOMotorClient(
-        settings.MONGODB_URL, uuidRepresentation='standard')
-    collection = client.get_database('user_logs').get_collection('user_logs')
+    # the client and the buffered writer are created once in app.main.lifespan
+    collection = request.app.mongodb.get_collection('user_logs')
+
+    return UserLogService(
+        collection,
+        writer=getattr(request.app, "user_log_writer", None),
+        policies=user_log_policies,
+        aggregator=getattr(request.app, "user_log_aggregator", None),
+    )
+
+
+async def get_user_log_analytics(request: Request) -> UserLogAnalytics:
+    return UserLogAnalytics(request.app.mongodb.get_collection('user_logs'))
 
-    return UserLogService(collection)
 
+async def get_kafka_producer(request: Request) -> KafkaProducer:
+    # one producer per process, started in app.main.lifespan
+    return request.app.kafka_producer
 
-async def get_kafka_producer() -> KafkaProducer:
-    producer = KafkaProducer(
-        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS)
-    await producer.start()
-    return producer
+
+async def get_outbox_repository() -> OutboxRepository | None:
+    if not settings.OUTBOX_ENABLED:
+        return None
+    return OutboxRepository(router=TopicRouter.from_settings(settings))
 
 
 async def get_application_repository(
         db_session: AsyncSession = Depends(get_db_connection),
+        outbox: OutboxRepository | None = Depends(get_outbox_repository),
 ) -> ApplicationRepository:
-    return ApplicationRepository(db_session=db_session)
+    return ApplicationRepository(db_session=db_session, outbox=outbox)
 
 
 async def get_application_service(
@@ -58,13 +74,17 @@ async def get_application_service(
         kafka_producer=kafka_producer,
         logger=logger,
         user_log_service=user_log_service,
+        publish_via_outbox=settings.OUTBOX_ENABLED,
     )
 
 
 async def get_image_upload_repository(
         db_session: AsyncSession = Depends(get_db_connection),
+        outbox: OutboxRepository | None = Depends(get_outbox_repository),
 ) -> ImageRepository:
-    return ImageRepository(db_session=db_session, upload_dir=settings.IMAGE_UPLOAD_DIR)
+    return ImageRepository(
+        db_session=db_session, upload_dir=settings.IMAGE_UPLOAD_DIR, outbox=outbox
+    )
 
 
 async def get_image_upload_service(
@@ -77,5 +97,6 @@ async def get_image_upload_service(
         image_repository=image_upload_repository,
         kafka_producer=kafka_producer,
         logger=logger,
-        user_log_service=user_log_service
+        user_log_service=user_log_service,
+        publish_via_outbox=settings.OUTBOX_ENABLED,
     )
@@ -22,6 +22,14 @@ class ApplicationNotFound(BaseAppError):
         super().__init__(message)
 
 
+class InvalidCursorError(BaseAppError):
+    """Exception raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super().__init__(f"Invalid pagination cursor: {cursor!r}")
+
+
 class ImageUploadError(Exception):
     """Base exception for all image upload errors."""
 
@@ -89,6 +97,10 @@ class KafkaImageDataUploadError(KafkaError):
     default_message = "Failed to send image data"
 
 
+class CodecNotFoundError(KafkaError):
+    default_message = "Unknown message codec."
+
+
 class CrudException(HTTPException):
     def __init__(
             self,
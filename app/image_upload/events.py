@@ -0,0 +1,31 @@
+# Event published for an uploaded image, shared by the direct publish path in `ImageService` and the
+# outbox write in `ImageRepository`. Partitioned by user so a user's events stay ordered.
+import datetime
+from typing import Literal
+from uuid import UUID
+
+from app.broker.events import EventEnvelope
+from app.image_upload.models import ImageUploadModel
+
+
+class ImageUploaded(EventEnvelope):
+    type: Literal["image.uploaded"] = "image.uploaded"
+    version: Literal[1] = 1
+    id: int
+    filename: str
+    size: float
+    upload_date: datetime.datetime
+    user_id: UUID
+
+    def partition_key(self) -> str:
+        return str(self.user_id)
+
+
+def image_uploaded_event(image: ImageUploadModel, user_id: UUID) -> ImageUploaded:
+    return ImageUploaded(
+        id=image.id,
+        filename=image.filename,
+        size=image.size,
+        upload_date=image.upload_date,
+        user_id=user_id,
+    )
@@ -7,20 +7,29 @@ from typing import Any
 from uuid import UUID
 
 import aiofiles
-from sqlalchemy import select
+from fastapi import HTTPException
+from sqlalchemy import delete, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.image_upload import ImageUploadModel
-from app.exceptions import RepositoryError
+from app.image_upload.events import image_uploaded_event
+from app.infrastructure.database.routing import replica_read
+from app.outbox import OutboxRepository
 
 logger = logging.getLogger(__name__)
 
 
 class ImageRepository:
-    def __init__(self, db_session: AsyncSession, upload_dir: str):
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        upload_dir: str,
+        outbox: OutboxRepository | None = None,
+    ):
         self.db_session = db_session
         self.upload_dir = upload_dir
+        self.outbox = outbox
         self.logger = logger
 
     async def upload_image(self, image: Any, user_id: UUID) -> ImageUploadModel:
@@ -41,6 +50,11 @@ class ImageRepository:
             )
 
             self.db_session.add(image)
+            if self.outbox:
+                await self.db_session.flush()
+                await self.outbox.add_event(
+                    self.db_session, image_uploaded_event(image, user_id)
+                )
             await self.db_session.commit()
             await self.db_session.refresh(image)
             self.logger.info(
@@ -61,6 +75,7 @@ class ImageRepository:
             await self.db_session.rollback()
             raise
 
+    @replica_read
     async def get_image_by_id(self, image_id: int) -> ImageUploadModel | None:
         try:
             result = await self.db_session.execute(
@@ -80,32 +95,22 @@ class ImageRepository:
 
     async def delete_image_by_id(self, image_id: int | UUID, user_id: UUID) -> None:
         try:
-            image = await self.db_session.execute(
-                select(ImageUploadModel).where(
-                    ImageUploadModel.id == image_id, ImageUploadModel.user_id == user_id
-                )
+            # one round trip: the ownership check is part of the statement and the filename to
+            # remove comes back with it
+            result = await self.db_session.execute(
+                delete(ImageUploadModel)
+                .where(ImageUploadModel.id == image_id, ImageUploadModel.user_id == user_id)
+                .returning(ImageUploadModel.filename)
             )
-            image_model = image.scalar_one_or_none()
-            if not image_model:
+            filename = result.scalar_one_or_none()
+            if filename is None:
                 self.logger.error(
                     "Image not found",
                     extra={"image_id": image_id},
                 )
-
-            file_path = os.path.join(self.upload_dir, image_model.filename)
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except OSError as e:
-                self.logger.error(
-                    "File deletion failed",
-                    extra={"image_id": image_id, "error": str(e)},
-                )
-            await self.db_session.delete(image_model)
+                raise HTTPException(
+                    status_code=404, detail="Image not found or access denied")
             await self.db_session.commit()
-
-            self.logger.info("Image deleted successfully",
-                             extra={"image_id": image_id})
         except SQLAlchemyError as e:
             self.logger.error(
                 "Database error during image deletion",
@@ -115,9 +120,15 @@ class ImageRepository:
             await self.db_session.rollback()
             raise
 
-        except RepositoryError as e:
+        # the file goes only once the row is gone
+        file_path = os.path.join(self.upload_dir, filename)
+        try:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        except OSError as e:
             self.logger.error(
-                "Delete attempt for non-existent image",
+                "File deletion failed",
                 extra={"image_id": image_id, "error": str(e)},
             )
-            raise
+        self.logger.info("Image deleted successfully",
+                         extra={"image_id": image_id})
@@ -17,6 +17,8 @@ class ImageCreate(ImageCreateBase):
 class ImageResponse(ImageCreateBase):
     id: int
     upload_date: datetime
+    # True means "accepted" (queued) or "delivered" (acked by the broker),
+    # depending on KAFKA_PRODUCER_DELIVERY_MODE
     kafka_status: bool
 
     class Config:
@@ -8,12 +8,17 @@ from uuid import UUID
 from fastapi import HTTPException
 
 from app.broker.producer import KafkaProducer
-from app.exceptions import KafkaImageDataUploadError, RecordMongoException, ImageUploadError
+from app.exceptions import (
+    KafkaImageDataUploadError,
+    KafkaMessageError,
+    RecordMongoException,
+    ImageUploadError,
+)
 from app.mongo import UserLogService
+from app.image_upload.events import image_uploaded_event
 from app.image_upload.models import ImageUploadModel
 from app.image_upload.repository import ImageRepository
 from app.image_upload.schemas import ImageResponse
-from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +29,8 @@ class ImageService:
     kafka_producer: KafkaProducer
     logger: logger  # type: ignore
     user_log_service: UserLogService
+    # the repository commits the event to the outbox, the relay publishes it
+    publish_via_outbox: bool = False
 
     async def upload_image(
         self,
@@ -40,25 +47,16 @@ class ImageService:
                 "Error during data record, MongoDB: {}".format(e))
             raise
 
-        kafka_produce_message = {
-            "id": uploaded_image.id,
-            "filename": uploaded_image.filename,
-            "size": uploaded_image.size,
-            "upload_date": uploaded_image.upload_date,
-            "user_id": str(user_id),
-        }
-
-        try:
-            await self.kafka_producer.produce(
-                topic=settings.KAFKA_TOPIC,
-                key=str(uploaded_image.id),
-                value=kafka_produce_message,
-            )
-            kafka_produce_status = True
-        except KafkaImageDataUploadError as e:
-            self.logger.error(
-                "Fail while kafka producing error", extra={"error": str(e)})
-            kafka_produce_status = False
+        kafka_produce_status = self.publish_via_outbox
+        if not self.publish_via_outbox:
+            try:
+                await self.kafka_producer.publish(
+                    image_uploaded_event(uploaded_image, user_id)
+                )
+                kafka_produce_status = True
+            except (KafkaImageDataUploadError, KafkaMessageError) as e:
+                self.logger.error(
+                    "Fail while kafka producing error", extra={"error": str(e)})
 
         return ImageResponse(
             id=uploaded_image.id,
@@ -86,8 +84,9 @@ class ImageService:
             )
             await self.user_log_service.log_endpoint_call(endpoint="delete_image", user_id=user_id)
             return {"msg": f"Image {image_id} deleted successfully"}
-        except HTTPException as e:
-            raise e(status_code=404, detail="Image not found or access denied")
+        except HTTPException:
+            # the repository's 404
+            raise
         except RecordMongoException as e:
             self.logger.error(
                 "Error during data record, MongoDB: {}".format(e))
@@ -0,0 +1,649 @@
+# Repository caching on top of the fastapi-cache backend initialised in the app lifespan. Keys are
+# built only from the arguments that select the data, never from the repository instance or the
+# `AsyncSession`, and every entry is registered under tags so writes evict exactly what they change:
+#
+#     @cached(expire=120, namespace="applications", tags=lambda title: [f"applications:title:{title}"])
+#     async def get_application_by_title(self, title: str) -> list[ApplicationSchema]: ...
+#
+#     await invalidate_tags(f"applications:title:{title}")
+#
+# Values are encoded and decoded through a TypeAdapter of the return annotation, so a hit returns the
+# same type as a miss; functions without one fall back to the fastapi-cache coder.
+#
+# `result_tags` adds tags computed from the loaded value, e.g. the ids of the rows a lookup returned,
+# so a write can evict every entry containing a row without knowing how the entry was looked up.
+#
+# A fill is only stored if none of its tags was invalidated while it loaded: `invalidate_tags` bumps
+# a generation counter per tag, the fill reads them before loading and stores through a Redis
+# compare-and-set, so a value read before a write never lands after the write's invalidation.
+#
+# `invalidate_tags` also records when each tag was last invalidated. A fill of a `@replica_read`
+# method loads from the primary if one of its tags was invalidated within `replica_staleness`
+# seconds, since a replica may not have replayed that write yet, and from a replica otherwise.
+# Requests pinned to the primary by read-your-writes bypass the cache, see
+# app.infrastructure.database.routing.
+#
+# With `near=True` the value is also kept in the in-process tier of app.infrastructure.near_cache.
+# Concurrent misses of one key share a single load (optionally across processes through a short
+# Redis lock), and `early_refresh=True` recomputes hot keys shortly before they expire.
+#
+# `cached_response` caches one level up, the final JSON body of a read endpoint, so a hit skips the
+# service, the decoding and the response model validation.
+import asyncio
+import gzip
+import hashlib
+import inspect
+import logging
+import math
+import random
+import time
+import typing
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from fastapi import Request, Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.cache_metrics import (
+    backend_seconds,
+    coalesced,
+    early_refreshes,
+    evictions,
+    loads,
+    lookups,
+    value_bytes,
+)
+from app.infrastructure.database.routing import pinned_to_primary, primary_reads
+from app.infrastructure.near_cache import encode_tags, near_cache
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+TagsBuilder = Callable[..., Iterable[str]]
+ResultTagsBuilder = Callable[[Any], Iterable[str]]
+
+# invalidate_tags also bumps this one, it guards entries whose tags are only known after loading
+EVERY_TAG = "*"
+# generation counters only have to outlive the loads that read them
+GENERATION_TTL = 86400
+
+# KEYS: entry, the generation keys read before loading, the tag sets; ARGV: value, expire, number
+# of generation keys, their expected values ("" for a counter that did not exist)
+STORE_SCRIPT = """
+local guarded = tonumber(ARGV[3])
+for i = 1, guarded do
+    local current = redis.call("get", KEYS[1 + i]) or ""
+    if current ~= ARGV[3 + i] then
+        return 0
+    end
+end
+redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[2])
+for i = guarded + 2, #KEYS do
+    redis.call("sadd", KEYS[i], KEYS[1])
+    redis.call("expire", KEYS[i], ARGV[2])
+end
+return 1
+"""
+
+# compare-and-delete, so a lock that expired and was taken over is not released by its old owner
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class CacheOptions:
+    # SET NX lock so only one process fills a missing key, the others poll for the value
+    distributed_lock: bool = False
+    lock_ttl: float = 5.0
+    lock_poll_interval: float = 0.05
+    # XFetch: recompute when `now - load_time * beta * ln(rand) >= expiry`, larger is earlier
+    early_refresh_beta: float = 1.0
+    # cached_response: serve stored response bodies, gzipped from this size on (0 never)
+    response_cache: bool = True
+    response_compress_min_bytes: int = 1024
+    # seconds after an invalidation during which fills of its tags read from the primary
+    replica_staleness: float = math.inf
+
+
+options = CacheOptions()
+
+# cache key -> load shared by the concurrent misses of this process
+_inflight: dict[str, asyncio.Future] = {}
+# function -> duration of its last load, the `delta` of the early refresh
+_load_seconds: dict[str, float] = {}
+
+_refreshing: ContextVar[bool] = ContextVar("cache_refreshing", default=False)
+
+
+@contextmanager
+def refreshing():
+    """Inside the block `cached` reads reload and overwrite their entries instead of reading them."""
+    token = _refreshing.set(True)
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+
+def configure_cache(settings: Settings):
+    options.distributed_lock = settings.CACHE_DISTRIBUTED_LOCK
+    options.lock_ttl = settings.CACHE_LOCK_TTL
+    options.early_refresh_beta = settings.CACHE_EARLY_REFRESH_BETA
+    options.response_cache = settings.CACHE_RESPONSE_ENABLED
+    options.response_compress_min_bytes = settings.CACHE_RESPONSE_COMPRESS_MIN_BYTES
+    # a replica is taken out once a health check sees it lag more than DB_REPLICA_MAX_LAG_SECONDS,
+    # until then it can fall one more check interval behind
+    if settings.DB_REPLICA_URLS and settings.DB_REPLICA_MAX_LAG_SECONDS:
+        options.replica_staleness = (
+            settings.DB_REPLICA_MAX_LAG_SECONDS + settings.DB_REPLICA_HEALTH_INTERVAL)
+    else:
+        options.replica_staleness = math.inf
+    near_cache.max_entries = settings.CACHE_NEAR_MAX_ENTRIES
+    near_cache.ttl = settings.CACHE_NEAR_TTL
+
+# tag -> keys, tag -> generation and tag -> last invalidation, for backends without native sets
+# (the in-memory backend used in tests)
+_local_tags: dict[str, set[str]] = {}
+_local_generations: dict[str, int] = {}
+_local_invalidated: dict[str, float] = {}
+
+
+def _is_context(name: str, value: Any) -> bool:
+    # the repository itself and the session do not select any data
+    return (
+        name in ("self", "cls")
+        or isinstance(value, AsyncSession)
+        or hasattr(value, "db_session")
+    )
+
+
+def cache_arguments(func: Callable, args: tuple, kwargs: dict) -> dict[str, Any]:
+    bound = inspect.signature(func).bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    return {
+        name: value for name, value in bound.arguments.items() if not _is_context(name, value)
+    }
+
+
+def _return_adapter(func: Callable) -> TypeAdapter | None:
+    annotation = typing.get_type_hints(func).get("return")
+    return _adapter(annotation) if annotation is not None else None
+
+
+def repository_key_builder(
+    func: Callable,
+    namespace: str = "",
+    *,
+    request: Any = None,
+    response: Any = None,
+    args: tuple = (),
+    kwargs: Optional[dict] = None,
+) -> str:
+    """fastapi-cache compatible key builder that ignores sessions and repositories."""
+    arguments = cache_arguments(func, args, kwargs or {})
+    digest = hashlib.md5(repr(sorted(arguments.items())).encode()).hexdigest()  # noqa: S324
+    return f"{namespace}:{func.__qualname__}:{digest}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}:tag:{tag}"
+
+
+def _generation_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}:gen:{tag}"
+
+
+def _invalidated_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}:invalidated:{tag}"
+
+
+def invalidation_channel() -> str:
+    return f"{FastAPICache.get_prefix()}:invalidate"
+
+
+@dataclass
+class FillGuard:
+    """Read before loading a value: the generation of each tag and its latest invalidation time."""
+
+    generations: dict[str, str]
+    invalidated_at: float = 0.0
+
+    @property
+    def recent(self) -> bool:
+        # a replica may not have replayed the write behind an invalidation this recent
+        return time.time() - self.invalidated_at < options.replica_staleness
+
+
+async def fill_guard(tags: Iterable[str], every: bool = False) -> FillGuard | None:
+    """
+    The guard of a fill of `tags`, None if it cannot be read. `every` also guards against any other
+    invalidation, for entries whose tags are only known after loading.
+    """
+    tags = tuple(dict.fromkeys(tags))
+    guarded = tags + ((EVERY_TAG,) if every else ())
+    if not guarded:
+        return FillGuard({})
+    backend = FastAPICache.get_backend()
+    started = time.perf_counter()
+    try:
+        if isinstance(backend, RedisBackend):
+            keys = [_generation_key(tag) for tag in guarded]
+            keys += [_invalidated_key(tag) for tag in tags]
+            values = await backend.redis.mget(keys)
+            generations = {
+                tag: value.decode() if value else "" for tag, value in zip(guarded, values)}
+            invalidated = [float(value) for value in values[len(guarded):] if value]
+        else:
+            generations = {
+                tag: str(_local_generations.get(_generation_key(tag), "")) for tag in guarded}
+            invalidated = [
+                _local_invalidated[key] for key in map(_invalidated_key, tags)
+                if key in _local_invalidated
+            ]
+        return FillGuard(generations, max(invalidated, default=0.0))
+    except Exception as e:
+        logger.warning(f"Error reading cache generations of {guarded}: {e}")
+        return None
+    finally:
+        backend_seconds.observe(time.perf_counter() - started, op="generations")
+
+
+async def _fill(
+    load: Callable[[], Awaitable[Any]],
+    guard: FillGuard | None,
+    result_tags: Optional[ResultTagsBuilder] = None,
+) -> Any:
+    """Run `load` for a fill, on the primary if a replica may still miss a write to its tags."""
+    if guard is None or guard.recent:
+        with primary_reads():
+            return await load()
+    result = await load()
+    if result_tags:
+        # the tags of the result were unknown before loading
+        loaded = await fill_guard(result_tags(result))
+        if loaded is None or loaded.recent:
+            with primary_reads():
+                result = await load()
+    return result
+
+
+async def _store(
+    key: str, value: bytes, expire: int, tags: Iterable[str], guard: FillGuard | None
+) -> bool:
+    """Store `value` unless a tag of `guard` was invalidated since its generations were read."""
+    if guard is None:
+        return False
+    started = time.perf_counter()
+    try:
+        stored = await _write(key, value, expire, tuple(tags), guard.generations)
+    finally:
+        backend_seconds.observe(time.perf_counter() - started, op="set")
+    if not stored:
+        evictions.inc(tier="remote", reason="stale_fill")
+    return stored
+
+
+async def _write(
+    key: str, value: bytes, expire: int, tags: tuple[str, ...], guard: dict[str, str]
+) -> bool:
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, RedisBackend):
+        # check, value and tag registrations in one atomic round trip; a tag outlives its entries
+        guarded = list(guard)
+        keys = [key, *(_generation_key(tag) for tag in guarded), *(_tag_key(tag) for tag in tags)]
+        stored = await backend.redis.eval(
+            STORE_SCRIPT, len(keys), *keys,
+            value, int(expire), len(guarded), *(guard[tag] for tag in guarded),
+        )
+        return bool(stored)
+    if any(
+        str(_local_generations.get(_generation_key(tag), "")) != generation
+        for tag, generation in guard.items()
+    ):
+        return False
+    await backend.set(key, value, expire)
+    for tag in tags:
+        _local_tags.setdefault(_tag_key(tag), set()).add(key)
+    return True
+
+
+async def invalidate_tags(*tags: str) -> int:
+    """Evict every entry registered under any of `tags`. Never raises, a failed eviction is logged."""
+    if not tags:
+        return 0
+    near_cache.invalidate(tags)
+    started = time.perf_counter()
+    try:
+        backend = FastAPICache.get_backend()
+        tag_keys = [_tag_key(tag) for tag in tags]
+        # bumped before the tag sets are read: a fill stored earlier is in the sets and deleted
+        # below, a fill stored later fails its generation check
+        generation_keys = [_generation_key(tag) for tag in (*tags, EVERY_TAG)]
+        now = time.time()
+        if isinstance(backend, RedisBackend):
+            async with backend.redis.pipeline(transaction=False) as pipe:
+                for generation_key in generation_keys:
+                    pipe.incr(generation_key)
+                    pipe.expire(generation_key, GENERATION_TTL)
+                for tag in tags:
+                    pipe.set(_invalidated_key(tag), repr(now), ex=GENERATION_TTL)
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                replies = await pipe.execute()
+            members = replies[-len(tag_keys):]
+            keys = {key for keys in members for key in keys}
+            async with backend.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys, *tag_keys)
+                # the other replicas drop the tags from their near cache
+                pipe.publish(invalidation_channel(), encode_tags(tags))
+                await pipe.execute()
+            evictions.inc(len(keys), tier="remote", reason="invalidated")
+            return len(keys)
+
+        for generation_key in generation_keys:
+            _local_generations[generation_key] = _local_generations.get(generation_key, 0) + 1
+        for tag in tags:
+            _local_invalidated[_invalidated_key(tag)] = now
+        keys = set().union(*(_local_tags.pop(tag_key, set()) for tag_key in tag_keys))
+        for key in keys:
+            try:
+                await backend.clear(key=key)
+            except KeyError:
+                # already expired
+                pass
+        evictions.inc(len(keys), tier="remote", reason="invalidated")
+        return len(keys)
+    except Exception as e:
+        logger.warning(f"Cache invalidation of {tags} failed: {e}")
+        return 0
+    finally:
+        backend_seconds.observe(time.perf_counter() - started, op="invalidate")
+
+
+def should_refresh_early(ttl: float, load_seconds: float, beta: float) -> bool:
+    """Probabilistic early expiration: likelier the closer `ttl` gets to zero and the slower the load."""
+    if ttl <= 0 or load_seconds <= 0 or beta <= 0:
+        return False
+    return -load_seconds * beta * math.log(1.0 - random.random()) >= ttl
+
+
+async def _get(key: str, with_ttl: bool) -> tuple[bytes | None, float]:
+    backend = FastAPICache.get_backend()
+    started = time.perf_counter()
+    try:
+        if with_ttl:
+            ttl, value = await backend.get_with_ttl(key)
+            return value, ttl
+        return await backend.get(key), 0
+    except Exception as e:
+        logger.warning(f"Error retrieving cache key '{key}': {e}")
+        return None, 0
+    finally:
+        backend_seconds.observe(time.perf_counter() - started, op="get")
+
+
+async def _single_flight(key: str, load, prefix: str = ""):
+    """Run `load` once for all concurrent callers of `key` in this process."""
+    flight = _inflight.get(key)
+    if flight is not None:
+        coalesced.inc(prefix=prefix, scope="process")
+        value = await asyncio.shield(flight)
+        if value is not None:
+            return None, value
+        # the loading request was cancelled, load on our own
+
+    flight = asyncio.get_running_loop().create_future()
+    # mark a failure as retrieved when nobody else was waiting for it
+    flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight[key] = flight
+    try:
+        result, value = await load()
+    except Exception as e:
+        flight.set_exception(e)
+        raise
+    except BaseException:
+        flight.set_result(None)
+        raise
+    else:
+        flight.set_result(value)
+        return result, value
+    finally:
+        _inflight.pop(key, None)
+
+
+async def _locked(key: str, load, stale: bytes | None, prefix: str = ""):
+    """Across processes: fill `key` under a short redis lock, or wait for whoever holds it."""
+    backend = FastAPICache.get_backend()
+    if not options.distributed_lock or not isinstance(backend, RedisBackend):
+        return await load()
+
+    lock_key, token = f"{key}:lock", uuid.uuid4().hex
+    try:
+        acquired = await backend.redis.set(
+            lock_key, token, nx=True, px=int(options.lock_ttl * 1000))
+    except Exception as e:
+        logger.warning(f"Error acquiring cache lock '{lock_key}': {e}")
+        return await load()
+    if acquired:
+        try:
+            return await load()
+        finally:
+            try:
+                await backend.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.warning(f"Error releasing cache lock '{lock_key}': {e}")
+
+    coalesced.inc(prefix=prefix, scope="cluster")
+    if stale is not None:
+        # another process is refreshing early, the current value is still valid
+        return None, stale
+    deadline = time.monotonic() + options.lock_ttl
+    while time.monotonic() < deadline:
+        await asyncio.sleep(options.lock_poll_interval)
+        value, _ = await _get(key, with_ttl=False)
+        if value:
+            return None, value
+    # the holder died or is too slow
+    return await load()
+
+
+def cached(
+    expire: Optional[int] = None,
+    namespace: str = "",
+    tags: Optional[TagsBuilder] = None,
+    near: bool = False,
+    early_refresh: bool = False,
+    result_tags: Optional[ResultTagsBuilder] = None,
+):
+    """
+    Cache the decorated coroutine's result in the fastapi-cache backend. `tags` receives the cache
+    arguments (everything except the repository and the session) as keyword arguments, `result_tags`
+    the loaded result. With `near` hot entries are also served from the in-process tier, with
+    `early_refresh` they are recomputed before they expire.
+    """
+    if near and result_tags:
+        # a near entry filled from a remote hit would miss the tags of the result
+        raise ValueError("result_tags cannot be combined with near")
+
+    def wrapper(func):
+        adapter = _return_adapter(func)
+
+        def encode(result: Any) -> tuple[Any, bytes]:
+            if adapter is None:
+                return result, FastAPICache.get_coder().encode(result)
+            result = adapter.validate_python(result, from_attributes=True)
+            return result, adapter.dump_json(result)
+
+        def decode(value: bytes) -> Any:
+            if adapter is None:
+                return FastAPICache.get_coder().decode(value)
+            return adapter.validate_json(value)
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            if not FastAPICache.get_enable() or pinned_to_primary():
+                return await func(*args, **kwargs)
+
+            arguments = cache_arguments(func, args, kwargs)
+            prefix = f"{namespace}:{func.__qualname__}"
+            key = repository_key_builder(
+                func, f"{FastAPICache.get_prefix()}:{namespace}", args=args, kwargs=kwargs)
+            use_near = near and near_cache.enabled
+            reload = _refreshing.get()
+            if use_near and not reload:
+                value = near_cache.get(key)
+                lookups.inc(prefix=prefix, tier="near", result="hit" if value else "miss")
+                if value:
+                    return decode(value)
+            version = near_cache.version
+            entry_tags = tuple(tags(**arguments)) if tags else ()
+
+            value, ttl = None, 0
+            if not reload:
+                value, ttl = await _get(key, with_ttl=early_refresh)
+                lookups.inc(prefix=prefix, tier="remote", result="hit" if value else "miss")
+            stale = None
+            if value and early_refresh and should_refresh_early(
+                ttl, _load_seconds.get(func.__qualname__, 0), options.early_refresh_beta
+            ):
+                early_refreshes.inc(prefix=prefix)
+                value, stale = None, value
+            if value:
+                if use_near:
+                    near_cache.set(key, value, entry_tags, version)
+                return decode(value)
+
+            async def load():
+                guard = await fill_guard(entry_tags, every=bool(result_tags))
+                started = time.perf_counter()
+                result = await _fill(lambda: func(*args, **kwargs), guard, result_tags)
+                _load_seconds[func.__qualname__] = time.perf_counter() - started
+                loads.observe(_load_seconds[func.__qualname__], prefix=prefix)
+                result, encoded = encode(result)
+                value_bytes.observe(len(encoded), prefix=prefix)
+                stored_tags = entry_tags + tuple(result_tags(result)) if result_tags else entry_tags
+                try:
+                    await _store(
+                        key, encoded, expire or FastAPICache.get_expire(), stored_tags, guard)
+                except Exception as e:
+                    logger.warning(f"Error setting cache key '{key}': {e}")
+                return result, encoded
+
+            result, value = await _single_flight(
+                key, lambda: _locked(key, load, stale, prefix), prefix)
+            if use_near:
+                near_cache.set(key, value, entry_tags, version)
+            return result if result is not None else decode(value)
+
+        return inner
+
+    return wrapper
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def encode_body(value: Any, model: Any, compress_min_bytes: int = 0) -> bytes:
+    """The response body of `value` as FastAPI would send it, gzipped from `compress_min_bytes` on."""
+    adapter = _adapter(model)
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    if 0 < compress_min_bytes <= len(body):
+        return gzip.compress(body, compresslevel=5)
+    return body
+
+
+def body_response(body: bytes, accept_encoding: str = "") -> Response:
+    if body[:2] != GZIP_MAGIC:
+        return Response(body, media_type="application/json")
+    if "gzip" in accept_encoding:
+        return Response(
+            body,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(gzip.decompress(body), media_type="application/json")
+
+
+async def cached_response(
+    request: Request,
+    load: Callable[[], Awaitable[Any]],
+    model: Any,
+    *,
+    tags: Iterable[str] = (),
+    expire: Optional[int] = None,
+    namespace: str = "responses",
+    on_hit: Optional[Callable[[], Awaitable[Any]]] = None,
+    result_tags: Optional[ResultTagsBuilder] = None,
+) -> Any:
+    """
+    Cache the serialized body of a read endpoint. A hit returns the stored bytes as the response
+    without running `load` or any Pydantic validation; `on_hit` runs instead (e.g. the audit log).
+    `result_tags` adds tags computed from what `load` returned.
+    """
+    if not options.response_cache or not FastAPICache.get_enable() or pinned_to_primary():
+        return await load()
+
+    # the route template, not the path: /applications/{application_id} is one prefix
+    route = getattr(request.scope.get("route"), "path", request.url.path)
+    prefix = f"{namespace}:{route}"
+    query = sorted(request.query_params.multi_items())
+    digest = hashlib.md5(f"{request.url.path}?{query}".encode()).hexdigest()  # noqa: S324
+    key = f"{FastAPICache.get_prefix()}:{namespace}:{digest}"
+    accept_encoding = request.headers.get("accept-encoding", "")
+    tags = tuple(tags)
+
+    body = None
+    if near_cache.enabled:
+        body = near_cache.get(key)
+        lookups.inc(prefix=prefix, tier="near", result="hit" if body else "miss")
+    version = near_cache.version
+    if not body:
+        body, _ = await _get(key, with_ttl=False)
+        lookups.inc(prefix=prefix, tier="remote", result="hit" if body else "miss")
+    if body:
+        if not result_tags:
+            # the tags of the result are only known to the process that loaded it
+            near_cache.set(key, body, tags, version)
+        if on_hit:
+            await on_hit()
+        return body_response(body, accept_encoding)
+
+    async def fill():
+        guard = await fill_guard(tags, every=bool(result_tags))
+        started = time.perf_counter()
+        result = await _fill(load, guard, result_tags)
+        encoded = encode_body(result, model, options.response_compress_min_bytes)
+        loads.observe(time.perf_counter() - started, prefix=prefix)
+        value_bytes.observe(len(encoded), prefix=prefix)
+        entry_tags = tags + tuple(result_tags(result)) if result_tags else tags
+        try:
+            await _store(key, encoded, expire or FastAPICache.get_expire(), entry_tags, guard)
+        except Exception as e:
+            logger.warning(f"Error setting cache key '{key}': {e}")
+        return entry_tags, encoded
+
+    entry_tags, body = await _single_flight(
+        key, lambda: _locked(key, fill, None, prefix), prefix)
+    loaded = entry_tags is not None
+    if loaded or not result_tags:
+        near_cache.set(key, body, entry_tags if loaded else tags, version)
+    if not loaded and on_hit:
+        # served by a load another request ran
+        await on_hit()
+    return body_response(body, accept_encoding)
@@ -0,0 +1,67 @@
+# Cache metrics shared by `cached`, `cached_response` and the near cache, labelled by key prefix
+# (`<namespace>:<function>` or `responses:<route>`), exposed through /metrics and summarised per
+# prefix by `cache_report` for /metrics/cache.
+from app.monitoring.metrics import registry
+
+lookups = registry.counter(
+    "cache_lookups_total", "Cache lookups per key prefix, tier and result",
+    ("prefix", "tier", "result"))
+loads = registry.histogram(
+    "cache_load_seconds", "Time to compute a missing entry per key prefix", ("prefix",))
+value_bytes = registry.histogram(
+    "cache_value_bytes", "Size of the stored values per key prefix", ("prefix",),
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+backend_seconds = registry.histogram(
+    "cache_backend_seconds", "Latency of the cache backend per operation", ("op",))
+evictions = registry.counter(
+    "cache_evictions_total", "Entries removed before being read again per tier and reason",
+    ("tier", "reason"))
+near_entries = registry.gauge("cache_near_entries", "Entries held by the in-process tier")
+coalesced = registry.counter(
+    "cache_coalesced_total", "Cache misses that waited for a load already in flight",
+    ("prefix", "scope"))
+early_refreshes = registry.counter(
+    "cache_early_refreshes_total", "Cache entries recomputed before they expired", ("prefix",))
+
+
+def _ratio(hits: float, misses: float) -> float | None:
+    return hits / (hits + misses) if hits + misses else None
+
+
+def cache_report() -> dict:
+    prefixes = sorted({prefix for prefix, _, _ in lookups.labelsets()})
+    report = []
+    for prefix in prefixes:
+        tiers = {}
+        for tier in ("near", "remote"):
+            hits = lookups.value(prefix=prefix, tier=tier, result="hit")
+            misses = lookups.value(prefix=prefix, tier=tier, result="miss")
+            if hits or misses:
+                tiers[tier] = {"hits": hits, "misses": misses, "hit_ratio": _ratio(hits, misses)}
+        report.append({
+            "prefix": prefix,
+            "tiers": tiers,
+            "load_seconds_p50": loads.quantile(0.5, prefix=prefix),
+            "load_seconds_p99": loads.quantile(0.99, prefix=prefix),
+            "value_bytes_p50": value_bytes.quantile(0.5, prefix=prefix),
+            "value_bytes_p99": value_bytes.quantile(0.99, prefix=prefix),
+            "coalesced": sum(
+                coalesced.value(prefix=prefix, scope=scope) for scope in ("process", "cluster")),
+            "early_refreshes": early_refreshes.value(prefix=prefix),
+        })
+    return {
+        "prefixes": report,
+        "backend": {
+            op: {
+                "p50": backend_seconds.quantile(0.5, op=op),
+                "p99": backend_seconds.quantile(0.99, op=op),
+            }
+            for (op,) in backend_seconds.labelsets()
+        },
+        "evictions": [
+            {"tier": tier, "reason": reason, "count": evictions.value(tier=tier, reason=reason)}
+            for tier, reason in evictions.labelsets()
+        ],
+        "near_entries": near_entries.value(),
+    }
@@ -4,26 +4,83 @@
 """
 from typing import AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session
 
 from app.exceptions import RepositoryError
+from app.infrastructure.database.engine import create_engine
+from app.infrastructure.database.metrics import routed_reads
+from app.infrastructure.database.routing import ReplicaSet, reads_from_replica
 from app.settings import Settings
 
 settings = Settings()
 
-engine = create_async_engine(
-    settings.db_url, future=True, echo=True, pool_pre_ping=True
-)
+engine = create_engine(settings)
+replicas = ReplicaSet.from_settings(settings)
+
+
+class TrackedSession(Session):
+    """Knows whether its current transaction has checked out a connection and sends the statements
+    of `@replica_read` methods to a replica, unless the transaction already wrote to the primary."""
+
+    @property
+    def used_connection(self) -> bool:
+        return self.info.get("used_connection", False)
+
+    @property
+    def wrote(self) -> bool:
+        return self.info.get("wrote", False) or bool(self.new or self.dirty or self.deleted)
+
+    def get_bind(self, mapper=None, **kw):
+        if replicas and reads_from_replica():
+            replica = None if self.wrote else replicas.choose()
+            routed_reads.inc(target="replica" if replica is not None else "primary")
+            if replica is not None:
+                return replica.sync_engine
+        return super().get_bind(mapper, **kw)
+
+
+@event.listens_for(TrackedSession, "after_begin")
+def _connection_checked_out(session, transaction, connection):
+    session.info["used_connection"] = True
 
-AsyncSessionFactory = async_sessionmaker(engine, expire_on_commit=False)
+
+@event.listens_for(TrackedSession, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(TrackedSession, "do_orm_execute")
+def _executed(orm_execute_state):
+    # insert(), update() and delete() statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(TrackedSession, "after_transaction_end")
+def _transaction_ended(session, transaction):
+    # commit, rollback and close; savepoints do not end the outer transaction
+    if transaction.parent is None:
+        session.info["used_connection"] = False
+        session.info["wrote"] = False
+
+
+# sessions are cheap, a pool connection is only checked out by the first statement
+AsyncSessionFactory = async_sessionmaker(
+    engine, expire_on_commit=False, sync_session_class=TrackedSession
+)
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession]:
     async with AsyncSessionFactory() as session:
         try:
             yield session
-            await session.commit()
+            # nothing to commit when the request was served from the cache or the repository
+            # already committed; objects only added are pending without a connection yet
+            if session.sync_session.used_connection or session.sync_session.wrote:
+                await session.commit()
         except SQLAlchemyError as e:
             await session.rollback()
             raise RepositoryError(f"Database error: {str(e)}") from e
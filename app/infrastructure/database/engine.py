@@ -0,0 +1,66 @@
+# Engine factory: pool sizing, recycling and SQL echo come from `Settings`; on asyncpg the statement
+# timeout is set per connection and both prepared statement caches (SQLAlchemy's and asyncpg's) get
+# DB_STATEMENT_CACHE_SIZE, 0 turns them off for pgbouncer in transaction mode.
+import time
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.infrastructure.database.metrics import instrument_pool, pool_timeouts, pool_wait_seconds
+from app.settings import Settings
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Measures how long a checkout waits for a free (or a new) connection."""
+
+    def connect(self):
+        name = self.logging_name or "default"
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_timeouts.inc(pool=name)
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - started, pool=name)
+
+
+def engine_url(settings: Settings, url: str | None = None) -> URL:
+    url = make_url(url or settings.db_url)
+    if url.get_driver_name() == "asyncpg":
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+    return url
+
+
+def engine_options(settings: Settings, url: URL, name: str = "primary") -> dict:
+    options = {"echo": settings.DB_ECHO, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if url.get_driver_name() == "asyncpg":
+        server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        options["connect_args"] = {
+            "server_settings": server_settings,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+def create_engine(settings: Settings, url: str | None = None, name: str = "primary") -> AsyncEngine:
+    url = engine_url(settings, url)
+    engine = create_async_engine(url, **engine_options(settings, url, name))
+    instrument_pool(engine, name, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    return engine
@@ -0,0 +1,91 @@
+# Connection pool metrics per engine, labelled by the pool name given to `create_engine`, exposed
+# through /metrics and summarised by `pool_report` for /metrics/db. The gauges are read from the live
+# pools when either is requested. The capacity is what one process can open at most, so capacity x
+# processes has to stay below Postgres `max_connections`.
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from app.monitoring.metrics import registry
+
+POOL_LABELS = ("pool",)
+
+pool_capacity = registry.gauge(
+    "db_pool_capacity", "pool_size + max_overflow, the connections one process may open", POOL_LABELS)
+pool_size = registry.gauge("db_pool_size", "Persistent connections of the pool", POOL_LABELS)
+pool_checked_out = registry.gauge(
+    "db_pool_checked_out", "Connections currently in use", POOL_LABELS)
+pool_checked_in = registry.gauge(
+    "db_pool_checked_in", "Idle connections waiting in the pool", POOL_LABELS)
+pool_overflow = registry.gauge(
+    "db_pool_overflow", "Connections opened beyond pool_size", POOL_LABELS)
+pool_wait_seconds = registry.histogram(
+    "db_pool_wait_seconds", "Time to get a connection from the pool", POOL_LABELS)
+pool_connection_age_seconds = registry.histogram(
+    "db_pool_connection_age_seconds", "Age of the connections handed out", POOL_LABELS,
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, 86400),
+)
+pool_connects = registry.counter(
+    "db_pool_connects_total", "New database connections opened", POOL_LABELS)
+pool_timeouts = registry.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", POOL_LABELS)
+replica_healthy = registry.gauge(
+    "db_replica_healthy", "1 while the read replica takes reads, 0 while it is taken out", ("replica",))
+replica_lag_seconds = registry.gauge(
+    "db_replica_lag_seconds", "Replication lag seen by the last health check", ("replica",))
+routed_reads = registry.counter(
+    "db_routed_reads_total", "Statements of replica reads per target engine", ("target",))
+
+_engines: dict[str, AsyncEngine] = {}
+
+
+def observe_pools():
+    for name, engine in _engines.items():
+        # the pool is replaced on dispose(), always read the current one
+        pool = engine.sync_engine.pool
+        pool_size.set(pool.size(), pool=name)
+        pool_checked_out.set(pool.checkedout(), pool=name)
+        pool_checked_in.set(pool.checkedin(), pool=name)
+        pool_overflow.set(max(pool.overflow(), 0), pool=name)
+
+
+def instrument_pool(engine: AsyncEngine, name: str, capacity: int):
+    sync_engine = engine.sync_engine
+    if not isinstance(sync_engine.pool, QueuePool):
+        # the single-connection pools used with sqlite have nothing to size
+        return
+    pool_capacity.set(capacity, pool=name)
+    _engines[name] = engine
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, record):
+        record.info["connected_at"] = time.monotonic()
+        pool_connects.inc(pool=name)
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, record, proxy):
+        connected_at = record.info.get("connected_at")
+        if connected_at is not None:
+            pool_connection_age_seconds.observe(time.monotonic() - connected_at, pool=name)
+
+
+def pool_report() -> list[dict]:
+    observe_pools()
+    report = []
+    for (name,) in pool_capacity.labelsets():
+        report.append({
+            "pool": name,
+            "capacity": pool_capacity.value(pool=name),
+            "size": pool_size.value(pool=name),
+            "checked_out": pool_checked_out.value(pool=name),
+            "checked_in": pool_checked_in.value(pool=name),
+            "overflow": pool_overflow.value(pool=name),
+            "wait_seconds_p50": pool_wait_seconds.quantile(0.5, pool=name),
+            "wait_seconds_p99": pool_wait_seconds.quantile(0.99, pool=name),
+            "connection_age_p50": pool_connection_age_seconds.quantile(0.5, pool=name),
+            "connects": pool_connects.value(pool=name),
+            "timeouts": pool_timeouts.value(pool=name),
+        })
+    return report
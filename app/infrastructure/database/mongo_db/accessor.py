@@ -18,7 +18,9 @@ logger = logging.getLogger(__name__)
 
 async def startup_db_client(app):
     try:
-        app.mongodb_client = AsyncIOMotorClient(settings.MONGODB_URL)
+        # one client (and connection pool) per process, shared by every request
+        app.mongodb_client = AsyncIOMotorClient(
+            settings.MONGODB_URL, uuidRepresentation="standard")
         # db connection
         app.mongodb = app.mongodb_client["user_logs"]
         logger.info("MongoDB connected successfully")
@@ -0,0 +1,205 @@
+# Read replica routing. Repository methods marked with `@replica_read` send their statements to the
+# least loaded healthy replica; everything else, and every read of a session with pending writes,
+# stays on the primary. A replica is taken out when a health check fails, its replication lag
+# exceeds DB_REPLICA_MAX_LAG_SECONDS or a query on it loses the connection, and comes back after
+# the next successful check.
+#
+# Read-your-writes: a successful write request sets a short-lived cookie, and requests carrying it
+# read from the primary until it expires, so a client sees its own writes despite replication lag.
+# Such requests also bypass the caches (see app.infrastructure.cache). Cache fills of tags that
+# were invalidated within the replicas' allowed lag load from the primary, a value read from a
+# lagging replica after the write would otherwise be cached for the whole TTL.
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from http.cookies import SimpleCookie
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from app.infrastructure.database.engine import create_engine
+from app.infrastructure.database.metrics import replica_healthy, replica_lag_seconds
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "read_primary_until"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# 0 when the standby replayed everything it received, seconds since the last replayed commit otherwise
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_replica_read: ContextVar[bool] = ContextVar("replica_read", default=False)
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+def replica_read(func):
+    """Marks a repository coroutine as a pure read that may be served by a replica."""
+
+    @wraps(func)
+    async def inner(*args, **kwargs):
+        token = _replica_read.set(True)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _replica_read.reset(token)
+
+    return inner
+
+
+def reads_from_replica() -> bool:
+    return _replica_read.get() and not _pinned_to_primary.get() and not _primary_reads.get()
+
+
+def pinned_to_primary() -> bool:
+    """The client of the current request wrote recently and must see its own writes."""
+    return _pinned_to_primary.get()
+
+
+@contextmanager
+def primary_reads():
+    """Inside the block `@replica_read` methods read from the primary as well."""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: AsyncEngine
+    capacity: int
+    healthy: bool = True
+    lag: float = 0.0
+
+    @property
+    def load(self) -> float:
+        pool = self.engine.sync_engine.pool
+        if not isinstance(pool, QueuePool) or not self.capacity:
+            return 0.0
+        return pool.checkedout() / self.capacity
+
+
+class ReplicaSet:
+    def __init__(self, replicas: list[Replica], max_lag: float = 10.0):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.logger = logger
+        for replica in replicas:
+            self._watch_disconnects(replica)
+            replica_healthy.set(1, replica=replica.name)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ReplicaSet":
+        replicas = [
+            Replica(
+                name=f"replica-{index}",
+                engine=create_engine(settings, url, name=f"replica-{index}"),
+                capacity=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+            )
+            for index, url in enumerate(settings.DB_REPLICA_URLS)
+        ]
+        return cls(replicas, max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS)
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> AsyncEngine | None:
+        """The least loaded healthy replica, None sends the read to the primary."""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda replica: replica.load).engine
+
+    def mark(self, replica: Replica, healthy: bool, reason: str = ""):
+        if replica.healthy != healthy:
+            if healthy:
+                self.logger.info("Read replica %s is back", replica.name)
+            else:
+                self.logger.warning("Read replica %s taken out: %s", replica.name, reason)
+        replica.healthy = healthy
+        replica_healthy.set(int(healthy), replica=replica.name)
+
+    async def check(self):
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check(self, replica: Replica):
+        try:
+            async with replica.engine.connect() as connection:
+                if replica.engine.dialect.name == "postgresql":
+                    replica.lag = float(await connection.scalar(LAG_QUERY) or 0)
+                else:
+                    await connection.execute(text("SELECT 1"))
+        except Exception as e:
+            self.mark(replica, False, f"health check failed: {e}")
+            return
+        replica_lag_seconds.set(replica.lag, replica=replica.name)
+        if self.max_lag and replica.lag > self.max_lag:
+            self.mark(replica, False, f"replication lag {replica.lag:.1f}s")
+        else:
+            self.mark(replica, True)
+
+    def _watch_disconnects(self, replica: Replica):
+        @event.listens_for(replica.engine.sync_engine, "handle_error")
+        def on_error(context):
+            if context.is_disconnect:
+                self.mark(replica, False, f"connection lost: {context.original_exception}")
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client to the primary for `window` seconds after each of its successful writes."""
+
+    def __init__(self, app, window: float):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writing = scope["method"] not in SAFE_METHODS
+        token = _pinned_to_primary.set(writing or self._pinned(scope))
+
+        async def send_wrapper(message):
+            if writing and message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{PRIMARY_COOKIE}={time.time() + self.window:.3f}; "
+                    f"Max-Age={int(self.window) or 1}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                message.setdefault("headers", []).append((b"set-cookie", cookie.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _pinned_to_primary.reset(token)
+
+    @staticmethod
+    def _pinned(scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name != b"cookie":
+                continue
+            morsel = SimpleCookie(value.decode("latin-1")).get(PRIMARY_COOKIE)
+            if morsel is None:
+                return False
+            try:
+                return float(morsel.value) > time.time()
+            except ValueError:
+                return False
+        return False
@@ -0,0 +1,152 @@
+# In-process tier in front of the Redis cache. Entries are the encoded values also stored in Redis,
+# kept in a size-bounded LRU with a short TTL, so hot reads skip the network round trip. Writes
+# evict the tags locally and publish them on a Redis channel; `InvalidationListener` evicts them on
+# every other replica. The TTL bounds staleness if an invalidation message is missed.
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+from redis.asyncio import Redis
+
+from app.infrastructure.cache_metrics import evictions, near_entries
+
+logger = logging.getLogger(__name__)
+
+
+class NearCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # bumped on every invalidation, so a value loaded before it is not stored after it
+        self.version = 0
+        self._entries: OrderedDict[str, tuple[float, bytes, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._evict(key)
+            evictions.inc(tier="near", reason="expired")
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, tags: Iterable[str] = (), version: int | None = None):
+        if not self.enabled or (version is not None and version != self.version):
+            return
+        tags = tuple(tags)
+        self._evict(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+            evictions.inc(tier="near", reason="lru")
+        near_entries.set(len(self._entries))
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        self.version += 1
+        keys = set().union(*(self._tags.pop(tag, set()) for tag in tags))
+        for key in keys:
+            self._evict(key)
+        evictions.inc(len(keys), tier="near", reason="invalidated")
+        near_entries.set(len(self._entries))
+        return len(keys)
+
+    def clear(self):
+        self.version += 1
+        evictions.inc(len(self._entries), tier="near", reason="cleared")
+        self._entries.clear()
+        self._tags.clear()
+        near_entries.set(0)
+
+    def _evict(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+near_cache = NearCache()
+
+
+def encode_tags(tags: Iterable[str]) -> bytes:
+    return json.dumps(list(tags)).encode()
+
+
+class InvalidationListener:
+    """Evicts the tags other replicas publish on `channel` from the local near cache."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        channel: str,
+        cache: NearCache = near_cache,
+        reconnect_delay: float = 1.0,
+    ):
+        self.redis = redis
+        self.channel = channel
+        self.cache = cache
+        self.reconnect_delay = reconnect_delay
+        self.logger = logger
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._stopping.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # anything published while we were not subscribed is lost
+                    self.cache.clear()
+                    while not self._stopping.is_set():
+                        message = await pubsub.get_message(timeout=1.0)
+                        if message is not None:
+                            self.handle(message["data"])
+            except Exception as e:
+                # whatever ended the subscription, this replica would otherwise never see another
+                # invalidation; resubscribe and start from an empty cache
+                self.logger.error(f"Cache invalidation channel {self.channel} failed: {e!r}")
+                self.cache.clear()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.reconnect_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def handle(self, data: bytes) -> int:
+        try:
+            tags = json.loads(data)
+        except ValueError:
+            tags = None
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            self.logger.warning(f"Ignoring malformed cache invalidation message {data!r}")
+            return 0
+        return self.cache.invalidate(tags)
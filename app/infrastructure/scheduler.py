@@ -0,0 +1,97 @@
+# Minimal in-process scheduler for background jobs of the API process (or a worker): every job runs
+# in its own task, once or every `interval` seconds, and never overlaps with itself. A failing run is
+# logged and counted, the next one is scheduled as usual. Stopping cancels runs in progress.
+#
+#     scheduler = Scheduler()
+#     scheduler.add("cache-warmup", warmer.warm, interval=60)
+#     scheduler.start()
+#     ...
+#     await scheduler.stop()
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from app.monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+job_runs = registry.counter("scheduler_job_runs_total", "Scheduled job runs", ("job", "status"))
+job_seconds = registry.histogram("scheduler_job_seconds", "Duration of one job run", ("job",))
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    # 0 runs the job once
+    interval: float = 0
+    initial_delay: float = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+        self.logger = logger
+        self._stopping = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float = 0,
+        initial_delay: float = 0,
+    ) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Job {name} is already scheduled")
+        self.jobs[name] = Job(name, func, interval, initial_delay)
+        return self.jobs[name]
+
+    def start(self):
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._loop(job)) for job in self.jobs.values()]
+
+    async def stop(self):
+        # shutdown does not wait for a slow run, e.g. a cache warm-up against a struggling database
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run(self, name: str) -> bool:
+        """Run `name` now, after its current run if one is in progress. Returns False if it failed."""
+        job = self.jobs[name]
+        async with job.lock:
+            started = time.perf_counter()
+            try:
+                await job.func()
+            except Exception as e:
+                job_runs.inc(job=name, status="failed")
+                self.logger.exception(f"Job {name} failed: {e}")
+                return False
+            finally:
+                job_seconds.observe(time.perf_counter() - started, job=name)
+            job_runs.inc(job=name, status="ok")
+            return True
+
+    async def _loop(self, job: Job):
+        delay = job.initial_delay
+        while not self._stopping.is_set():
+            if delay and await self._sleep(delay):
+                return
+            await self.run(job.name)
+            if not job.interval:
+                return
+            delay = job.interval
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Returns True if the scheduler was stopped meanwhile."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
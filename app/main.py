@@ -24,12 +24,26 @@ from redis.asyncio.connection import ConnectionPool
 from redis import asyncio as redis
 
 from app.applications.handlers import router as applications_router
+from app.applications.warmup import CacheWarmer
 from app.broker.consumer import KafkaConsumer
+from app.broker.producer import startup_kafka_producer, shutdown_kafka_producer
 from app.image_upload.handlers import router as image_upload_router
+from app.infrastructure.cache import configure_cache, invalidation_channel
+from app.infrastructure.database.accessor import AsyncSessionFactory, replicas
+from app.infrastructure.database.routing import ReadYourWritesMiddleware
 from app.infrastructure.database.mongo_db.accessor import (
     startup_db_client as startup_mongo_db_client,
     shutdown_db_client as shutdown_mongo_db_client,
 )
+from app.infrastructure.near_cache import InvalidationListener
+from app.infrastructure.scheduler import Scheduler
+from app.mongo import BufferedLogWriter, LogAggregator
+from app.mongo.analytics import UserLogAnalytics
+from app.mongo.collection import ensure_user_log_collection
+from app.mongo.handlers import router as user_logs_router
+from app.monitoring.handlers import router as metrics_router
+from app.monitoring.tracing import RequestIdMiddleware, configure_logging
+from app.outbox import OutboxRelay
 from app.users.auth.handlers import router as users_router
 from app.settings import get_settings
 
@@ -40,6 +54,9 @@ settings = get_settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # on startup rather than on import, so importing the app leaves the host's logging alone
+    configure_logging()
+
     # redis lifespan
     retries = 10
     delay = 2
@@ -68,25 +85,46 @@ async def lifespan(app: FastAPI):
                 ) from e
             await asyncio.sleep(delay)
 
-    # kafka lifespan
+    # near cache in front of redis, evicted when other replicas publish invalidated tags
+    configure_cache(settings)
+    app.cache_invalidation_listener = InvalidationListener(r, invalidation_channel())
+    app.cache_invalidation_listener.start()
+
+    # kafka lifespan, skipped when consumers run in app.broker.worker
+    if settings.KAFKA_EMBEDDED_CONSUMER:
+        for attempt in range(retries):
+            try:
+                await consumer.start()
+                break
+            except KafkaConnectionError as e:
+                print(
+                    f"Connection attempt {attempt + 1}/{retries} failed: {str(e)}")
+                if attempt == retries - 1:
+                    raise RuntimeError(
+                        "Failed to connect to Kafka after multiple attempts"
+                    ) from e
+                await asyncio.sleep(delay)
+                await consumer.stop()
+
+    # shared kafka producer lifespan
     for attempt in range(retries):
         try:
-            await consumer.start()
+            await startup_kafka_producer(app, settings)
             break
         except KafkaConnectionError as e:
-            print(
-                f"Connection attempt {attempt + 1}/{retries} failed: {str(e)}")
+            logger.error(
+                f"Kafka producer connection attempt {attempt + 1}/{retries} failed: {str(e)}")
             if attempt == retries - 1:
                 raise RuntimeError(
-                    "Failed to connect to Kafka after multiple attempts"
+                    "Failed to start Kafka producer after multiple attempts"
                 ) from e
             await asyncio.sleep(delay)
-            await consumer.stop()
 
     # mongo connection lifespan
     for attempt in range(retries):
         try:
             await startup_mongo_db_client(app)
+            break
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             if attempt == retries - 1:
@@ -96,13 +134,80 @@ async def lifespan(app: FastAPI):
             await asyncio.sleep(delay)
             await shutdown_mongo_db_client(app)
 
+    # time-series audit log collection with TTL and the analytics indexes
+    user_logs = await ensure_user_log_collection(app.mongodb, settings)
+
+    # batched audit log writer on the shared mongo client
+    app.user_log_writer = None
+    if settings.USER_LOG_BUFFERED:
+        app.user_log_writer = BufferedLogWriter.from_settings(settings, user_logs)
+        app.user_log_writer.start()
+    # in-memory rollups of the endpoints with the "aggregate" audit log policy
+    app.user_log_aggregator = LogAggregator(
+        user_logs,
+        writer=app.user_log_writer,
+        flush_interval=settings.USER_LOG_AGGREGATE_FLUSH_INTERVAL,
+    )
+    app.user_log_aggregator.start()
+
+    # outbox relay, publishes committed events through the shared producer
+    relay = None
+    if settings.OUTBOX_ENABLED:
+        relay = OutboxRelay.from_settings(
+            settings, AsyncSessionFactory, app.kafka_producer)
+        relay.start()
+
+    # recurring background jobs
+    app.scheduler = Scheduler()
+    if replicas:
+        app.scheduler.add(
+            "replica-health", replicas.check, interval=settings.DB_REPLICA_HEALTH_INTERVAL)
+    if settings.CACHE_WARMUP_ENABLED:
+        warmer = CacheWarmer.from_settings(
+            settings, AsyncSessionFactory, UserLogAnalytics(user_logs))
+        warmed = False
+        if settings.CACHE_WARMUP_WAIT:
+            # startup, and so readiness, waits for the first warm-up
+            try:
+                await asyncio.wait_for(warmer.warm(), settings.CACHE_WARMUP_TIMEOUT)
+                warmed = True
+            except Exception as e:
+                logger.warning(f"Cache warm-up before startup did not finish: {e!r}")
+        if settings.CACHE_WARMUP_INTERVAL or not warmed:
+            app.scheduler.add(
+                "cache-warmup",
+                warmer.warm,
+                interval=settings.CACHE_WARMUP_INTERVAL,
+                initial_delay=settings.CACHE_WARMUP_INTERVAL if warmed else 0,
+            )
+    app.scheduler.start()
+
     yield
 
+    await app.scheduler.stop()
+    if relay:
+        await relay.stop()
+    await shutdown_kafka_producer(app)
+    if settings.KAFKA_EMBEDDED_CONSUMER:
+        await consumer.stop()
+    await app.user_log_aggregator.stop()
+    if app.user_log_writer:
+        # final flush before the client goes away
+        await app.user_log_writer.stop()
+    await shutdown_mongo_db_client(app)
+    await app.cache_invalidation_listener.stop()
+    await replicas.dispose()
+
 
 app = FastAPI(
     lifespan=lifespan
 )
+app.add_middleware(RequestIdMiddleware)
+if replicas and settings.DB_READ_YOUR_WRITES_SECONDS:
+    app.add_middleware(ReadYourWritesMiddleware, window=settings.DB_READ_YOUR_WRITES_SECONDS)
 
 app.include_router(applications_router)
 app.include_router(image_upload_router)
 app.include_router(users_router)
+app.include_router(metrics_router)
+app.include_router(user_logs_router)
@@ -1,4 +1,13 @@
 from .mongo import UserLogService
+from .policies import LogAggregator, LogPolicies, LogPolicy
 from .schemas import UserLog
+from .writer import BufferedLogWriter
 
-__all__ = ["UserLogService", "UserLog"]
+__all__ = [
+    "UserLogService",
+    "UserLog",
+    "BufferedLogWriter",
+    "LogAggregator",
+    "LogPolicies",
+    "LogPolicy",
+]
@@ -0,0 +1,154 @@
+# Read side of the audit log. Every pipeline starts with a `$match` on the time window (and on the
+# metaField when filtered) so it runs on the `user_logs` indexes instead of scanning the collection,
+# and sums `count` so sampled entries and rollups are weighted like the calls they stand for.
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.exceptions import InvalidCursorError
+from app.mongo.schemas import (
+    EndpointCount,
+    ResourceCount,
+    TimeBucket,
+    UserActivity,
+    UserLogEntry,
+    UserLogPage,
+)
+from app.pagination import decode_cursor, encode_cursor
+
+
+class UserLogAnalytics:
+    def __init__(self, collection: AsyncIOMotorCollection):
+        self.collection = collection
+
+    @staticmethod
+    def _match(
+        since: datetime, until: datetime, endpoint: str | None = None, user_id: UUID | None = None
+    ) -> dict:
+        match = {"timestamp": {"$gte": since, "$lt": until}}
+        if endpoint is not None:
+            match["meta.endpoint"] = endpoint
+        if user_id is not None:
+            match["meta.user_id"] = user_id
+        return match
+
+    async def endpoint_counts(self, since: datetime, until: datetime) -> list[EndpointCount]:
+        pipeline = [
+            {"$match": self._match(since, until)},
+            {"$group": {"_id": "$meta.endpoint", "calls": {"$sum": "$count"}}},
+            {"$sort": {"calls": -1}},
+        ]
+        rows = await self.collection.aggregate(pipeline).to_list(None)
+        return [EndpointCount(endpoint=row["_id"], calls=row["calls"]) for row in rows]
+
+    async def top_resources(
+        self, endpoint: str, since: datetime, until: datetime, limit: int = 20
+    ) -> list[ResourceCount]:
+        """Most requested resources of `endpoint`. Rollups of the "aggregate" policy carry none."""
+        pipeline = [
+            {"$match": {**self._match(since, until, endpoint=endpoint), "resource": {"$ne": None}}},
+            {"$group": {"_id": "$resource", "calls": {"$sum": "$count"}}},
+            {"$sort": {"calls": -1}},
+            {"$limit": limit},
+        ]
+        rows = await self.collection.aggregate(pipeline).to_list(None)
+        return [ResourceCount(resource=row["_id"], calls=row["calls"]) for row in rows]
+
+    async def user_activity(
+        self, since: datetime, until: datetime, endpoint: str | None = None, limit: int = 50
+    ) -> list[UserActivity]:
+        pipeline = [
+            {"$match": self._match(since, until, endpoint=endpoint)},
+            {"$group": {
+                "_id": "$meta.user_id",
+                "calls": {"$sum": "$count"},
+                "endpoints": {"$addToSet": "$meta.endpoint"},
+                "last_seen": {"$max": "$timestamp"},
+            }},
+            {"$sort": {"calls": -1}},
+            {"$limit": limit},
+        ]
+        rows = await self.collection.aggregate(pipeline).to_list(None)
+        return [
+            UserActivity(
+                user_id=row["_id"],
+                calls=row["calls"],
+                endpoints=len(row["endpoints"]),
+                last_seen=row["last_seen"],
+            )
+            for row in rows
+        ]
+
+    async def time_buckets(
+        self,
+        since: datetime,
+        until: datetime,
+        unit: Literal["minute", "hour", "day"] = "hour",
+        endpoint: str | None = None,
+        user_id: UUID | None = None,
+    ) -> list[TimeBucket]:
+        pipeline = [
+            {"$match": self._match(since, until, endpoint=endpoint, user_id=user_id)},
+            {"$group": {
+                "_id": {"$dateTrunc": {"date": "$timestamp", "unit": unit}},
+                "calls": {"$sum": "$count"},
+            }},
+            {"$sort": {"_id": 1}},
+        ]
+        rows = await self.collection.aggregate(pipeline).to_list(None)
+        return [TimeBucket(start=row["_id"], calls=row["calls"]) for row in rows]
+
+    async def entries(
+        self,
+        since: datetime,
+        until: datetime,
+        endpoint: str | None = None,
+        user_id: UUID | None = None,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> UserLogPage:
+        """Raw entries, newest first, paginated on (timestamp, _id) instead of skip/limit."""
+        query = self._match(since, until, endpoint=endpoint, user_id=user_id)
+        if cursor:
+            last = decode_cursor(cursor)
+            try:
+                last_timestamp = datetime.fromisoformat(last["t"])
+                last_id = ObjectId(last["id"])
+            except (KeyError, TypeError, ValueError, InvalidId):
+                raise InvalidCursorError(cursor) from None
+            query["$or"] = [
+                {"timestamp": {"$lt": last_timestamp}},
+                {"timestamp": last_timestamp, "_id": {"$lt": last_id}},
+            ]
+
+        documents = await (
+            self.collection.find(query)
+            .sort([("timestamp", -1), ("_id", -1)])
+            .limit(limit + 1)
+            .to_list(None)
+        )
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_cursor(
+                {"t": last["timestamp"].isoformat(), "id": str(last["_id"])})
+
+        return UserLogPage(
+            items=[
+                UserLogEntry(
+                    id=str(document["_id"]),
+                    timestamp=document["timestamp"],
+                    endpoint=document["meta"]["endpoint"],
+                    user_id=document["meta"].get("user_id"),
+                    count=document.get("count", 1),
+                    policy=document.get("policy", "full"),
+                )
+                for document in documents
+            ],
+            next_cursor=next_cursor,
+        )
@@ -0,0 +1,53 @@
+# Creates `user_logs` as a time-series collection on startup: `timestamp` is the time field,
+# `meta` (endpoint and user_id) the metaField, and old entries expire after USER_LOG_TTL_DAYS. The
+# secondary indexes back the analytics pipelines and the keyset pagination in `UserLogAnalytics`.
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
+
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+USER_LOGS = "user_logs"
+
+USER_LOG_INDEXES = [
+    [("meta.endpoint", ASCENDING), ("timestamp", DESCENDING)],
+    [("meta.user_id", ASCENDING), ("timestamp", DESCENDING)],
+    [("timestamp", DESCENDING)],
+]
+
+
+async def ensure_user_log_collection(
+    database: AsyncIOMotorDatabase, settings: Settings
+) -> AsyncIOMotorCollection:
+    ttl = settings.USER_LOG_TTL_DAYS * 24 * 3600
+    existing = await database.list_collections(filter={"name": USER_LOGS}).to_list(None)
+
+    if not existing:
+        options = {
+            "timeseries": {
+                "timeField": "timestamp",
+                "metaField": "meta",
+                "granularity": settings.USER_LOG_GRANULARITY,
+            }
+        }
+        if ttl:
+            options["expireAfterSeconds"] = ttl
+        await database.create_collection(USER_LOGS, **options)
+        logger.info("Created time-series collection %s", USER_LOGS)
+    elif existing[0].get("type") == "timeseries":
+        # keep the retention in line with the settings on every start
+        await database.command(
+            "collMod", USER_LOGS, expireAfterSeconds=ttl if ttl else "off")
+    else:
+        logger.warning(
+            "%s is a regular collection, recreate it to get time-series storage", USER_LOGS)
+        if ttl:
+            await database[USER_LOGS].create_index("timestamp", expireAfterSeconds=ttl)
+
+    collection = database[USER_LOGS]
+    for keys in USER_LOG_INDEXES:
+        await collection.create_index(keys)
+    return collection
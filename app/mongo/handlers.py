@@ -0,0 +1,102 @@
+"""
+    This FastAPI router exposes the audit log analytics: call counts per endpoint, the most requested
+    resources of an endpoint, per-user activity, calls per time bucket and the raw entries with keyset pagination. The time window defaults to
+    the last 24 hours. Superusers only.
+"""
+from datetime import datetime, timedelta
+from typing import Annotated, List, Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.app_config import current_superuser
+from app.dependency import get_user_log_analytics
+from app.exceptions import InvalidCursorError
+from app.mongo.analytics import UserLogAnalytics
+from app.mongo.schemas import (
+    EndpointCount,
+    ResourceCount,
+    TimeBucket,
+    UserActivity,
+    UserLogPage,
+)
+
+router = APIRouter(
+    prefix="/user-logs",
+    tags=["user-logs"],
+    dependencies=[Depends(current_superuser)],
+)
+
+
+class TimeWindow:
+    def __init__(
+        self,
+        since: datetime | None = Query(None, description="Start of the window, defaults to until - 24h"),
+        until: datetime | None = Query(None, description="End of the window, defaults to now"),
+    ):
+        self.until = until or datetime.utcnow()
+        self.since = since or self.until - timedelta(hours=24)
+
+
+Analytics = Annotated[UserLogAnalytics, Depends(get_user_log_analytics)]
+
+
+@router.get("/analytics/endpoints", response_model=List[EndpointCount])
+async def get_endpoint_counts(
+    analytics: Analytics, window: TimeWindow = Depends()
+) -> List[EndpointCount]:
+    return await analytics.endpoint_counts(window.since, window.until)
+
+
+@router.get("/analytics/resources", response_model=List[ResourceCount])
+async def get_top_resources(
+    analytics: Analytics,
+    endpoint: str,
+    window: TimeWindow = Depends(),
+    limit: int = Query(20, ge=1, le=1000),
+) -> List[ResourceCount]:
+    return await analytics.top_resources(endpoint, window.since, window.until, limit=limit)
+
+
+@router.get("/analytics/users", response_model=List[UserActivity])
+async def get_user_activity(
+    analytics: Analytics,
+    window: TimeWindow = Depends(),
+    endpoint: str | None = None,
+    limit: int = Query(50, ge=1, le=1000),
+) -> List[UserActivity]:
+    return await analytics.user_activity(window.since, window.until, endpoint=endpoint, limit=limit)
+
+
+@router.get("/analytics/timeline", response_model=List[TimeBucket])
+async def get_timeline(
+    analytics: Analytics,
+    window: TimeWindow = Depends(),
+    unit: Literal["minute", "hour", "day"] = "hour",
+    endpoint: str | None = None,
+    user_id: UUID | None = None,
+) -> List[TimeBucket]:
+    return await analytics.time_buckets(
+        window.since, window.until, unit=unit, endpoint=endpoint, user_id=user_id)
+
+
+@router.get("/entries", response_model=UserLogPage)
+async def get_entries(
+    analytics: Analytics,
+    window: TimeWindow = Depends(),
+    endpoint: str | None = None,
+    user_id: UUID | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+) -> UserLogPage:
+    try:
+        return await analytics.entries(
+            window.since,
+            window.until,
+            endpoint=endpoint,
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
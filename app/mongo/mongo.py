@@ -1,26 +1,55 @@
+import random
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
 from uuid import UUID
 import logging
 
 from motor.motor_asyncio import AsyncIOMotorCollection
 
+from app.mongo.policies import LogAggregator, LogPolicies
 from app.mongo.schemas import UserLog
+from app.mongo.writer import BufferedLogWriter
 from app.exceptions import UserLogException
 
 logger = logging.getLogger(__name__)
 
 
 class UserLogService:
-    def __init__(self, collection: AsyncIOMotorCollection):
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        writer: BufferedLogWriter | None = None,
+        policies: LogPolicies | None = None,
+        aggregator: LogAggregator | None = None,
+    ):
         self.collection = collection
+        self.writer = writer
+        self.policies = policies
+        self.aggregator = aggregator
         self.logger = logger
 
-    async def log_endpoint_call(self, endpoint: str, user_id: Optional[UUID]) -> None:
+    async def log_endpoint_call(
+        self, endpoint: str, user_id: Optional[UUID], resource: Optional[str] = None
+    ) -> None:
+        policy = self.policies.policy_for(endpoint) if self.policies else None
+        if policy and policy.mode == "sample":
+            if random.random() >= policy.rate:
+                return
+        elif policy and policy.mode == "aggregate" and self.aggregator:
+            self.aggregator.add(endpoint, user_id)
+            return
+
         try:
             log_data = UserLog(timestamp=datetime.utcnow(),
-                               endpoint=endpoint, user_id=user_id)
-            await self.collection.insert_one(log_data.dict())
+                               endpoint=endpoint, user_id=user_id, resource=resource)
+            if policy and policy.mode == "sample":
+                log_data.count = 1 / policy.rate
+                log_data.policy = "sample"
+            if self.writer:
+                # queued for the next batched flush, the request does not wait for Mongo
+                self.writer.submit(log_data.to_document())
+                return
+            await self.collection.insert_one(log_data.to_document())
             logger.info("data added successfully")
         except UserLogException as e:
             # we are not raise exception right here,
@@ -28,3 +57,26 @@ class UserLogService:
             self.logger.error(
                 "Error while recording log data: {}".format(e),
             )
+
+    async def log_endpoint_calls(
+        self, endpoint: str, user_id: Optional[UUID], resources: Sequence[Optional[str]]
+    ) -> None:
+        """One entry per call like `log_endpoint_call`, written as a single batch (write endpoints)."""
+        if not resources:
+            return
+        now = datetime.utcnow()
+        documents = [
+            UserLog(timestamp=now, endpoint=endpoint, user_id=user_id, resource=resource).to_document()
+            for resource in resources
+        ]
+        try:
+            if self.writer:
+                for document in documents:
+                    self.writer.submit(document)
+                return
+            await self.collection.insert_many(documents)
+            logger.info("%d log entries added", len(documents))
+        except UserLogException as e:
+            self.logger.error(
+                "Error while recording log data: {}".format(e),
+            )
@@ -0,0 +1,142 @@
+# Per-endpoint audit log policies. "full" writes one entry per call, "sample:<rate>" writes a random
+# fraction of the calls with `count = 1 / rate`, "aggregate" only counts calls per (endpoint, user,
+# minute) in memory and `LogAggregator` writes one rollup entry per key and minute. Write endpoints
+# always keep full fidelity whatever is configured for them.
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.mongo.schemas import UserLog
+from app.mongo.writer import BufferedLogWriter
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+WRITE_ENDPOINTS = frozenset({
+    "create_application",
+    "edit_application",
+    "delete_user_application",
+    "upload_image",
+    "delete_image",
+})
+
+
+@dataclass(frozen=True)
+class LogPolicy:
+    mode: Literal["full", "sample", "aggregate"] = "full"
+    rate: float = 1.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LogPolicy":
+        mode, _, rate = spec.partition(":")
+        if mode == "sample":
+            rate = float(rate or 1)
+            if not 0 < rate <= 1:
+                raise ValueError(f"Sample rate must be in (0, 1], got {rate}")
+            return cls(mode, rate)
+        if mode in ("full", "aggregate"):
+            return cls(mode)
+        raise ValueError(f"Unknown audit log policy {spec!r}")
+
+
+FULL = LogPolicy()
+
+
+@dataclass
+class LogPolicies:
+    policies: dict[str, LogPolicy] = field(default_factory=dict)
+    default: LogPolicy = FULL
+
+    def __post_init__(self):
+        for endpoint in WRITE_ENDPOINTS & self.policies.keys():
+            if self.policies[endpoint] != FULL:
+                logger.warning("Ignoring audit log policy of write endpoint %s", endpoint)
+                self.policies[endpoint] = FULL
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "LogPolicies":
+        return cls(
+            {endpoint: LogPolicy.parse(spec) for endpoint, spec in settings.USER_LOG_POLICIES.items()}
+        )
+
+    def policy_for(self, endpoint: str) -> LogPolicy:
+        if endpoint in WRITE_ENDPOINTS:
+            return FULL
+        return self.policies.get(endpoint, self.default)
+
+
+class LogAggregator:
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        writer: BufferedLogWriter | None = None,
+        flush_interval: float = 60.0,
+    ):
+        self.collection = collection
+        self.writer = writer
+        self.flush_interval = flush_interval
+        self.counts: Counter[tuple[str, UUID | None, datetime]] = Counter()
+        self.logger = logger
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def add(self, endpoint: str, user_id: UUID | None, now: datetime | None = None):
+        minute = (now or datetime.utcnow()).replace(second=0, microsecond=0)
+        self.counts[endpoint, user_id, minute] += 1
+
+    def start(self):
+        self._stopping.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            # the current minute is still counting, unless this is the final flush
+            current = None if self._stopping.is_set() else datetime.utcnow().replace(
+                second=0, microsecond=0)
+            await self.flush(current)
+
+    def rollups(self, until: datetime | None = None) -> list[dict]:
+        """Take the counters of every minute before `until` (all of them when omitted)."""
+        if until is None:
+            counts, self.counts = self.counts, Counter()
+        else:
+            counts = Counter({key: n for key, n in self.counts.items() if key[2] < until})
+            for key in counts:
+                del self.counts[key]
+        return [
+            UserLog(
+                endpoint=endpoint, user_id=user_id, timestamp=minute, count=count, policy="aggregate"
+            ).to_document()
+            for (endpoint, user_id, minute), count in counts.items()
+        ]
+
+    async def flush(self, until: datetime | None = None) -> int:
+        documents = self.rollups(until)
+        if not documents:
+            return 0
+        if self.writer:
+            for document in documents:
+                self.writer.submit(document)
+            return len(documents)
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except Exception as e:
+            self.logger.error(f"Could not write {len(documents)} audit log rollups: {e}")
+            return 0
+        return len(documents)
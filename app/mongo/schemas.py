@@ -10,3 +10,57 @@ class UserLog(BaseModel):
     user_id: Optional[UUID] = None
     timestamp: datetime
     endpoint: str
+    # calls represented by this entry: 1, 1 / rate for sampled calls, the call count for rollups
+    count: float = 1
+    policy: str = "full"
+    # what the call looked up, e.g. the title of get_application_by_title
+    resource: Optional[str] = None
+
+    def to_document(self) -> dict:
+        # user_logs is a time-series collection: endpoint and user_id form its metaField, resource
+        # stays a measurement so it does not multiply the buckets
+        document = {
+            "timestamp": self.timestamp,
+            "meta": {"endpoint": self.endpoint, "user_id": self.user_id},
+            "count": self.count,
+            "policy": self.policy,
+        }
+        if self.resource is not None:
+            document["resource"] = self.resource
+        return document
+
+
+class EndpointCount(BaseModel):
+    endpoint: str
+    calls: float
+
+
+class ResourceCount(BaseModel):
+    resource: str
+    calls: float
+
+
+class UserActivity(BaseModel):
+    user_id: Optional[UUID] = None
+    calls: float
+    endpoints: int
+    last_seen: datetime
+
+
+class TimeBucket(BaseModel):
+    start: datetime
+    calls: float
+
+
+class UserLogEntry(BaseModel):
+    id: str
+    timestamp: datetime
+    endpoint: str
+    user_id: Optional[UUID] = None
+    count: float
+    policy: str
+
+
+class UserLogPage(BaseModel):
+    items: list[UserLogEntry]
+    next_cursor: Optional[str] = None
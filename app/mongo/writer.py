@@ -0,0 +1,246 @@
+# Buffered writer for the audit log. Requests only put the entry on a bounded in-memory queue; a
+# background task flushes it with `insert_many(ordered=False)` once `batch_size` entries are queued or
+# `flush_interval` seconds passed. When the queue is full, entries are dropped or spilled to a local
+# JSON-lines file that is written to Mongo again, `batch_size` lines at a time, once the queue has
+# drained. Spilled entries are appended to the file by a second background task in a worker
+# thread, so neither `submit()` nor the flush loop block the event loop on disk I/O.
+import asyncio
+import logging
+import os
+import time
+from typing import Literal
+
+from bson import json_util
+from bson.binary import UuidRepresentation
+from bson.json_util import JSONMode, JSONOptions
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.monitoring.metrics import registry
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+SPILL_JSON_OPTIONS = JSONOptions(
+    json_mode=JSONMode.RELAXED, uuid_representation=UuidRepresentation.STANDARD)
+
+written = registry.counter("user_log_written_total", "Audit log entries written to Mongo")
+dropped = registry.counter("user_log_dropped_total", "Audit log entries dropped", ("reason",))
+spilled = registry.counter("user_log_spilled_total", "Audit log entries spilled to disk")
+queue_depth = registry.gauge("user_log_queue_depth", "Audit log entries waiting to be flushed")
+flush_seconds = registry.histogram("user_log_flush_seconds", "Duration of one insert_many flush")
+
+
+def parse_write_concern(w: str, journal: bool = False) -> WriteConcern:
+    return WriteConcern(w=int(w) if w.isdigit() else w, j=journal or None)
+
+
+class BufferedLogWriter:
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        write_concern: WriteConcern | None = None,
+        overflow: Literal["drop", "spill"] = "drop",
+        spill_path: str | None = None,
+        spill_retry_interval: float = 30.0,
+    ):
+        if write_concern is not None:
+            collection = collection.with_options(write_concern=write_concern)
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.spill_retry_interval = spill_retry_interval
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue)
+        self.logger = logger
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._spill_retry_at = 0.0
+        self._spills: asyncio.Queue[list[dict] | None] = asyncio.Queue()
+        self._spill_task: asyncio.Task | None = None
+        # the spill writer and the replay never touch the file at the same time
+        self._spill_lock = asyncio.Lock()
+        self._replay_offset = 0
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, collection: AsyncIOMotorCollection
+    ) -> "BufferedLogWriter":
+        return cls(
+            collection=collection,
+            batch_size=settings.USER_LOG_BATCH_SIZE,
+            flush_interval=settings.USER_LOG_FLUSH_INTERVAL,
+            max_queue=settings.USER_LOG_QUEUE_SIZE,
+            write_concern=parse_write_concern(
+                settings.USER_LOG_WRITE_CONCERN, settings.USER_LOG_JOURNAL),
+            overflow=settings.USER_LOG_OVERFLOW,
+            spill_path=settings.USER_LOG_SPILL_PATH,
+        )
+
+    @property
+    def spills(self) -> bool:
+        return self.overflow == "spill" and bool(self.spill_path)
+
+    def start(self):
+        self._stopping.clear()
+        self._task = asyncio.create_task(self.run())
+        if self.spills:
+            self._spill_task = asyncio.create_task(self.write_spills())
+
+    async def stop(self):
+        # the run loop exits once the queue is empty, so everything submitted so far is flushed
+        # or, after a failed flush, spilled
+        self._stopping.set()
+        if self._task:
+            await self._task
+            self._task = None
+        if self._spill_task:
+            self._spills.put_nowait(None)
+            await self._spill_task
+            self._spill_task = None
+
+    def submit(self, document: dict) -> bool:
+        """Queue `document` without waiting. Returns False if it was dropped."""
+        try:
+            self.queue.put_nowait(document)
+            return True
+        except asyncio.QueueFull:
+            if self.spills:
+                self._spill([document])
+                return True
+            dropped.inc(reason="queue_full")
+            return False
+
+    async def run(self):
+        while not self._stopping.is_set() or not self.queue.empty():
+            batch = await self._next_batch()
+            if batch:
+                await self.flush(batch)
+            elif self.spill_path and not self._stopping.is_set():
+                try:
+                    await self._replay_spill()
+                except OSError as e:
+                    self.logger.error(f"Could not replay spilled audit log entries: {e}")
+
+    async def _next_batch(self) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0 or self._stopping.is_set():
+                break
+            # idle: wait for the next entry, the deadline or stop(), whichever comes first
+            getter = asyncio.ensure_future(self.queue.get())
+            stopping = asyncio.ensure_future(self._stopping.wait())
+            await asyncio.wait(
+                (getter, stopping), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            stopping.cancel()
+            if not getter.done():
+                getter.cancel()
+                break
+            batch.append(getter.result())
+        queue_depth.set(self.queue.qsize())
+        return batch
+
+    async def flush(self, batch: list[dict]) -> int:
+        started = time.perf_counter()
+        try:
+            result = await self.collection.insert_many(batch, ordered=False)
+            count = len(result.inserted_ids)
+        except BulkWriteError as e:
+            # unordered: everything but the failed documents was written
+            count = e.details.get("nInserted", 0)
+            dropped.inc(len(batch) - count, reason="write_error")
+            self.logger.error(f"Audit log flush partially failed: {e.details.get('writeErrors')}")
+        except PyMongoError as e:
+            self.logger.error(f"Audit log flush of {len(batch)} entries failed: {e}")
+            if self.spills:
+                self._spill(batch)
+            else:
+                dropped.inc(len(batch), reason="write_error")
+            self._spill_retry_at = time.monotonic() + self.spill_retry_interval
+            return 0
+        finally:
+            flush_seconds.observe(time.perf_counter() - started)
+        written.inc(count)
+        return count
+
+    def _spill(self, documents: list[dict]):
+        self._spills.put_nowait(documents)
+        spilled.inc(len(documents))
+
+    async def write_spills(self):
+        """Append spilled entries to the spill file until `stop()`."""
+        stopping = False
+        while not stopping:
+            # everything spilled since the last write goes into the next one
+            documents = []
+            spill = await self._spills.get()
+            while True:
+                if spill is None:
+                    stopping = True
+                else:
+                    documents.extend(spill)
+                if self._spills.empty():
+                    break
+                spill = self._spills.get_nowait()
+            if not documents:
+                continue
+            try:
+                async with self._spill_lock:
+                    await asyncio.to_thread(self._append_spill, documents)
+            except OSError as e:
+                dropped.inc(len(documents), reason="spill_error")
+                self.logger.error(f"Could not spill {len(documents)} audit log entries: {e}")
+
+    def _append_spill(self, documents: list[dict]):
+        with open(self.spill_path, "a") as f:
+            for document in documents:
+                f.write(json_util.dumps(document, json_options=SPILL_JSON_OPTIONS) + "\n")
+
+    def _read_spill(self, path: str, offset: int) -> tuple[list[dict], int]:
+        """Up to `batch_size` entries starting at `offset`, and the offset after them."""
+        documents = []
+        with open(path) as f:
+            f.seek(offset)
+            while len(documents) < self.batch_size:
+                line = f.readline()
+                if not line:
+                    break
+                if line.strip():
+                    documents.append(json_util.loads(line, json_options=SPILL_JSON_OPTIONS))
+            return documents, f.tell()
+
+    async def _replay_spill(self):
+        if time.monotonic() < self._spill_retry_at:
+            return
+        replaying = f"{self.spill_path}.replaying"
+        async with self._spill_lock:
+            # a replay cut short by a failed flush resumes where it stopped
+            if not os.path.exists(replaying):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, replaying)
+                self._replay_offset = 0
+                self.logger.info("Replaying spilled audit log entries")
+        while True:
+            documents, self._replay_offset = await asyncio.to_thread(
+                self._read_spill, replaying, self._replay_offset)
+            if not documents:
+                break
+            # a failed flush spills the batch again and sets the next retry
+            await self.flush(documents)
+            if time.monotonic() < self._spill_retry_at:
+                return
+        os.remove(replaying)
@@ -0,0 +1,3 @@
+from .metrics import MetricsRegistry, registry
+
+__all__ = ["MetricsRegistry", "registry"]
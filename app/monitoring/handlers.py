@@ -0,0 +1,41 @@
+"""
+    This FastAPI router exposes the in-process metrics registry: `/metrics` in the Prometheus text
+    format for scraping, `/metrics/kafka` as JSON with per-partition lag and throughput and
+    `/metrics/cache` with hit ratios, load times and value sizes per cache key prefix and
+    `/metrics/db` with the live connection pool statistics of every engine. Only `/metrics` is open
+    for the scraper, the JSON views are for superusers.
+"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.app_config import current_superuser
+from app.broker.metrics import partition_report
+from app.infrastructure.cache_metrics import cache_report
+from app.infrastructure.database.metrics import observe_pools, pool_report
+from app.monitoring.metrics import registry
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    observe_pools()
+    return registry.render()
+
+
+@router.get("/kafka", dependencies=[Depends(current_superuser)])
+async def get_kafka_metrics() -> dict:
+    return {
+        "partitions": partition_report(),
+        "metrics": registry.snapshot(prefix="kafka_"),
+    }
+
+
+@router.get("/cache", dependencies=[Depends(current_superuser)])
+async def get_cache_metrics() -> dict:
+    return cache_report()
+
+
+@router.get("/db", dependencies=[Depends(current_superuser)])
+async def get_db_metrics() -> dict:
+    return {"pools": pool_report()}
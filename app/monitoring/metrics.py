@@ -0,0 +1,221 @@
+# Lightweight in-process metrics: counters, gauges and histograms with labels, rendered in the
+# Prometheus text exposition format or as a JSON snapshot. Every process (API worker or consumer
+# worker) keeps its own registry and exposes it over HTTP.
+import math
+import time
+from collections import deque
+from threading import Lock
+from typing import Iterable
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: tuple[str, ...], key: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, object] = {}
+        self._lock = Lock()
+
+    def labelsets(self) -> list[tuple]:
+        return list(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self) -> list[dict]:
+        return [
+            {"labels": dict(zip(self.labelnames, key)), "value": value}
+            for key, value in list(self._values.items())
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, rate_window: float = 60.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_window = rate_window
+        self._events: dict[tuple, deque] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        now = time.monotonic()
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            events = self._events.setdefault(key, deque())
+            events.append((now, amount))
+            self._trim(events, now)
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def rate(self, **labels) -> float:
+        """Per-second rate over the last `rate_window` seconds."""
+        events = self._events.get(_label_key(self.labelnames, labels))
+        if not events:
+            return 0.0
+        with self._lock:
+            self._trim(events, time.monotonic())
+            return sum(amount for _, amount in events) / self.rate_window
+
+    def _trim(self, events: deque, now: float):
+        while events and events[0][0] < now - self.rate_window:
+            events.popleft()
+
+    def snapshot(self) -> list[dict]:
+        result = []
+        for key, value in list(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            result.append({"labels": labels, "value": value, "rate": self.rate(**labels)})
+        return result
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, default: float = 0, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), default)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """Upper bucket bound below which `q` of the observations fall."""
+        state = self._values.get(_label_key(self.labelnames, labels))
+        if not state or not state["count"]:
+            return None
+        target = q * state["count"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return math.inf
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, state in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+    def snapshot(self) -> list[dict]:
+        result = []
+        for key, state in list(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            result.append({
+                "labels": labels,
+                "count": state["count"],
+                "sum": state["sum"],
+                "p50": self.quantile(0.5, **labels),
+                "p99": self.quantile(0.99, **labels),
+            })
+        return result
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = (), **kwargs) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames, **kwargs)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), **kwargs) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, **kwargs)
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def render(self, prefix: str = "") -> str:
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if name.startswith(prefix):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self, prefix: str = "") -> dict:
+        return {
+            name: metric.snapshot()
+            for name, metric in sorted(self._metrics.items())
+            if name.startswith(prefix)
+        }
+
+
+registry = MetricsRegistry()
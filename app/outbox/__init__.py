@@ -0,0 +1,9 @@
+from .models import OutboxModel
+from .repository import OutboxRepository
+from .relay import OutboxRelay
+
+__all__ = [
+    "OutboxModel",
+    "OutboxRepository",
+    "OutboxRelay",
+]
@@ -0,0 +1,29 @@
+# The `OutboxModel` class defines the transactional outbox table: events are written in the same
+# transaction as the row they describe and published to Kafka later by the outbox relay.
+from datetime import datetime as dt
+
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String
+
+from app.infrastructure.database import Base
+
+
+class OutboxModel(Base):
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    topic = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    # ID of the HTTP request that wrote the event, forwarded by the relay as a trace header
+    request_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=dt.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # the relay only ever scans unsent rows in id order
+        Index(
+            "ix_outbox_unsent",
+            "id",
+            postgresql_where=sent_at.is_(None),
+        ),
+    )
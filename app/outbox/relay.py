@@ -0,0 +1,121 @@
+# The `OutboxRelay` runs in the background of every API worker: it claims unsent outbox rows in
+# batches, publishes each batch through the shared Kafka producer and marks the rows as sent in the
+# same transaction, so a crash between publish and commit only ever leads to a redelivery.
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.broker import metrics
+from app.broker.events import envelope_headers
+from app.broker.producer import KafkaProducer
+from app.outbox.repository import OutboxRepository
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        producer: KafkaProducer,
+        batch_size: int = 500,
+        poll_interval: float = 0.5,
+        retention: timedelta = timedelta(hours=24),
+    ):
+        self.session_factory = session_factory
+        self.producer = producer
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.logger = logger
+        self._stopping = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._last_purge = 0.0
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, session_factory: async_sessionmaker, producer: KafkaProducer
+    ) -> "OutboxRelay":
+        return cls(
+            session_factory=session_factory,
+            producer=producer,
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            poll_interval=settings.OUTBOX_POLL_INTERVAL,
+            retention=timedelta(hours=settings.OUTBOX_RETENTION_HOURS),
+        )
+
+    def start(self):
+        self._stopping.clear()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                relayed = await self.relay_batch()
+            except Exception as e:
+                self.logger.error(f"Outbox relay batch failed, will retry: {e}")
+                relayed = 0
+
+            if relayed < self.batch_size:
+                if relayed == 0:
+                    await self.purge()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def relay_batch(self) -> int:
+        async with self.session_factory() as session:
+            async with session.begin():
+                events = await OutboxRepository.claim_batch(session, self.batch_size)
+                if not events:
+                    return 0
+
+                deliveries = [
+                    await self.producer.produce(
+                        topic=event.topic,
+                        key=event.key,
+                        value=event.payload,
+                        wait=False,
+                        # end-to-end latency is measured from the API write, not the relay
+                        request_id=event.request_id,
+                        produced_at=event.created_at,
+                        headers=self._headers(event.payload),
+                    )
+                    for event in events
+                ]
+                # any failed delivery rolls the transaction back and the batch is retried
+                await asyncio.gather(*deliveries)
+                await OutboxRepository.mark_sent(session, [event.id for event in events])
+
+        metrics.producer_batch_records.observe(len(events), source="outbox")
+        self.logger.info("Relayed %s outbox events", len(events))
+        return len(events)
+
+    @staticmethod
+    def _headers(payload: dict) -> list[tuple[str, bytes]]:
+        # rows written before typed envelopes carry no type
+        if "type" not in payload:
+            return []
+        return envelope_headers(payload["type"], payload.get("version", 1))
+
+    async def purge(self, every: float = 60.0):
+        now = asyncio.get_running_loop().time()
+        if now - self._last_purge < every:
+            return
+        self._last_purge = now
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    await OutboxRepository.purge_sent(session, self.retention)
+        except Exception as e:
+            self.logger.error(f"Outbox purge failed: {e}")
@@ -0,0 +1,77 @@
+# The `OutboxRepository` class writes events into the outbox inside the caller's transaction and lets
+# the relay claim, publish and mark them as sent in batches.
+import logging
+from datetime import datetime, timedelta
+from typing import Sequence
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.broker.events import EventEnvelope, TopicRouter
+from app.monitoring.tracing import get_request_id
+from app.outbox.models import OutboxModel
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRepository:
+    def __init__(self, router: TopicRouter):
+        self.router = router
+        self.logger = logger
+
+    async def add_event(self, session: AsyncSession, event: EventEnvelope) -> None:
+        # no commit here: the event becomes visible together with the caller's row
+        await session.execute(
+            insert(OutboxModel).values(
+                topic=self.router.topic_for(event.type),
+                key=event.partition_key(),
+                payload=event.payload(),
+                request_id=get_request_id(),
+            )
+        )
+
+    async def add_events(self, session: AsyncSession, events: Sequence[EventEnvelope]) -> None:
+        if not events:
+            return
+        request_id = get_request_id()
+        await session.execute(
+            insert(OutboxModel),
+            [
+                {
+                    "topic": self.router.topic_for(event.type),
+                    "key": event.partition_key(),
+                    "payload": event.payload(),
+                    "request_id": request_id,
+                }
+                for event in events
+            ],
+        )
+
+    @staticmethod
+    async def claim_batch(session: AsyncSession, size: int) -> Sequence[OutboxModel]:
+        # SKIP LOCKED lets the relays of several API workers claim disjoint batches
+        query = (
+            select(OutboxModel)
+            .where(OutboxModel.sent_at.is_(None))
+            .order_by(OutboxModel.id)
+            .limit(size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def mark_sent(session: AsyncSession, ids: Sequence[int]) -> None:
+        await session.execute(
+            update(OutboxModel).where(OutboxModel.id.in_(ids)).values(sent_at=datetime.utcnow())
+        )
+
+    @staticmethod
+    async def purge_sent(session: AsyncSession, older_than: timedelta) -> int:
+        result = await session.execute(
+            delete(OutboxModel).where(
+                OutboxModel.sent_at.is_not(None),
+                OutboxModel.sent_at < datetime.utcnow() - older_than,
+            )
+        )
+        return result.rowcount
@@ -0,0 +1,24 @@
+# Opaque keyset pagination cursors: the sort key values of the last item of a page, serialized as
+# compact JSON and base64url encoded. Clients pass them back unchanged to fetch the next page.
+import base64
+import binascii
+import json
+from typing import Any
+
+from app.exceptions import InvalidCursorError
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    data = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError(cursor) from None
+    if not isinstance(values, dict):
+        raise InvalidCursorError(cursor)
+    return values
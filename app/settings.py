@@ -4,6 +4,7 @@
     :return: The `get_settings()` function returns an instance of the `Settings` class with the
     configured settings values.
 """
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,10 +20,68 @@ class Settings(BaseSettings):
     DB_USER: str = "postgres"
     DB_PASSWORD: str = "password"
     DB_NAME: str = "postgres"
+    # engine and pool, see app.infrastructure.database.engine; per process, so
+    # (DB_POOL_SIZE + DB_MAX_OVERFLOW) x processes must stay below postgres max_connections
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_APPLICATION_NAME: str = "fastapi-onion-boilerplate"
+    # read replicas for the repository reads marked @replica_read, see
+    # app.infrastructure.database.routing; empty sends every read to the primary
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_HEALTH_INTERVAL: float = 5.0
+    # a replica lagging more than this is taken out until it catches up (0 ignores the lag)
+    DB_REPLICA_MAX_LAG_SECONDS: float = 10.0
+    # after a successful write a client reads from the primary for this long (0 turns it off)
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
     # =========================================================
     KAFKA_BOOTSTRAP_SERVERS: str = "kafka:19092"
     KAFKA_TOPIC: str = "applications"
     KAFKA_GROUP_ID: str = "api-group"
+    # topic per event type, types without a route go to KAFKA_TOPIC
+    KAFKA_EVENT_TOPICS: dict[str, str] = {
+        "application.created": "applications",
+        "image.uploaded": "images",
+    }
+    # topics the consumers subscribe to, empty means every routed topic
+    KAFKA_CONSUMER_TOPICS: list[str] = []
+    # producer batching, shared by every request through app.kafka_producer
+    KAFKA_PRODUCER_LINGER_MS: int = 5
+    KAFKA_PRODUCER_MAX_BATCH_SIZE: int = 16384
+    KAFKA_PRODUCER_COMPRESSION_TYPE: str | None = None
+    KAFKA_PRODUCER_ACKS: str = "all"
+    # "delivered" waits for the broker ack, "accepted" returns once the record is queued
+    KAFKA_PRODUCER_DELIVERY_MODE: Literal["accepted", "delivered"] = "delivered"
+    KAFKA_PRODUCER_MAX_IN_FLIGHT: int = 1000
+    # consumer batching and backpressure
+    KAFKA_CONSUMER_MAX_RECORDS: int = 500
+    KAFKA_CONSUMER_FETCH_TIMEOUT_MS: int = 500
+    KAFKA_CONSUMER_MAX_CONCURRENCY: int = 64
+    KAFKA_CONSUMER_HIGH_WATERMARK: int = 5000
+    KAFKA_CONSUMER_RETRY_BACKOFF: float = 1.0
+    # delay in seconds of each retry topic tier, failures after the last tier go to <topic>.dlq
+    KAFKA_RETRY_DELAYS: list[float] = [5, 60, 600]
+    # false when consumers run in app.broker.worker instead of the API process
+    KAFKA_EMBEDDED_CONSUMER: bool = True
+    KAFKA_WORKER_PROCESSES: int = 2
+    KAFKA_WORKER_RESTART_DELAY: float = 1.0
+    # worker N serves /metrics on KAFKA_WORKER_METRICS_PORT + N, 0 disables it
+    KAFKA_WORKER_METRICS_PORT: int = 9100
+    # codec name from app.broker.codecs, sent in the content-encoding header
+    KAFKA_MESSAGE_CODEC: str = "json"
+    # transactional outbox: events are committed with their rows and relayed in the background
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL: float = 0.5
+    OUTBOX_RETENTION_HOURS: int = 24
+    # =========================================================
+    # upper bound of the items of one POST /applications/applications:batch
+    APPLICATIONS_BATCH_MAX_ITEMS: int = 100
     # =========================================================
     IMAGE_UPLOAD_DIR: str = "uploads/images"
     # =========================================================
@@ -34,9 +93,54 @@ class Settings(BaseSettings):
     CACHE_PORT: int = 6379
     CACHE_DB: int = 0
     REDIS_URL: str = "redis://cache:6379/0"
+    # in-process tier in front of redis, kept coherent across replicas over redis pub/sub
+    CACHE_NEAR_MAX_ENTRIES: int = 1024
+    CACHE_NEAR_TTL: float = 5.0
+    # concurrent misses share one load; the redis lock extends that across processes
+    CACHE_DISTRIBUTED_LOCK: bool = False
+    CACHE_LOCK_TTL: float = 5.0
+    # probabilistic early refresh of hot keys, 0 disables it
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+    # read endpoints cache their serialized response body
+    CACHE_RESPONSE_ENABLED: bool = True
+    CACHE_RESPONSE_COMPRESS_MIN_BYTES: int = 1024
+    # app.applications.warmup: first list pages and most requested titles, every interval seconds.
+    # Off by default; with Redis only one API replica warms per interval.
+    CACHE_WARMUP_ENABLED: bool = False
+    CACHE_WARMUP_INTERVAL: float = 60.0
+    CACHE_WARMUP_PAGES: int = 5
+    CACHE_WARMUP_PAGE_SIZE: int = 10
+    CACHE_WARMUP_TOP_TITLES: int = 20
+    CACHE_WARMUP_LOOKBACK_HOURS: int = 24
+    # hold startup until the first warm-up finished (or timed out)
+    CACHE_WARMUP_WAIT: bool = False
+    CACHE_WARMUP_TIMEOUT: float = 30.0
     # =========================================================
     MONGODB_URL: str = "mongodb://mongodb:27017/"
     MONGODB_NAME: str = "mongo_db"
+    # audit log entries are queued and written in batches by app.mongo.BufferedLogWriter
+    USER_LOG_BUFFERED: bool = True
+    USER_LOG_BATCH_SIZE: int = 500
+    USER_LOG_FLUSH_INTERVAL: float = 1.0
+    USER_LOG_QUEUE_SIZE: int = 10000
+    # write concern "w" of the flushes: a number or "majority"
+    USER_LOG_WRITE_CONCERN: str = "1"
+    USER_LOG_JOURNAL: bool = False
+    # what happens to entries submitted while the queue is full
+    USER_LOG_OVERFLOW: Literal["drop", "spill"] = "drop"
+    USER_LOG_SPILL_PATH: str = "/tmp/user_logs.spill.jsonl"
+    # endpoint -> "full", "sample:<rate>" or "aggregate"; write endpoints are always "full"
+    USER_LOG_POLICIES: dict[str, str] = {
+        "get_all_applications": "aggregate",
+        "get_applications_page": "aggregate",
+        "get_application_by_id": "sample:0.1",
+        "get_application_by_title": "sample:0.1",
+        "get_image": "sample:0.1",
+    }
+    USER_LOG_AGGREGATE_FLUSH_INTERVAL: float = 15.0
+    # user_logs is a time-series collection, entries expire after this many days (0 keeps them)
+    USER_LOG_TTL_DAYS: int = 30
+    USER_LOG_GRANULARITY: Literal["seconds", "minutes", "hours"] = "seconds"
 
     model_config = SettingsConfigDict(
         env_file="../.env", extra="ignore", case_sensitive=False,
@@ -50,6 +154,7 @@ class Settings(BaseSettings):
 class DescriptionSettings(BaseSettings):
     PAGE_DESCRIPTION: str = "Page number, starts with one"
     SIZE_DESCRIPTION: str = "Amount elements on the page"
+    CURSOR_DESCRIPTION: str = "next_cursor of the previous page, omit for the first page"
 
 
 def get_settings():
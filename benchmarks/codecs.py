@@ -0,0 +1,66 @@
+"""
+    Reports encoded size and encode/decode cost per message for every registered broker codec,
+    next to the legacy `json.dumps(indent=4, sort_keys=True)` serializer, using the payloads built in
+    `ApplicationService.create_application` and `ImageService.upload_image`.
+
+        uv run python -m benchmarks.codecs --iterations 100000
+"""
+import argparse
+import datetime
+import json
+import timeit
+import uuid
+
+from app.broker.codecs import registered_codecs
+
+
+def application_payload() -> dict:
+    return {
+        "id": 123456,
+        "title": "Senior backend engineer application",
+        "description": "Five years of FastAPI, Kafka and PostgreSQL in production.",
+        "created_at": datetime.datetime.now(datetime.UTC),
+        "user_id": str(uuid.uuid4()),
+    }
+
+
+def image_payload() -> dict:
+    return {
+        "id": 654321,
+        "filename": "avatar_7f3d2c1b.jpg",
+        "size": 0.4871,
+        "upload_date": datetime.datetime.now(),
+        "user_id": str(uuid.uuid4()),
+    }
+
+
+def legacy_encode(value: dict) -> bytes:
+    return json.dumps(value, indent=4, sort_keys=True, default=str).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    codecs = {"legacy-json": (legacy_encode, json.loads)}
+    codecs.update({name: (c.encode, c.decode) for name, c in registered_codecs().items()})
+
+    print(f"{'payload':<12} {'codec':<12} {'bytes':>6} {'encode µs':>10} {'decode µs':>10}")
+    for payload_name, payload in (
+        ("application", application_payload()),
+        ("image", image_payload()),
+    ):
+        for codec_name, (encode, decode) in codecs.items():
+            encoded = encode(payload)
+            encode_s = timeit.timeit(lambda: encode(payload), number=args.iterations)
+            decode_s = timeit.timeit(lambda: decode(encoded), number=args.iterations)
+            print(
+                f"{payload_name:<12} {codec_name:<12} {len(encoded):>6} "
+                f"{encode_s / args.iterations * 1e6:>10.2f} "
+                f"{decode_s / args.iterations * 1e6:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
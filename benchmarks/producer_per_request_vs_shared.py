@@ -0,0 +1,91 @@
+"""
+    Compares requests per second of the old per-request producer (build, start and leak an
+    AIOKafkaProducer for every request) with the shared, app-scoped producer started once in
+    `app.main.lifespan`. Every simulated request publishes the same payload that
+    `ApplicationService.create_application` sends.
+
+    Needs a running broker:
+        uv run python -m benchmarks.producer_per_request_vs_shared --bootstrap localhost:9092
+"""
+import argparse
+import asyncio
+import datetime
+import time
+import uuid
+
+from app.broker.producer import KafkaProducer
+from app.settings import get_settings
+
+
+def build_message(i: int) -> dict:
+    return {
+        "id": i,
+        "title": f"benchmark-{i}",
+        "description": "benchmark application",
+        "created_at": datetime.datetime.now(datetime.UTC),
+        "user_id": str(uuid.uuid4()),
+    }
+
+
+async def per_request(bootstrap: str, topic: str, i: int, leaked: list):
+    # mirrors the old app.dependency.get_kafka_producer: never stopped
+    producer = KafkaProducer(bootstrap_servers=bootstrap)
+    await producer.start()
+    leaked.append(producer)
+    await producer.produce(topic=topic, key=str(i), value=build_message(i))
+
+
+async def shared(producer: KafkaProducer, topic: str, i: int):
+    await producer.produce(topic=topic, key=str(i), value=build_message(i))
+
+
+async def run(requests: int, concurrency: int, make_request) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await make_request(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bootstrap", default=settings.KAFKA_BOOTSTRAP_SERVERS)
+    parser.add_argument("--topic", default="benchmark-producer")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    leaked: list[KafkaProducer] = []
+    per_request_rps = await run(
+        args.requests,
+        args.concurrency,
+        lambda i: per_request(args.bootstrap, args.topic, i, leaked),
+    )
+    for producer in leaked:
+        await producer.stop()
+
+    settings.KAFKA_BOOTSTRAP_SERVERS = args.bootstrap
+    producer = KafkaProducer.from_settings(settings)
+    await producer.start()
+    try:
+        shared_rps = await run(
+            args.requests,
+            args.concurrency,
+            lambda i: shared(producer, args.topic, i),
+        )
+    finally:
+        await producer.stop()
+
+    print(f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"per-request producer: {per_request_rps:10.1f} req/s")
+    print(f"shared producer:      {shared_rps:10.1f} req/s")
+    print(f"speedup:              {shared_rps / per_request_rps:10.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+    Hit-path latency of the two cache levels for a page of applications, against the in-memory
+    fastapi-cache backend so only the CPU work is measured:
+
+    - repository: the `@cached` entry is decoded, validated into `ApplicationSchema` by the service and
+      serialized again by FastAPI's `serialize_response` + `JSONResponse`;
+    - response: `cached_response` returns the stored body, gzipped or not, as it is.
+
+        uv run python -m benchmarks.response_cache --iterations 20000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from app.applications import ApplicationSchema
+from app.infrastructure.cache import body_response, encode_body
+
+
+def application_rows(size: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "title": f"Senior backend engineer application {i}",
+            "description": "Five years of FastAPI, Kafka and PostgreSQL in production.",
+            "created_at": datetime.now(),
+            "user_id": uuid.uuid4(),
+        }
+        for i in range(size)
+    ]
+
+
+async def repository_hit(backend, key: str, field) -> bytes:
+    rows = FastAPICache.get_coder().decode(await backend.get(key))
+    items = [ApplicationSchema.model_validate(row) for row in rows]
+    content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+
+async def response_hit(backend, key: str, accept_encoding: str) -> bytes:
+    return body_response(await backend.get(key), accept_encoding).body
+
+
+async def measure(iterations: int, hit) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await hit()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def run(iterations: int, compress_min_bytes: int):
+    backend = InMemoryBackend()
+    FastAPICache.init(backend, prefix="bench")
+    field = create_model_field(name="Response", type_=List[ApplicationSchema], mode="serialization")
+
+    print(f"{'page':>5} {'cache level':<22} {'bytes':>7} {'hit µs':>9}")
+    for size in (10, 100):
+        rows = application_rows(size)
+        await backend.set("repository", FastAPICache.get_coder().encode(rows), 3600)
+        body = encode_body(rows, List[ApplicationSchema], compress_min_bytes)
+        await backend.set("response", body, 3600)
+
+        cases = [
+            ("repository", len(FastAPICache.get_coder().encode(rows)),
+             lambda: repository_hit(backend, "repository", field)),
+            ("response", len(body), lambda: response_hit(backend, "response", "")),
+            ("response (gzip ok)", len(body), lambda: response_hit(backend, "response", "gzip")),
+        ]
+        for name, stored, hit in cases:
+            await hit()
+            print(f"{size:>5} {name:<22} {stored:>7} {await measure(iterations, hit):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--compress-min-bytes", type=int, default=1024)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.compress_min_bytes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.broker.codecs import CODEC_HEADER, Codec, codec_from_headers, get_codec
+from app.broker.consumer import KafkaConsumer
+from app.exceptions import CodecNotFoundError
+
+payload = {
+    "id": 1,
+    "title": "title",
+    "description": None,
+    "created_at": datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC),
+    "user_id": "7f3d2c1b-0000-0000-0000-000000000000",
+}
+
+
+@pytest.mark.parametrize("name", ["json", "msgpack"])
+def test_codec__roundtrip(name: str):
+    codec = get_codec(name)
+
+    decoded = codec.decode(codec.encode(payload))
+
+    assert decoded["created_at"] == "2025-01-01 00:00:00+00:00"
+    assert decoded["title"] == payload["title"]
+
+
+def test_json_codec__is_compact():
+    encoded = get_codec("json").encode(payload)
+
+    assert b"\n" not in encoded
+    assert b", " not in encoded
+
+
+def test_codec_from_headers__unknown_codec():
+    with pytest.raises(CodecNotFoundError):
+        codec_from_headers([(CODEC_HEADER, b"avro")])
+
+
+def test_consumer_decode__legacy_and_new_messages():
+    legacy = SimpleNamespace(
+        headers=(),
+        value=json.dumps(payload, indent=4, sort_keys=True, default=str).encode(),
+    )
+    packed = SimpleNamespace(
+        headers=((CODEC_HEADER, b"msgpack"),),
+        value=get_codec("msgpack").encode(payload),
+    )
+
+    assert KafkaConsumer.decode(legacy)["id"] == 1
+    assert KafkaConsumer.decode(packed)["id"] == 1
+
+
+def test_codec__is_abstract():
+    class Incomplete(Codec):
+        name = "incomplete"
+
+        def encode(self, value):
+            return b""
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,307 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiokafka.structs import ConsumerRecord, TopicPartition
+
+from app.broker import metrics
+from app.broker.codecs import get_codec
+from app.broker.consumer import KafkaConsumer
+from app.broker.handlers import HandlerRegistry
+from app.broker.tracing import trace_headers
+from app.exceptions import KafkaMessageError
+from app.monitoring.tracing import get_request_id
+from app.settings import Settings
+
+tp = TopicPartition("applications", 0)
+
+
+def make_record(offset: int, key: str, headers=(), topic: str = tp.topic) -> ConsumerRecord:
+    return ConsumerRecord(
+        topic=topic,
+        partition=tp.partition,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=0,
+        key=key.encode(),
+        value=get_codec("json").encode({"offset": offset}),
+        checksum=None,
+        serialized_key_size=len(key),
+        serialized_value_size=0,
+        headers=headers,
+    )
+
+
+def make_consumer(registry: HandlerRegistry, **overrides) -> KafkaConsumer:
+    settings = Settings(KAFKA_CONSUMER_RETRY_BACKOFF=0, **overrides)
+    consumer = KafkaConsumer(settings=settings, handlers=registry, producer=AsyncMock())
+    consumer.consumer = MagicMock()
+    consumer.consumer.commit = AsyncMock()
+    consumer.consumer.highwater.return_value = None
+    return consumer
+
+
+@pytest.mark.asyncio
+async def test_process_partition__keeps_order_within_key_and_commits():
+    registry = HandlerRegistry()
+    seen = []
+
+    @registry.register("applications")
+    async def handler(event):
+        if event.key == "a":
+            await asyncio.sleep(0.01)
+        seen.append((event.key, event.value["offset"]))
+
+    consumer = make_consumer(registry)
+    consumer._queues[tp].append(
+        [make_record(0, "a"), make_record(1, "b"), make_record(2, "a")])
+    consumer._in_flight = 3
+
+    await consumer._process_partition(tp)
+
+    assert [offset for key, offset in seen if key == "a"] == [0, 2]
+    assert seen[0] == ("b", 1)
+    consumer.consumer.commit.assert_awaited_once_with({tp: 3})
+    assert consumer._in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_process_partition__forwards_failure_to_retry_topic_and_keeps_flowing():
+    registry = HandlerRegistry()
+    seen = []
+
+    @registry.register("applications")
+    async def handler(event):
+        if event.value["offset"] == 1:
+            raise ValueError("poison")
+        seen.append(event.value["offset"])
+
+    consumer = make_consumer(registry)
+    consumer._queues[tp].extend([
+        [make_record(0, "a"), make_record(1, "b"), make_record(2, "b")],
+        [make_record(3, "c")],
+    ])
+    consumer._in_flight = 4
+
+    await consumer._process_partition(tp)
+
+    assert sorted(seen) == [0, 2, 3]
+    topic, key, value, headers = consumer.producer.send.await_args.args
+    assert (topic, key) == ("applications.retry.1", b"b")
+    assert dict(headers)["retry-attempt"] == b"1"
+    assert consumer.consumer.commit.await_args_list[-1].args == ({tp: 4},)
+    consumer.consumer.seek.assert_not_called()
+    assert consumer._in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_process_partition__seeks_back_when_forwarding_fails():
+    registry = HandlerRegistry()
+
+    @registry.register("applications")
+    async def handler(event):
+        if event.value["offset"] == 1:
+            raise ValueError("poison")
+
+    consumer = make_consumer(registry)
+    consumer.producer.send.side_effect = KafkaMessageError("broker down")
+    consumer._queues[tp].extend([
+        [make_record(0, "a"), make_record(1, "b"), make_record(2, "b")],
+        [make_record(3, "c")],
+    ])
+    consumer._in_flight = 4
+
+    await consumer._process_partition(tp)
+
+    consumer.consumer.commit.assert_awaited_once_with({tp: 1})
+    consumer.consumer.seek.assert_called_once_with(tp, 1)
+    assert consumer._in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_process_partition__holds_retry_partition_until_due():
+    registry = HandlerRegistry()
+    handled_at = []
+
+    @registry.register("applications")
+    async def handler(event):
+        handled_at.append(time.time())
+
+    consumer = make_consumer(registry)
+    retry_tp = TopicPartition("applications.retry.1", 0)
+    consumer.consumer.assignment.return_value = {retry_tp}
+    due = time.time() + 0.05
+    record = make_record(0, "a", headers=[
+        ("retry-original-topic", b"applications"),
+        ("retry-attempt", b"1"),
+        ("retry-not-before", str(int(due * 1000)).encode()),
+    ], topic=retry_tp.topic)
+    consumer._queues[retry_tp].append([record])
+
+    await consumer._process_partition(retry_tp)
+
+    assert handled_at and handled_at[0] >= due - 0.001
+    consumer.consumer.pause.assert_called_once_with(retry_tp)
+    consumer.consumer.resume.assert_called_once_with(retry_tp)
+    assert not consumer._delayed
+
+
+def make_retry_record(offset: int, due: float) -> ConsumerRecord:
+    return make_record(offset, "a", headers=[
+        ("retry-original-topic", b"applications"),
+        ("retry-attempt", b"1"),
+        ("retry-not-before", str(int(due * 1000)).encode()),
+    ], topic="applications.retry.1")
+
+
+@pytest.mark.asyncio
+async def test_process_partition__handles_retry_records_as_they_come_due():
+    registry = HandlerRegistry()
+    handled_at = []
+
+    @registry.register("applications")
+    async def handler(event):
+        handled_at.append(time.time())
+
+    consumer = make_consumer(registry)
+    retry_tp = TopicPartition("applications.retry.1", 0)
+    consumer.consumer.assignment.return_value = {retry_tp}
+    first, second = time.time() + 0.02, time.time() + 0.1
+    consumer._queues[retry_tp].append([make_retry_record(0, first), make_retry_record(1, second)])
+    consumer._in_flight = consumer._delayed_records = 2
+
+    await consumer._process_partition(retry_tp)
+
+    assert first - 0.001 <= handled_at[0] < second
+    assert handled_at[1] >= second - 0.001
+    assert [call.args[0] for call in consumer.consumer.commit.await_args_list] == [
+        {retry_tp: 1}, {retry_tp: 2}]
+    assert consumer._in_flight == 0
+    assert consumer._delayed_records == 0
+
+
+@pytest.mark.asyncio
+async def test_consume_messages__delayed_retry_records_do_not_pause_fetching():
+    registry = HandlerRegistry()
+
+    @registry.register("applications")
+    async def handler(event):
+        pass
+
+    consumer = make_consumer(registry, KAFKA_CONSUMER_HIGH_WATERMARK=2)
+    retry_tp = TopicPartition("applications.retry.1", 0)
+    due = time.time() + 60
+    batches = [{retry_tp: [make_retry_record(0, due), make_retry_record(1, due)]}]
+
+    async def getmany(**kwargs):
+        if batches:
+            return batches.pop()
+        await asyncio.sleep(0.01)
+        return {}
+
+    consumer.consumer.getmany.side_effect = getmany
+    consumer.consumer.assignment.return_value = {tp, retry_tp}
+
+    task = asyncio.create_task(consumer.consume_messages())
+    await asyncio.sleep(0.03)
+
+    assert not consumer._paused
+    consumer.consumer.pause.assert_called_once_with(retry_tp)
+    task.cancel()
+    await consumer.drain([retry_tp])
+    assert consumer._in_flight == consumer._delayed_records == 0
+
+
+@pytest.mark.asyncio
+async def test_consume_messages__pauses_above_high_watermark():
+    registry = HandlerRegistry()
+    release = asyncio.Event()
+
+    @registry.register("applications")
+    async def handler(event):
+        await release.wait()
+
+    consumer = make_consumer(registry, KAFKA_CONSUMER_HIGH_WATERMARK=2)
+    batches = [{tp: [make_record(0, "a"), make_record(1, "b")]}]
+
+    async def getmany(**kwargs):
+        if batches:
+            return batches.pop()
+        await asyncio.sleep(0.01)
+        return {}
+
+    consumer.consumer.getmany.side_effect = getmany
+    consumer.consumer.assignment.return_value = {tp}
+    consumer.consumer.paused.return_value = {tp}
+
+    task = asyncio.create_task(consumer.consume_messages())
+    await asyncio.sleep(0.005)
+    consumer.consumer.pause.assert_called_once_with(tp)
+
+    release.set()
+    await asyncio.sleep(0.05)
+    task.cancel()
+    consumer.consumer.resume.assert_called_once_with(tp)
+
+
+@pytest.mark.asyncio
+async def test_process_partition__records_lag_and_handler_latency():
+    registry = HandlerRegistry()
+
+    @registry.register("applications")
+    async def handler(event):
+        pass
+
+    consumer = make_consumer(registry)
+    records = [make_record(10, "a"), make_record(11, "a")]
+    metrics.observe_fetch(tp.topic, tp.partition, records, highwater=20)
+    consumer._queues[tp].append(records)
+
+    await consumer._process_partition(tp)
+
+    assert metrics.consumer_committed_offset.value(topic=tp.topic, partition=0) == 12
+    assert metrics.consumer_lag.value(topic=tp.topic, partition=0) == 8
+    assert metrics.consumer_handler_seconds.quantile(0.5, event_type="applications") is not None
+
+
+@pytest.mark.asyncio
+async def test_process_partition__records_end_to_end_latency_under_request_id():
+    registry = HandlerRegistry()
+    seen = []
+
+    @registry.register("applications")
+    async def handler(event):
+        seen.append(get_request_id())
+
+    consumer = make_consumer(registry)
+    produced_at = datetime.now(timezone.utc) - timedelta(seconds=3)
+    consumer._queues[tp].append(
+        [make_record(0, "a", headers=trace_headers("req-1", produced_at))])
+
+    await consumer._process_partition(tp)
+
+    assert seen == ["req-1"]
+    assert get_request_id() is None
+    latency = metrics.consumer_end_to_end_seconds.quantile(0.5, event_type="applications")
+    assert 2.5 <= latency <= 5
+
+
+@pytest.mark.asyncio
+async def test_process_partition__garbage_headers_do_not_stop_the_partition():
+    registry = HandlerRegistry()
+    seen = []
+
+    @registry.register("applications")
+    async def handler(event):
+        seen.append(event.value["offset"])
+
+    consumer = make_consumer(registry)
+    garbage = [("produced-at", b"yesterday"), ("request-id", b"\xff\xfe"), ("event-type", b"\xff")]
+    consumer._queues[tp].append([make_record(0, "a", headers=garbage), make_record(1, "a")])
+
+    await consumer._process_partition(tp)
+
+    assert seen == [0, 1]
+    consumer.consumer.commit.assert_awaited_once_with({tp: 2})
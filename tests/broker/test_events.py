@@ -0,0 +1,37 @@
+import datetime
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.applications.events import ApplicationCreated, application_created_event
+from app.broker.events import TopicRouter, parse_event
+from app.settings import Settings
+
+
+def make_event(user_id: uuid.UUID) -> ApplicationCreated:
+    application = SimpleNamespace(
+        id=1, title="title", description=None, created_at=datetime.datetime(2026, 1, 1))
+    return application_created_event(application, user_id)
+
+
+def test_router__routes_event_types_and_falls_back_to_default_topic():
+    router = TopicRouter.from_settings(Settings(
+        KAFKA_TOPIC="events",
+        KAFKA_EVENT_TOPICS={"application.created": "applications"},
+    ))
+
+    assert router.topic_for("application.created") == "applications"
+    assert router.topic_for("image.uploaded") == "events"
+    assert router.topics() == ["applications", "events"]
+
+
+def test_parse_event__round_trips_typed_envelope():
+    event = make_event(uuid.uuid4())
+
+    parsed = parse_event(event.payload())
+
+    assert isinstance(parsed, ApplicationCreated)
+    assert parsed == event
+    with pytest.raises(ValueError):
+        parse_event({"type": "application.created", "version": 2})
@@ -0,0 +1,192 @@
+import asyncio
+import datetime
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiokafka.errors import KafkaConnectionError, KafkaTimeoutError
+from aiokafka.structs import RecordMetadata
+
+from app.applications.events import application_created_event
+from app.broker.events import TopicRouter
+from app.broker.producer import KafkaProducer, shutdown_kafka_producer, startup_kafka_producer
+from app.broker.tracing import PRODUCED_AT_HEADER, REQUEST_ID_HEADER
+from app.exceptions import KafkaMessageError
+from app.monitoring.tracing import request_id_var
+from app.settings import Settings
+
+
+def test_from_settings__batching_config():
+    settings = Settings(
+        KAFKA_PRODUCER_LINGER_MS=20,
+        KAFKA_PRODUCER_MAX_BATCH_SIZE=65536,
+        KAFKA_PRODUCER_COMPRESSION_TYPE="gzip",
+        KAFKA_PRODUCER_ACKS="1",
+    )
+    producer = KafkaProducer.from_settings(settings)
+
+    assert producer.linger_ms == 20
+    assert producer.max_batch_size == 65536
+    assert producer.compression_type == "gzip"
+    assert producer.acks == 1
+
+
+@pytest.mark.asyncio
+async def test_start__passes_batching_config():
+    producer = KafkaProducer("kafka:9092", linger_ms=10, acks="all")
+    with patch("app.broker.producer.AIOKafkaProducer") as aio_producer:
+        aio_producer.return_value.start = AsyncMock()
+        await producer.start()
+
+    kwargs = aio_producer.call_args.kwargs
+    assert kwargs["linger_ms"] == 10
+    assert kwargs["acks"] == "all"
+
+
+@pytest.mark.asyncio
+async def test_startup__failed_start_closes_without_flushing():
+    app = SimpleNamespace()
+    with patch("app.broker.producer.AIOKafkaProducer") as aio_producer:
+        aio_producer.return_value = AsyncMock()
+        aio_producer.return_value.start.side_effect = KafkaConnectionError("down")
+        with pytest.raises(KafkaConnectionError):
+            await startup_kafka_producer(app, Settings())
+
+    aio_producer.return_value.stop.assert_awaited_once()
+    aio_producer.return_value.flush.assert_not_awaited()
+    assert app.kafka_producer.producer is None
+
+
+@pytest.mark.asyncio
+async def test_shutdown__flushes_shared_producer():
+    class App:
+        pass
+
+    app = App()
+    app.kafka_producer = KafkaProducer("kafka:9092")
+    aio_producer = AsyncMock()
+    app.kafka_producer.producer = aio_producer
+
+    await shutdown_kafka_producer(app)
+
+    aio_producer.flush.assert_awaited_once()
+    aio_producer.stop.assert_awaited_once()
+    assert app.kafka_producer.producer is None
+
+
+def _started_producer(**kwargs) -> tuple[KafkaProducer, list]:
+    producer = KafkaProducer("kafka:9092", **kwargs)
+    pending = []
+
+    async def send(topic, value, key, **kwargs):
+        delivery = asyncio.get_running_loop().create_future()
+        pending.append(delivery)
+        return delivery
+
+    producer.producer = AsyncMock()
+    producer.producer.send.side_effect = send
+    return producer, pending
+
+
+@pytest.mark.asyncio
+async def test_produce__accepted_mode_returns_before_delivery():
+    delivered = []
+    producer, pending = _started_producer(
+        delivery_mode="accepted",
+        on_delivery=lambda topic, metadata, error: delivered.append((topic, error)),
+    )
+
+    delivery = await producer.produce("applications", "1", {"id": 1})
+
+    assert not delivery.done()
+    assert producer.stats.in_flight == 1
+
+    pending[0].set_result(RecordMetadata("applications", 0, None, 7, -1, -1, 0))
+    await asyncio.sleep(0)
+
+    assert delivered == [("applications", None)]
+    assert producer.stats.delivered == 1
+    assert producer.stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_produce__delivered_mode_raises_on_broker_error():
+    producer, pending = _started_producer(delivery_mode="delivered")
+
+    task = asyncio.create_task(producer.produce("applications", "1", {"id": 1}))
+    await asyncio.sleep(0)
+    pending[0].set_exception(KafkaTimeoutError())
+
+    with pytest.raises(KafkaMessageError):
+        await task
+    assert producer.stats.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_produce__bounds_outstanding_sends():
+    producer, pending = _started_producer(delivery_mode="accepted", max_in_flight=1)
+
+    await producer.produce("applications", "1", {"id": 1})
+    blocked = asyncio.create_task(producer.produce("applications", "2", {"id": 2}))
+    await asyncio.sleep(0)
+
+    assert not blocked.done()
+    pending[0].set_result(RecordMetadata("applications", 0, None, 1, -1, -1, 0))
+    await blocked
+    assert producer.stats.sent == 2
+
+
+@pytest.mark.asyncio
+async def test_produce__attaches_trace_headers():
+    producer, pending = _started_producer(delivery_mode="accepted")
+    token = request_id_var.set("req-1")
+    try:
+        await producer.produce("applications", "1", {"id": 1})
+    finally:
+        request_id_var.reset(token)
+
+    headers = dict(producer.producer.send.call_args.kwargs["headers"])
+    assert headers[REQUEST_ID_HEADER] == b"req-1"
+    assert abs(int(headers[PRODUCED_AT_HEADER]) - time.time() * 1000) < 5000
+
+
+@pytest.mark.asyncio
+async def test_publish__routes_by_type_and_keys_by_user():
+    producer, pending = _started_producer(delivery_mode="accepted")
+    producer.router = TopicRouter(default="events", routes={"application.created": "applications"})
+    user_id = uuid.uuid4()
+
+    await producer.publish(application_created_event(SimpleNamespace(
+        id=1, title="title", description=None, created_at=datetime.datetime(2026, 1, 1)), user_id))
+
+    call = producer.producer.send.call_args
+    headers = dict(call.kwargs["headers"])
+    assert call.args[0] == "applications"
+    assert call.kwargs["key"] == str(user_id).encode()
+    assert headers["event-type"] == b"application.created"
+    assert headers["schema-version"] == b"1"
+
+
+@pytest.mark.asyncio
+async def test_publish_batch__queues_all_before_waiting():
+    producer, pending = _started_producer(delivery_mode="delivered")
+    events = [
+        application_created_event(SimpleNamespace(
+            id=i, title="title", description=None, created_at=datetime.datetime(2026, 1, 1)),
+            uuid.uuid4())
+        for i in range(3)
+    ]
+
+    task = asyncio.create_task(producer.publish_batch(events))
+    await asyncio.sleep(0)
+    # every record is in the accumulator while none is acked yet
+    assert len(pending) == 3
+    assert not task.done()
+
+    pending[0].set_result(RecordMetadata("applications", 0, None, 1, -1, -1, 0))
+    pending[1].set_exception(KafkaTimeoutError())
+    pending[2].set_result(RecordMetadata("applications", 0, None, 2, -1, -1, 0))
+
+    assert await task == [True, False, True]
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from aiokafka.structs import ConsumerRecord, TopicPartition
+
+from app.broker.replay import replay_records
+from app.broker.retry import RetryPolicy, not_before
+
+
+def make_record(topic: str, offset: int = 0, headers=()) -> ConsumerRecord:
+    return ConsumerRecord(
+        topic=topic,
+        partition=0,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=0,
+        key=b"1",
+        value=b"{}",
+        checksum=None,
+        serialized_key_size=1,
+        serialized_value_size=2,
+        headers=list(headers),
+    )
+
+
+def test_next_hop__walks_retry_tiers_then_dead_letter():
+    policy = RetryPolicy(delays=(5, 60))
+    record = make_record("applications", headers=[("event-type", b"applications")])
+
+    topic, headers = policy.next_hop(record, ValueError("boom"))
+    assert topic == "applications.retry.1"
+    assert dict(headers)["event-type"] == b"applications"
+    assert dict(headers)["retry-error"] == b"ValueError: boom"
+    assert 4 <= not_before(make_record(topic, headers=headers)) - time.time() <= 5
+
+    topic, headers = policy.next_hop(make_record(topic, headers=headers), ValueError("boom"))
+    assert topic == "applications.retry.2"
+
+    topic, headers = policy.next_hop(make_record(topic, headers=headers), ValueError("boom"))
+    assert topic == "applications.dlq"
+    assert dict(headers)["retry-attempt"] == b"3"
+    assert "retry-not-before" not in dict(headers)
+
+
+@pytest.mark.asyncio
+async def test_replay_records__forwards_to_original_topic_without_retry_headers():
+    dlq = TopicPartition("applications.dlq", 0)
+    records = [
+        make_record(dlq.topic, offset, headers=[
+            ("request-id", b"req-1"),
+            ("retry-original-topic", b"applications"),
+            ("retry-attempt", b"4"),
+        ])
+        for offset in range(3)
+    ]
+    consumer = AsyncMock()
+    consumer.getmany.side_effect = [{dlq: records}, {}]
+
+    async def send(*args, **kwargs):
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_result(None)
+        return delivery
+
+    producer = AsyncMock()
+    producer.send.side_effect = send
+
+    replayed = await replay_records(consumer, producer, limit=2)
+
+    assert replayed == 2
+    topic, key, value, headers = producer.send.await_args.args
+    assert topic == "applications"
+    assert headers == [("request-id", b"req-1")]
+    consumer.commit.assert_awaited_once_with({dlq: 2})
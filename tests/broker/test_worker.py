@@ -0,0 +1,64 @@
+import asyncio
+import signal
+import socket
+
+import pytest
+
+from app.broker.worker import WorkerSupervisor, metrics_server, serve_metrics
+
+
+class FakeProcess:
+    started = 0
+
+    def __init__(self, target, args, name):
+        self.args = args
+        self.alive = False
+        self.exitcode = None
+        self.pid = None
+
+    def start(self):
+        FakeProcess.started += 1
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+
+class FakeContext:
+    Process = FakeProcess
+
+
+def test_supervisor__restarts_crashed_worker_after_delay():
+    FakeProcess.started = 0
+    supervisor = WorkerSupervisor(2, restart_delay=5, context=FakeContext())
+    supervisor.start()
+
+    crashed = supervisor.workers[1]
+    crashed.alive = False
+    crashed.exitcode = 1
+
+    supervisor.check(now=100)
+    assert supervisor.workers[1] is crashed
+
+    supervisor.check(now=105)
+    assert supervisor.workers[1] is not crashed
+    assert supervisor.workers[1].is_alive()
+    assert FakeProcess.started == 3
+
+
+@pytest.mark.asyncio
+async def test_metrics_server__bind_failure_is_logged_not_raised(caplog):
+    with socket.socket() as taken:
+        taken.bind(("0.0.0.0", 0))
+        taken.listen()
+        server = metrics_server(taken.getsockname()[1])
+
+        await asyncio.wait_for(serve_metrics(server), timeout=5)
+
+    assert "Metrics server on port" in caplog.text
+
+
+def test_metrics_server__leaves_the_signal_handlers_alone():
+    handler = signal.getsignal(signal.SIGTERM)
+    with metrics_server(0).capture_signals():
+        assert signal.getsignal(signal.SIGTERM) is handler
@@ -18,7 +18,9 @@ from fastapi_cache.backends.inmemory import InMemoryBackend
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+from app.infrastructure import cache
 from app.infrastructure.database.database import Base
+from app.infrastructure.near_cache import near_cache
 from tests.utils.factories import ApplicationFactory, ImageFactory
 from tests.utils.utils import random_lower_string
 
@@ -34,6 +36,11 @@ def init_cache():
     FastAPICache.init(InMemoryBackend(), prefix="test-cache")
     yield
     FastAPICache.reset()
+    # keys no longer contain the session, so entries would leak between tests
+    InMemoryBackend._store.clear()
+    near_cache.clear()
+    # a recent invalidation would send the next test's fills to the primary
+    cache._local_invalidated.clear()
 
 
 @pytest_asyncio.fixture
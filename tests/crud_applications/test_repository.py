@@ -1,10 +1,13 @@
 import pytest
 import logging
+import uuid
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.applications import ApplicationCreateSchema
 from app.applications.repository import ApplicationRepository
 from tests.utils.factories import ApplicationFactory
+from tests.utils.utils import count_statements
 
 logger = logging.getLogger(__name__)
 
@@ -50,3 +53,116 @@ async def test_get_single_application(db_session: AsyncSession):
 
     app = await repository.get_application_by_title(app_1.title)
     assert app is not None
+
+
+@pytest.mark.asyncio
+async def test_get_applications_after__walks_keyset_newest_first(db_session: AsyncSession):
+    created = [await ApplicationFactory.create() for _ in range(3)]
+    await db_session.commit()
+    newest_first = sorted(created, key=lambda app: (app.created_at, app.id), reverse=True)
+
+    repository = ApplicationRepository(db_session)
+    first = await repository.get_applications_after(size=2)
+    last = first[-1]
+    rest = await repository.get_applications_after(size=2, after=(last.created_at, last.id))
+
+    assert [app.id for app in first] == [app.id for app in newest_first[:2]]
+    assert [app.id for app in rest] == [newest_first[2].id]
+
+
+@pytest.mark.asyncio
+async def test_edit_application_info__evicts_cached_title_and_id(db_session: AsyncSession):
+    application = await ApplicationFactory.create()
+    await db_session.commit()
+    old_title = application.title
+
+    repository = ApplicationRepository(db_session)
+    assert len(await repository.get_application_by_title(old_title)) == 1
+    assert (await repository.get_application_by_id(application.id)).title == old_title
+
+    await repository.edit_application_info(
+        application.id, application.user_id, new_title="renamed")
+
+    assert await repository.get_application_by_title(old_title) == []
+    assert len(await repository.get_application_by_title("renamed")) == 1
+    assert (await repository.get_application_by_id(application.id)).title == "renamed"
+
+
+@pytest.mark.asyncio
+async def test_create_application__evicts_cached_list_pages(db_session: AsyncSession):
+    await ApplicationFactory.create()
+    await db_session.commit()
+    repository = ApplicationRepository(db_session)
+    assert len(await repository.get_all_applications(page=1, size=10)) == 1
+
+    await repository.create_application(
+        ApplicationCreateSchema(title="new", description="d"), uuid.uuid4())
+
+    assert len(await repository.get_all_applications(page=1, size=10)) == 2
+
+
+@pytest.mark.asyncio
+async def test_edit_application_info__single_statement(db_session: AsyncSession):
+    application = await ApplicationFactory.create()
+    await db_session.commit()
+    repository = ApplicationRepository(db_session)
+
+    with count_statements(db_session) as statements:
+        edited = await repository.edit_application_info(
+            application.id, application.user_id, new_description="changed")
+
+    assert len(statements) == 1
+    assert edited.description == "changed"
+    assert edited.title == application.title
+
+
+@pytest.mark.asyncio
+async def test_edit_application_info__other_users_application_is_not_found(
+    db_session: AsyncSession,
+):
+    application = await ApplicationFactory.create()
+    await db_session.commit()
+    repository = ApplicationRepository(db_session)
+
+    with count_statements(db_session) as statements, pytest.raises(HTTPException) as error:
+        await repository.edit_application_info(application.id, uuid.uuid4(), new_title="taken")
+
+    assert error.value.status_code == 404
+    assert len(statements) == 1
+    assert (await repository.get_application_by_id(application.id)).title == application.title
+
+
+@pytest.mark.asyncio
+async def test_delete_user_application__single_statement(db_session: AsyncSession):
+    application = await ApplicationFactory.create()
+    await db_session.commit()
+    repository = ApplicationRepository(db_session)
+    assert len(await repository.get_application_by_title(application.title)) == 1
+
+    with count_statements(db_session) as statements:
+        await repository.delete_user_application(application.id, application.user_id)
+
+    assert len(statements) == 1
+    assert await repository.get_application_by_title(application.title) == []
+    with pytest.raises(HTTPException):
+        await repository.delete_user_application(application.id, application.user_id)
+
+
+@pytest.mark.asyncio
+async def test_create_applications__batched_insert_in_request_order(db_session: AsyncSession):
+    await ApplicationFactory.create()
+    await db_session.commit()
+    repository = ApplicationRepository(db_session)
+    assert len(await repository.get_all_applications(page=1, size=10)) == 1
+    bodies = [ApplicationCreateSchema(title=f"batch{i}", description=None) for i in range(5)]
+
+    with count_statements(db_session) as statements:
+        created = await repository.create_applications(bodies, uuid.uuid4())
+
+    # one batch on PostgreSQL; SQLite cannot tie RETURNING rows to their parameters in a batch and
+    # inserts row by row
+    batched = db_session.bind.dialect.name == "postgresql"
+    assert len(statements) == (1 if batched else len(bodies))
+    assert [application.title for application in created] == [body.title for body in bodies]
+    assert len({application.id for application in created}) == 5
+    assert len(await repository.get_all_applications(page=1, size=10)) == 6
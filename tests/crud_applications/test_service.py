@@ -3,9 +3,16 @@ from unittest.mock import AsyncMock
 
 import pytest
 from fastapi.exceptions import HTTPException
-
-from app.applications import ApplicationResponseSchema, ApplicationService
+from pydantic import ValidationError
+
+from app.applications import (
+    ApplicationBatchCreateSchema,
+    ApplicationCreateSchema,
+    ApplicationResponseSchema,
+    ApplicationService,
+)
 from app.exceptions import KafkaMessageError
+from app.settings import settings
 from tests.utils.factories import ApplicationFactory
 from tests.utils.utils import kafka_error_detail
 
@@ -29,7 +36,7 @@ async def test_create_application__success():
         mock_repository, mock_kafka, logger, user_log_service)
 
     result = await service.create_application(data, data.user_id)
-    mock_kafka.produce.assert_called_once()
+    mock_kafka.publish.assert_called_once()
     assert isinstance(result, ApplicationResponseSchema)
     assert result.kafka_status is True
 
@@ -40,7 +47,7 @@ async def test_create_application__failure():
     global mock_kafka
     global user_log_service
 
-    mock_kafka.produce.side_effect = KafkaMessageError(
+    mock_kafka.publish.side_effect = KafkaMessageError(
         details=kafka_error_detail)
     data = await ApplicationFactory.create()
 
@@ -123,3 +130,78 @@ async def test_get_all_applications__empty():
     assert exc_info.value.detail == "No applications found"
     mock_repository.get_all_applications.assert_awaited_once_with(
         page=1, size=10)
+
+
+@pytest.mark.asyncio
+async def test_create_application__via_outbox():
+    mock_repository = AsyncMock()
+    mock_kafka = AsyncMock()
+    user_log_service = AsyncMock()
+
+    data = await ApplicationFactory.create()
+    mock_repository.create_application.return_value = data
+    service = ApplicationService(
+        mock_repository, mock_kafka, logger, user_log_service, publish_via_outbox=True)
+
+    result = await service.create_application(data, data.user_id)
+
+    mock_kafka.publish.assert_not_called()
+    assert result.kafka_status is True
+
+
+@pytest.mark.asyncio
+async def test_get_applications_page__returns_next_cursor():
+    mock_repository = AsyncMock()
+    user_log_service = AsyncMock()
+    applications = [await ApplicationFactory.create() for _ in range(3)]
+    mock_repository.get_applications_after.return_value = applications
+    service = ApplicationService(
+        mock_repository, AsyncMock(), logger, user_log_service)
+
+    page = await service.get_applications_page(size=2)
+
+    assert [item.id for item in page.items] == [app.id for app in applications[:2]]
+    mock_repository.get_applications_after.assert_awaited_once_with(size=3, after=None)
+    user_log_service.log_endpoint_call.assert_awaited_once_with(
+        endpoint="get_applications_page", user_id=None)
+
+    mock_repository.get_applications_after.return_value = applications[2:]
+    page = await service.get_applications_page(size=2, cursor=page.next_cursor)
+
+    assert page.next_cursor is None
+    assert mock_repository.get_applications_after.await_args.kwargs["after"] == (
+        applications[1].created_at, applications[1].id)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.get_applications_page(size=2, cursor="garbage")
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_create_applications__one_audit_batch_and_per_item_kafka_status():
+    created = [await ApplicationFactory.create() for _ in range(3)]
+    repository = AsyncMock()
+    repository.create_applications.return_value = created
+    kafka = AsyncMock()
+    kafka.publish_batch.return_value = [True, False, True]
+    log_service = AsyncMock()
+    service = ApplicationService(repository, kafka, logger, log_service)
+    bodies = [ApplicationCreateSchema(title=a.title, description=a.description) for a in created]
+
+    result = await service.create_applications(bodies, created[0].user_id)
+
+    kafka.publish_batch.assert_awaited_once()
+    assert len(kafka.publish_batch.await_args.args[0]) == 3
+    log_service.log_endpoint_calls.assert_awaited_once()
+    assert [item.id for item in result.items] == [a.id for a in created]
+    assert [item.kafka_status for item in result.items] == [True, False, True]
+    assert (result.created, result.kafka_failed) == (3, 1)
+
+
+def test_batch_create_schema__bounds_the_number_of_items():
+    item = {"title": "title", "description": None}
+    ApplicationBatchCreateSchema(items=[item] * settings.APPLICATIONS_BATCH_MAX_ITEMS)
+
+    for items in ([], [item] * (settings.APPLICATIONS_BATCH_MAX_ITEMS + 1)):
+        with pytest.raises(ValidationError):
+            ApplicationBatchCreateSchema(items=items)
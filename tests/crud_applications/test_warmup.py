@@ -0,0 +1,65 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.applications import ApplicationSchema
+from app.applications.repository import ApplicationRepository
+from app.applications.warmup import CacheWarmer
+from app.mongo.schemas import ResourceCount
+from tests.utils.factories import ApplicationFactory
+
+
+class SessionFactory:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def __call__(self):
+        return self.session
+
+
+@pytest.mark.asyncio
+async def test_warm__loads_pages_and_popular_titles(db_session: AsyncSession):
+    popular = await ApplicationFactory.create()
+    for _ in range(2):
+        await ApplicationFactory.create()
+    await db_session.commit()
+    analytics = AsyncMock()
+    analytics.top_resources.return_value = [ResourceCount(resource=popular.title, calls=42)]
+
+    warmer = CacheWarmer(SessionFactory(db_session), analytics, pages=5, page_size=2)
+    # pages 1 and 2, the cursor page and one title
+    assert await warmer.warm() == 4
+
+    # served from the cache now, as the same schema a miss returns
+    repository = ApplicationRepository(db_session)
+    page = await repository.get_all_applications(page=1, size=2)
+    assert all(isinstance(application, ApplicationSchema) for application in page)
+    assert (await repository.get_application_by_title(popular.title))[0].id == popular.id
+
+
+@pytest.mark.asyncio
+async def test_warm__pages_only_when_the_audit_log_fails(db_session: AsyncSession):
+    await ApplicationFactory.create()
+    await db_session.commit()
+    analytics = AsyncMock()
+    analytics.top_resources.side_effect = RuntimeError("mongo down")
+
+    assert await CacheWarmer(SessionFactory(db_session), analytics, pages=3).warm() == 2
+
+
+@pytest.mark.asyncio
+async def test_warm__one_replica_per_interval(db_session: AsyncSession):
+    redis = MagicMock()
+    redis.set = AsyncMock(side_effect=[True, None])
+    FastAPICache.reset()
+    FastAPICache.init(RedisBackend(redis), prefix="test-cache")
+    warmer = CacheWarmer(SessionFactory(db_session), interval=60)
+
+    assert await warmer.claim() is True
+    # another replica within the same interval
+    assert await warmer.warm() == 0
+
+    redis.set.assert_awaited_with("test-cache:warmup:lease", 1, nx=True, px=60000)
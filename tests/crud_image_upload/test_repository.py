@@ -3,12 +3,14 @@ import uuid
 
 import pytest
 import pytest_asyncio
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.exceptions import ImageNotFoundError
 from app.image_upload import ImageUploadModel
 from app.image_upload.repository import ImageRepository
 from tests.utils.factories import ImageFactory
+from tests.utils.utils import count_statements
 
 
 @pytest.mark.asyncio
@@ -49,5 +51,16 @@ class TestImageRepository:
         file_path = os.path.join(self.repo.upload_dir, image.filename)
         open(file_path, "w").close()
 
-        await self.repo.delete_image_by_id(image.id, self.user_id)
+        with count_statements(self.repo.db_session) as statements:
+            await self.repo.delete_image_by_id(image.id, self.user_id)
+        assert len(statements) == 1
         assert not os.path.exists(file_path)
+
+    async def test_delete_image__other_users_image_is_kept(self, mock_file) -> None:
+        image = await self.repo.upload_image(mock_file, self.user_id)
+
+        with pytest.raises(HTTPException) as error:
+            await self.repo.delete_image_by_id(image.id, uuid.uuid4())
+
+        assert error.value.status_code == 404
+        assert await self.repo.get_image_by_id(image.id) is not None
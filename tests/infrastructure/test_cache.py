@@ -0,0 +1,207 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+
+from app.applications import ApplicationSchema
+from app.infrastructure.cache import (
+    cached,
+    invalidate_tags,
+    options,
+    repository_key_builder,
+    should_refresh_early,
+)
+from app.infrastructure.near_cache import near_cache
+from tests.utils.utils import cached_repository
+
+
+Repository = cached_repository("things", tags=lambda key: [f"thing:{key}", "things"])
+
+
+def test_key_builder__ignores_repository_and_session():
+    first = repository_key_builder(Repository.get, "ns", args=(Repository(object()), "a"))
+    second = repository_key_builder(Repository.get, "ns", args=(Repository(object()), "a"))
+    other = repository_key_builder(Repository.get, "ns", args=(Repository(object()),), kwargs={"key": "b"})
+
+    assert first == second
+    assert first != other
+    assert first.startswith("ns:Repository.get:")
+
+
+@pytest.mark.asyncio
+async def test_cached__shared_between_repository_instances():
+    first, second = Repository(object()), Repository(object())
+
+    assert await first.get("a") == {"key": "a"}
+    assert await second.get(key="a") == {"key": "a"}
+
+    first.load.assert_awaited_once_with("a")
+    second.load.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags__evicts_only_tagged_entries():
+    repository = Repository(object())
+    await repository.get("a")
+    await repository.get("b")
+
+    assert await invalidate_tags("thing:a") == 1
+    await repository.get("a")
+    await repository.get("b")
+
+    assert [call.args for call in repository.load.await_args_list] == [("a",), ("b",), ("a",)]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags__shared_tag_evicts_every_entry():
+    repository = Repository(object())
+    await repository.get("a")
+    await repository.get("b")
+
+    assert await invalidate_tags("things") == 2
+    assert await invalidate_tags("things") == 0
+
+
+@pytest.mark.asyncio
+async def test_cached__fill_loaded_before_an_invalidation_is_not_stored():
+    started, release = asyncio.Event(), asyncio.Event()
+    repository = Repository(object())
+    rows = {"a": "before"}
+
+    async def slow_select(key):
+        row = rows[key]
+        started.set()
+        await release.wait()
+        return {"key": key, "row": row}
+
+    repository.load.side_effect = slow_select
+    read = asyncio.create_task(repository.get("a"))
+    await started.wait()
+    # the writer commits and invalidates while the read still holds the old row
+    rows["a"] = "after"
+    await invalidate_tags("thing:a")
+    release.set()
+
+    assert (await read)["row"] == "before"
+    repository.load.side_effect = lambda key: {"key": key, "row": rows[key]}
+    assert (await repository.get("a"))["row"] == "after"
+    assert repository.load.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cached__redis_fill_is_a_compare_and_set_on_the_generations():
+    redis = AsyncMock()
+    redis.pipeline = MagicMock(side_effect=ConnectionError)  # get_with_ttl fails, a plain miss
+    redis.get.return_value = None
+    redis.mget.return_value = [b"3", None]
+    redis.eval.return_value = 0  # a tag was invalidated meanwhile
+    FastAPICache.reset()
+    FastAPICache.init(RedisBackend(redis), prefix="test-cache")
+
+    assert await Repository(object()).get("a") == {"key": "a"}
+
+    script, count, *rest = redis.eval.await_args.args
+    keys, argv = rest[:count], rest[count:]
+    assert keys[1:3] == ["test-cache:gen:thing:a", "test-cache:gen:things"]
+    assert argv[2:] == [2, "3", ""]
+
+
+class TypedRepository:
+    def __init__(self):
+        self.load = AsyncMock(side_effect=lambda key: SimpleNamespace(
+            id=1, title=key, description=None, created_at=datetime(2026, 1, 1)))
+
+    @cached(expire=60, namespace="typed", near=True)
+    async def get(self, key: str) -> ApplicationSchema:
+        return await self.load(key)
+
+
+@pytest.mark.asyncio
+async def test_cached__hit_and_miss_return_the_annotated_type():
+    repository = TypedRepository()
+
+    miss = await repository.get("a")
+    near_hit = await repository.get("a")
+    near_cache.clear()
+    remote_hit = await repository.get("a")
+
+    assert miss == remote_hit == near_hit
+    assert all(isinstance(value, ApplicationSchema) for value in (miss, remote_hit, near_hit))
+    repository.load.assert_awaited_once()
+
+
+class SlowRepository:
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.load = AsyncMock(side_effect=self._load)
+
+    async def _load(self, key):
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return {"key": key}
+
+    @cached(expire=60, namespace="slow", early_refresh=True)
+    async def get(self, key: str):
+        return await self.load(key)
+
+
+@pytest.mark.asyncio
+async def test_cached__concurrent_misses_share_one_load():
+    repository = SlowRepository()
+
+    results = await asyncio.gather(*(repository.get("a") for _ in range(5)))
+
+    assert results == [{"key": "a"}] * 5
+    repository.load.assert_awaited_once_with("a")
+
+
+@pytest.mark.asyncio
+async def test_cached__failed_load_is_raised_to_every_waiter_and_not_cached():
+    repository = SlowRepository(error=RuntimeError("db down"))
+
+    results = await asyncio.gather(*(repository.get("a") for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    repository.load.assert_awaited_once()
+
+    repository.error = None
+    assert await repository.get("a") == {"key": "a"}
+
+
+def test_should_refresh_early__only_close_to_expiry():
+    with patch("app.infrastructure.cache.random.random", return_value=0.5):
+        assert not should_refresh_early(ttl=60, load_seconds=0.1, beta=1.0)
+        assert should_refresh_early(ttl=0.05, load_seconds=0.1, beta=1.0)
+        assert not should_refresh_early(ttl=0.05, load_seconds=0.1, beta=0)
+
+
+@pytest.mark.asyncio
+async def test_cached__early_refresh_recomputes_a_valid_entry():
+    repository = SlowRepository()
+    await repository.get("a")
+
+    with patch("app.infrastructure.cache.should_refresh_early", return_value=True):
+        assert await repository.get("a") == {"key": "a"}
+
+    assert repository.load.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cached__waits_for_the_process_holding_the_redis_lock():
+    redis = AsyncMock()
+    redis.set.return_value = None  # lock held elsewhere
+    redis.pipeline = MagicMock(side_effect=ConnectionError)  # get_with_ttl fails, a plain miss
+    redis.get.side_effect = [None, b'{"key": "a"}']
+    FastAPICache.reset()
+    FastAPICache.init(RedisBackend(redis), prefix="test-cache")
+    repository = SlowRepository()
+
+    with patch.object(options, "distributed_lock", True), \
+            patch.object(options, "lock_poll_interval", 0):
+        assert await repository.get("a") == {"key": "a"}
+
+    repository.load.assert_not_awaited()
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.app_config import current_superuser
+from app.infrastructure.cache import invalidate_tags
+from app.infrastructure.cache_metrics import cache_report
+from tests.utils.utils import cached_repository
+
+
+Repository = cached_repository(
+    "report", tags=lambda key: ["report"], load=lambda key: {"title": "x" * 100})
+
+
+def prefix_report(prefix: str) -> dict:
+    return next(row for row in cache_report()["prefixes"] if row["prefix"] == prefix)
+
+
+@pytest.mark.asyncio
+async def test_cache_report__per_prefix_hits_misses_and_sizes():
+    # the "report" namespace is only used here, so the counters start at zero
+    repository = Repository()
+
+    await repository.get("a")
+    await repository.get("a")
+    await repository.get("a")
+    await invalidate_tags("report")
+
+    row = prefix_report("report:Repository.get")
+    assert row["tiers"]["remote"] == {"hits": 2, "misses": 1, "hit_ratio": 2 / 3}
+    assert row["value_bytes_p50"] >= 100
+    assert row["load_seconds_p50"] is not None
+
+    report = cache_report()
+    assert {"get", "set", "invalidate"} <= report["backend"].keys()
+    assert any(
+        e["tier"] == "remote" and e["reason"] == "invalidated" and e["count"] >= 1
+        for e in report["evictions"]
+    )
+
+
+def test_metrics_endpoint__serves_the_cache_report_to_superusers(client):
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics/cache").status_code == 401
+
+    client.app.dependency_overrides[current_superuser] = lambda: SimpleNamespace(is_superuser=True)
+    response = client.get("/metrics/cache")
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"prefixes", "backend", "evictions", "near_entries"}
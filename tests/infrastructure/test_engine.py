@@ -0,0 +1,60 @@
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure.database.engine import (
+    InstrumentedQueuePool,
+    engine_options,
+    engine_url,
+)
+from app.infrastructure.database.metrics import instrument_pool, pool_report
+from app.settings import Settings
+
+
+def test_engine_options__asyncpg_pool_timeout_and_statement_cache():
+    settings = Settings(DB_POOL_SIZE=5, DB_MAX_OVERFLOW=2, DB_STATEMENT_TIMEOUT_MS=1500,
+                        DB_STATEMENT_CACHE_SIZE=0)
+    url = engine_url(settings)
+    options = engine_options(settings, url, name="primary")
+
+    assert url.query["prepared_statement_cache_size"] == "0"
+    assert options["echo"] is False
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (5, 2)
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["server_settings"]["statement_timeout"] == "1500"
+
+
+def test_engine_options__sqlite_takes_no_pool_sizing():
+    settings = Settings(DB_ECHO=True)
+    url = engine_url(settings, "sqlite+aiosqlite:///:memory:")
+
+    assert engine_options(settings, url) == {"echo": True, "pool_pre_ping": True}
+
+
+@pytest.mark.asyncio
+async def test_instrument_pool__reports_checkouts_wait_and_age(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{os.path.join(tmp_path, 'pool.db')}",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="test-pool",
+        pool_size=2,
+        max_overflow=1,
+    )
+    instrument_pool(engine, "test-pool", capacity=3)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("select 1"))
+            during = next(row for row in pool_report() if row["pool"] == "test-pool")
+        after = next(row for row in pool_report() if row["pool"] == "test-pool")
+    finally:
+        await engine.dispose()
+
+    assert during["checked_out"] == 1
+    assert after["checked_out"] == 0 and after["checked_in"] == 1
+    assert after["capacity"] == 3
+    assert after["connects"] == 1
+    assert after["wait_seconds_p50"] is not None
+    assert after["connection_age_p50"] is not None
@@ -0,0 +1,126 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi_cache import FastAPICache
+
+from app.infrastructure.cache import invalidate_tags
+from app.infrastructure.cache_metrics import lookups
+from app.infrastructure.near_cache import InvalidationListener, NearCache, encode_tags, near_cache
+from tests.utils.utils import cached_repository
+
+
+def test_near_cache__evicts_least_recently_used():
+    cache = NearCache(max_entries=2)
+    cache.set("a", b"1", ["tag"])
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+
+
+def test_near_cache__expires_after_ttl():
+    cache = NearCache(ttl=5)
+    with patch("app.infrastructure.near_cache.time.monotonic", return_value=100):
+        cache.set("a", b"1", ["tag"])
+    with patch("app.infrastructure.near_cache.time.monotonic", return_value=106):
+        assert cache.get("a") is None
+    assert cache.invalidate(["tag"]) == 0
+
+
+def test_near_cache__invalidates_by_tag_and_skips_stale_loads():
+    cache = NearCache()
+    cache.set("a", b"1", ["x"])
+    cache.set("b", b"2", ["y"])
+    version = cache.version
+
+    assert cache.invalidate(["x"]) == 1
+    # loaded before the invalidation above
+    cache.set("a", b"old", ["x"], version)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == b"2"
+
+
+def test_listener__evicts_published_tags():
+    cache = NearCache()
+    cache.set("a", b"1", ["application:1"])
+    listener = InvalidationListener(redis=None, channel="invalidate", cache=cache)
+
+    assert listener.handle(encode_tags(["application:1"])) == 1
+    assert listener.handle(b"not json") == 0
+    assert listener.handle(b"5") == 0
+    assert listener.handle(b"[1]") == 0
+    assert len(cache) == 0
+
+
+class FlakyPubSub:
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def subscribe(self, channel):
+        self.redis.subscriptions += 1
+
+    async def get_message(self, timeout):
+        if self.redis.subscriptions == 1:
+            raise OSError("connection reset")
+        await asyncio.sleep(0.001)
+        return {"data": encode_tags(["application:1"])}
+
+
+class FlakyRedis:
+    subscriptions = 0
+
+    def pubsub(self, ignore_subscribe_messages):
+        return FlakyPubSub(self)
+
+
+@pytest.mark.asyncio
+async def test_listener__resubscribes_after_any_error():
+    cache = NearCache()
+    listener = InvalidationListener(FlakyRedis(), "invalidate", cache=cache, reconnect_delay=0)
+    listener.start()
+    await asyncio.sleep(0.01)
+    cache.set("a", b"1", ["application:1"])
+    await asyncio.sleep(0.01)
+    await listener.stop()
+
+    assert listener.redis.subscriptions == 2
+    assert cache.get("a") is None
+
+
+Repository = cached_repository("near", tags=lambda key: [f"thing:{key}"], near=True)
+
+
+@pytest.mark.asyncio
+async def test_cached__near_hit_skips_the_backend():
+    repository = Repository()
+    await repository.get("a")
+    near_hits = lookups.value(prefix="near:Repository.get", tier="near", result="hit")
+
+    with patch.object(FastAPICache.get_backend(), "get", AsyncMock()) as backend_get:
+        assert await repository.get("a") == {"key": "a"}
+
+    backend_get.assert_not_awaited()
+    assert lookups.value(prefix="near:Repository.get", tier="near", result="hit") == near_hits + 1
+
+
+@pytest.mark.asyncio
+async def test_cached__invalidation_clears_both_tiers():
+    repository = Repository()
+    await repository.get("a")
+
+    await invalidate_tags("thing:a")
+    assert len(near_cache) == 0
+    await repository.get("a")
+
+    assert repository.load.await_count == 2
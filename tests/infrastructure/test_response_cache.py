@@ -0,0 +1,115 @@
+import asyncio
+import gzip
+from datetime import datetime
+from typing import List
+from unittest.mock import AsyncMock
+
+import pytest
+from pydantic import TypeAdapter
+from starlette.requests import Request
+
+from app.applications import ApplicationSchema
+from app.infrastructure.cache import cached_response, invalidate_tags, options
+
+
+def make_request(path: str = "/applications", query: bytes = b"page=1&size=10", gzip_ok=False):
+    headers = [(b"accept-encoding", b"gzip, br")] if gzip_ok else []
+    return Request({
+        "type": "http", "method": "GET", "path": path, "query_string": query, "headers": headers,
+    })
+
+
+def applications(n: int) -> list[ApplicationSchema]:
+    return [
+        ApplicationSchema(id=i, title=f"title{i}", description="d" * 50, created_at=datetime(2024, 1, 1))
+        for i in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cached_response__hit_returns_stored_body_without_loading():
+    load = AsyncMock(return_value=applications(2))
+    on_hit = AsyncMock()
+
+    first = await cached_response(make_request(), load, List[ApplicationSchema], on_hit=on_hit)
+    # same query in another order
+    second = await cached_response(
+        make_request(query=b"size=10&page=1"), load, List[ApplicationSchema], on_hit=on_hit)
+
+    load.assert_awaited_once()
+    on_hit.assert_awaited_once()
+    assert first.body == second.body
+    assert TypeAdapter(List[ApplicationSchema]).validate_json(first.body) == applications(2)
+
+
+@pytest.mark.asyncio
+async def test_cached_response__large_bodies_are_stored_gzipped(monkeypatch):
+    monkeypatch.setattr(options, "response_compress_min_bytes", 256)
+    load = AsyncMock(return_value=applications(20))
+
+    plain = await cached_response(make_request(), load, List[ApplicationSchema])
+    compressed = await cached_response(make_request(gzip_ok=True), load, List[ApplicationSchema])
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == plain.body
+
+
+@pytest.mark.asyncio
+async def test_cached_response__evicted_by_tag():
+    load = AsyncMock(return_value=applications(1))
+    await cached_response(make_request(), load, List[ApplicationSchema], tags=["applications:list"])
+
+    await invalidate_tags("applications:list")
+    await cached_response(make_request(), load, List[ApplicationSchema], tags=["applications:list"])
+
+    assert load.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_response__evicted_by_result_tag():
+    load = AsyncMock(return_value=applications(2))
+    request = make_request("/applications/by-title/title1", b"")
+
+    def by_id(items):
+        return [f"application:{item.id}" for item in items]
+
+    await cached_response(request, load, List[ApplicationSchema], result_tags=by_id)
+    await invalidate_tags("application:1")
+    await cached_response(request, load, List[ApplicationSchema], result_tags=by_id)
+
+    assert load.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_response__fill_loaded_before_an_invalidation_is_not_stored():
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_load():
+        started.set()
+        await release.wait()
+        return applications(1)
+
+    load = AsyncMock(side_effect=slow_load)
+    tags = ["applications:list"]
+    read = asyncio.create_task(
+        cached_response(make_request(), load, List[ApplicationSchema], tags=tags))
+    await started.wait()
+    await invalidate_tags("applications:list")
+    release.set()
+    await read
+
+    load.side_effect = None
+    load.return_value = applications(2)
+    second = await cached_response(make_request(), load, List[ApplicationSchema], tags=tags)
+    assert load.await_count == 2
+    assert len(TypeAdapter(List[ApplicationSchema]).validate_json(second.body)) == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_response__disabled_returns_the_models(monkeypatch):
+    monkeypatch.setattr(options, "response_cache", False)
+    items = applications(1)
+
+    assert await cached_response(
+        make_request(), AsyncMock(return_value=items), List[ApplicationSchema]) is items
@@ -0,0 +1,198 @@
+import os
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import column, insert, table, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure.cache import cached, invalidate_tags, options
+from app.infrastructure.database import accessor
+from app.infrastructure.database.accessor import TrackedSession
+from app.infrastructure.database.engine import InstrumentedQueuePool
+from app.infrastructure.database import routing
+from app.infrastructure.database.routing import (
+    ReadYourWritesMiddleware,
+    Replica,
+    ReplicaSet,
+    reads_from_replica,
+    replica_read,
+)
+
+
+async def sqlite_engine(path, origin):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=InstrumentedQueuePool)
+    async with engine.begin() as connection:
+        await connection.execute(text("create table origin (name text)"))
+        await connection.execute(text(f"insert into origin values ('{origin}')"))
+    return engine
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path):
+    primary = await sqlite_engine(os.path.join(tmp_path, "primary.db"), "primary")
+    replica = await sqlite_engine(os.path.join(tmp_path, "replica.db"), "replica")
+    replicas = ReplicaSet([Replica("replica-0", replica, capacity=5)])
+    factory = async_sessionmaker(primary, expire_on_commit=False, sync_session_class=TrackedSession)
+    with patch.object(accessor, "replicas", replicas):
+        yield factory, replicas
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def origin(session) -> str:
+    return await session.scalar(text("select name from origin"))
+
+
+@replica_read
+async def replica_origin(session) -> str:
+    return await origin(session)
+
+
+@cached(expire=60, namespace="routing", tags=lambda: ["origin"])
+@replica_read
+async def cached_origin(session) -> str:
+    return await origin(session)
+
+
+@cached(expire=60, namespace="routing", result_tags=lambda name: ["origin"])
+@replica_read
+async def cached_origin_by_result(session) -> str:
+    return await origin(session)
+
+
+async def write_origin(session, name):
+    await session.execute(update(table("origin", column("name"))).values(name=name))
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_marked_reads_go_to_the_replica(databases):
+    factory, _ = databases
+    async with factory() as session:
+        assert await replica_origin(session) == "replica"
+        assert await origin(session) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_reads_after_a_write_stay_on_the_primary(databases):
+    factory, _ = databases
+    async with factory() as session:
+        await session.execute(insert(table("origin", column("name"))).values(name="written"))
+        assert await replica_origin(session) == "primary"
+        await session.commit()
+
+        assert await replica_origin(session) == "replica"
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_replica_falls_back_to_the_primary(databases, tmp_path):
+    factory, replicas = databases
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+    replicas.replicas.append(Replica("replica-1", broken, capacity=5))
+
+    await replicas.check()
+
+    assert [replica.healthy for replica in replicas.replicas] == [True, False]
+    replicas.mark(replicas.replicas[0], False, "test")
+    async with factory() as session:
+        assert await replica_origin(session) == "primary"
+
+    await replicas.check()
+    async with factory() as session:
+        assert await replica_origin(session) == "replica"
+    await broken.dispose()
+
+
+@pytest.mark.asyncio
+async def test_choose_prefers_the_least_loaded_replica(databases, tmp_path):
+    _, replicas = databases
+    busy = replicas.replicas[0]
+    idle = Replica("replica-1", await sqlite_engine(os.path.join(tmp_path, "idle.db"), "idle"), 5)
+    replicas.replicas.append(idle)
+
+    async with busy.engine.connect():
+        assert replicas.choose() is idle.engine
+    await idle.engine.dispose()
+
+
+def test_read_your_writes_pins_the_client_after_a_write():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window=60)
+
+    @replica_read
+    async def routed() -> bool:
+        return reads_from_replica()
+
+    @app.get("/read")
+    async def read():
+        return {"replica": await routed()}
+
+    @app.post("/write")
+    async def write():
+        return {}
+
+    client = TestClient(app)
+    assert client.get("/read").json() == {"replica": True}
+
+    assert "read_primary_until" in client.post("/write").headers["set-cookie"]
+
+    assert client.get("/read").json() == {"replica": False}
+    client.cookies.clear()
+    assert client.get("/read").json() == {"replica": True}
+
+
+@pytest.mark.asyncio
+async def test_cache_fills_read_from_the_replica_without_a_recent_invalidation(databases):
+    factory, _ = databases
+    with patch.object(options, "replica_staleness", 10):
+        async with factory() as session:
+            assert await cached_origin(session) == "replica"
+
+
+@pytest.mark.asyncio
+async def test_cache_fills_of_recently_invalidated_tags_load_from_the_primary(databases):
+    factory, _ = databases
+    with patch.object(options, "replica_staleness", 10):
+        async with factory() as session:
+            # the replica still has the value from before the write
+            await write_origin(session, "written")
+            await invalidate_tags("origin")
+
+            assert await cached_origin(session) == "written"
+            assert await cached_origin(session) == "written"
+            assert await replica_origin(session) == "replica"
+
+        with patch.object(options, "replica_staleness", 0):
+            await invalidate_tags("origin")
+            async with factory() as session:
+                assert await cached_origin(session) == "replica"
+
+
+@pytest.mark.asyncio
+async def test_cache_fills_with_recent_result_tags_reload_from_the_primary(databases):
+    factory, _ = databases
+    with patch.object(options, "replica_staleness", 10):
+        async with factory() as session:
+            await write_origin(session, "written")
+            await invalidate_tags("origin")
+
+            assert await cached_origin_by_result(session) == "written"
+
+
+@pytest.mark.asyncio
+async def test_pinned_reads_bypass_the_cache(databases):
+    factory, _ = databases
+    async with factory() as session:
+        assert await cached_origin(session) == "primary"
+        # another process has not seen the invalidation yet
+        await write_origin(session, "written")
+
+        token = routing._pinned_to_primary.set(True)
+        try:
+            assert await cached_origin(session) == "written"
+        finally:
+            routing._pinned_to_primary.reset(token)
+        assert await cached_origin(session) == "primary"
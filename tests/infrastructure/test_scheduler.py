@@ -0,0 +1,61 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.infrastructure.scheduler import Scheduler, job_runs
+
+
+@pytest.mark.asyncio
+async def test_scheduler__runs_recurring_jobs_until_stopped():
+    scheduler = Scheduler()
+    job = AsyncMock()
+    once = AsyncMock()
+    scheduler.add("recurring", job, interval=0.01)
+    scheduler.add("once", once)
+
+    scheduler.start()
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+    runs = job.await_count
+    await asyncio.sleep(0.02)
+
+    assert runs >= 3
+    assert job.await_count == runs
+    once.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_scheduler__failed_run_is_counted_and_rescheduled():
+    scheduler = Scheduler()
+    job = AsyncMock(side_effect=[RuntimeError("boom"), None])
+    scheduler.add("flaky", job, interval=0.01)
+    failed = job_runs.value(job="flaky", status="failed")
+
+    assert await scheduler.run("flaky") is False
+    assert await scheduler.run("flaky") is True
+    assert job_runs.value(job="flaky", status="failed") == failed + 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler__stop_cancels_a_run_in_progress():
+    scheduler = Scheduler()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(60)
+
+    scheduler.add("slow", slow)
+    scheduler.start()
+    await started.wait()
+
+    await asyncio.wait_for(scheduler.stop(), timeout=1)
+
+
+def test_scheduler__rejects_duplicate_names():
+    scheduler = Scheduler()
+    scheduler.add("job", AsyncMock())
+
+    with pytest.raises(ValueError):
+        scheduler.add("job", AsyncMock())
@@ -0,0 +1,92 @@
+import os
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Integer, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.infrastructure.database import accessor
+from app.infrastructure.database.accessor import TrackedSession, get_db_session
+from app.infrastructure.database.engine import InstrumentedQueuePool
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{os.path.join(tmp_path, 'session.db')}",
+        poolclass=InstrumentedQueuePool,
+    )
+    factory = async_sessionmaker(engine, expire_on_commit=False, sync_session_class=TrackedSession)
+    with patch.object(accessor, "AsyncSessionFactory", factory):
+        yield engine
+    await engine.dispose()
+
+
+async def run_request(body):
+    sessions = get_db_session()
+    session = await sessions.__anext__()
+    with patch.object(session, "commit", wraps=session.commit) as commit:
+        await body(session)
+        with pytest.raises(StopAsyncIteration):
+            await sessions.__anext__()
+    return commit
+
+
+@pytest.mark.asyncio
+async def test_get_db_session__unused_session_checks_out_nothing(session_factory):
+    async def cached_read(session):
+        assert session_factory.sync_engine.pool.checkedout() == 0
+
+    commit = await run_request(cached_read)
+
+    commit.assert_not_awaited()
+    assert session_factory.sync_engine.pool.checkedout() == 0
+
+
+@pytest.mark.asyncio
+async def test_get_db_session__skips_commit_after_repository_committed(session_factory):
+    async def repository_write(session):
+        await session.execute(text("create table t (id integer)"))
+        await session.commit()
+
+    commit = await run_request(repository_write)
+
+    # the repository's own commit only
+    assert commit.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_db_session__commits_pending_work(session_factory):
+    async def uncommitted_write(session):
+        await session.execute(text("create table t (id integer)"))
+
+    commit = await run_request(uncommitted_write)
+
+    commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_db_session__commits_objects_added_without_a_flush(session_factory):
+    async with session_factory.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async def add_only(session):
+        session.add(Row(id=1))
+
+    commit = await run_request(add_only)
+
+    commit.assert_awaited_once()
+    async with session_factory.connect() as connection:
+        assert await connection.scalar(select(func.count()).select_from(Row)) == 1
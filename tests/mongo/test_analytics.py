@@ -0,0 +1,95 @@
+import datetime
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+
+from app.exceptions import InvalidCursorError
+from app.mongo.analytics import UserLogAnalytics
+from app.mongo.collection import ensure_user_log_collection
+from app.pagination import decode_cursor
+from app.settings import Settings
+
+since = datetime.datetime(2026, 1, 1)
+until = datetime.datetime(2026, 1, 2)
+
+
+def make_collection(rows: list[dict]) -> MagicMock:
+    collection = MagicMock()
+    collection.aggregate.return_value.to_list = AsyncMock(return_value=rows)
+    cursor = collection.find.return_value.sort.return_value.limit.return_value
+    cursor.to_list = AsyncMock(return_value=rows)
+    return collection
+
+
+def make_entry(minute: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "timestamp": since + datetime.timedelta(minutes=minute),
+        "meta": {"endpoint": "get_image", "user_id": uuid.uuid4()},
+        "count": 1,
+        "policy": "full",
+    }
+
+
+@pytest.mark.asyncio
+async def test_endpoint_counts__matches_window_first_and_sums_weights():
+    collection = make_collection([{"_id": "get_image", "calls": 12.0}])
+
+    counts = await UserLogAnalytics(collection).endpoint_counts(since, until)
+
+    pipeline = collection.aggregate.call_args.args[0]
+    assert pipeline[0] == {"$match": {"timestamp": {"$gte": since, "$lt": until}}}
+    assert pipeline[1]["$group"]["calls"] == {"$sum": "$count"}
+    assert counts[0].endpoint == "get_image" and counts[0].calls == 12
+
+
+@pytest.mark.asyncio
+async def test_entries__keyset_pagination():
+    rows = [make_entry(3), make_entry(2), make_entry(1)]
+    collection = make_collection(rows)
+    analytics = UserLogAnalytics(collection)
+
+    page = await analytics.entries(since, until, limit=2)
+
+    assert [item.id for item in page.items] == [str(row["_id"]) for row in rows[:2]]
+    assert decode_cursor(page.next_cursor)["id"] == str(rows[1]["_id"])
+
+    collection.find.return_value.sort.return_value.limit.return_value.to_list.return_value = rows[2:]
+    page = await analytics.entries(since, until, limit=2, cursor=page.next_cursor)
+
+    query = collection.find.call_args.args[0]
+    assert query["$or"][1] == {"timestamp": rows[1]["timestamp"], "_id": {"$lt": rows[1]["_id"]}}
+    assert page.next_cursor is None
+
+    with pytest.raises(InvalidCursorError):
+        await analytics.entries(since, until, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_ensure_user_log_collection__creates_time_series_with_ttl():
+    database = MagicMock()
+    database.list_collections.return_value.to_list = AsyncMock(return_value=[])
+    database.create_collection = AsyncMock()
+    database.__getitem__.return_value.create_index = AsyncMock()
+
+    await ensure_user_log_collection(database, Settings(USER_LOG_TTL_DAYS=7))
+
+    kwargs = database.create_collection.await_args.kwargs
+    assert kwargs["timeseries"]["timeField"] == "timestamp"
+    assert kwargs["timeseries"]["metaField"] == "meta"
+    assert kwargs["expireAfterSeconds"] == 7 * 24 * 3600
+
+
+@pytest.mark.asyncio
+async def test_top_resources__groups_entries_of_one_endpoint():
+    collection = make_collection([{"_id": "backend", "calls": 7.0}])
+
+    top = await UserLogAnalytics(collection).top_resources("get_application_by_title", since, until, 5)
+
+    pipeline = collection.aggregate.call_args.args[0]
+    assert pipeline[0]["$match"]["meta.endpoint"] == "get_application_by_title"
+    assert pipeline[0]["$match"]["resource"] == {"$ne": None}
+    assert pipeline[-1] == {"$limit": 5}
+    assert top[0].resource == "backend" and top[0].calls == 7
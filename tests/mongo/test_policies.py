@@ -0,0 +1,62 @@
+import datetime
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.mongo import LogAggregator, LogPolicies, LogPolicy, UserLogService
+
+
+def test_policies__write_endpoints_keep_full_fidelity():
+    policies = LogPolicies({
+        "get_all_applications": LogPolicy.parse("aggregate"),
+        "create_application": LogPolicy.parse("sample:0.01"),
+    })
+
+    assert policies.policy_for("get_all_applications").mode == "aggregate"
+    assert policies.policy_for("create_application").mode == "full"
+    assert policies.policy_for("delete_user_application").mode == "full"
+    with pytest.raises(ValueError):
+        LogPolicy.parse("sample:2")
+
+
+@pytest.mark.asyncio
+async def test_log_endpoint_call__samples_with_weight():
+    collection = MagicMock()
+    collection.insert_one = AsyncMock()
+    service = UserLogService(
+        collection, policies=LogPolicies({"get_image": LogPolicy.parse("sample:0.25")}))
+
+    with patch("app.mongo.mongo.random.random", side_effect=[0.9, 0.1]):
+        await service.log_endpoint_call("get_image", user_id=None)
+        await service.log_endpoint_call("get_image", user_id=None)
+
+    collection.insert_one.assert_awaited_once()
+    document = collection.insert_one.await_args.args[0]
+    assert document["count"] == 4
+    assert document["policy"] == "sample"
+
+
+@pytest.mark.asyncio
+async def test_aggregator__rolls_up_per_endpoint_user_and_minute():
+    collection = MagicMock()
+    collection.insert_many = AsyncMock()
+    aggregator = LogAggregator(collection)
+    service = UserLogService(
+        collection,
+        policies=LogPolicies({"get_all_applications": LogPolicy.parse("aggregate")}),
+        aggregator=aggregator,
+    )
+    user_id = uuid.uuid4()
+    minute = datetime.datetime(2026, 1, 1, 12, 0)
+
+    for _ in range(3):
+        await service.log_endpoint_call("get_all_applications", user_id=user_id)
+    aggregator.add("get_all_applications", user_id, now=minute + datetime.timedelta(seconds=30))
+
+    assert await aggregator.flush(until=minute + datetime.timedelta(minutes=1)) == 1
+    rollup = collection.insert_many.await_args.args[0][0]
+    assert (rollup["count"], rollup["timestamp"], rollup["policy"]) == (1, minute, "aggregate")
+
+    assert await aggregator.flush() == 1
+    assert collection.insert_many.await_args.args[0][0]["count"] == 3
@@ -0,0 +1,104 @@
+import asyncio
+import datetime
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from app.mongo import BufferedLogWriter, UserLogService
+
+
+def make_collection() -> MagicMock:
+    collection = MagicMock()
+
+    async def insert_many(documents, ordered):
+        return SimpleNamespace(inserted_ids=list(range(len(documents))))
+
+    collection.insert_many = AsyncMock(side_effect=insert_many)
+    collection.insert_one = AsyncMock()
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_log_endpoint_call__queues_instead_of_inserting():
+    collection = make_collection()
+    writer = BufferedLogWriter(collection, batch_size=2, flush_interval=10)
+    service = UserLogService(collection, writer=writer)
+
+    await service.log_endpoint_call("get_all_applications", user_id=None)
+
+    collection.insert_one.assert_not_called()
+    assert writer.queue.qsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_run__flushes_full_batches_and_the_rest_on_stop():
+    collection = make_collection()
+    writer = BufferedLogWriter(collection, batch_size=2, flush_interval=10)
+    for i in range(5):
+        writer.submit({"n": i})
+
+    writer.start()
+    await asyncio.sleep(0.01)
+    await writer.stop()
+
+    sizes = [len(call.args[0]) for call in collection.insert_many.await_args_list]
+    assert sizes == [2, 2, 1]
+    assert all(call.kwargs["ordered"] is False for call in collection.insert_many.await_args_list)
+
+
+@pytest.mark.asyncio
+async def test_submit__drops_when_queue_is_full():
+    writer = BufferedLogWriter(make_collection(), max_queue=1)
+
+    assert writer.submit({"n": 1}) is True
+    assert writer.submit({"n": 2}) is False
+
+
+async def write_spills(writer: BufferedLogWriter):
+    writer._spills.put_nowait(None)
+    await writer.write_spills()
+
+
+@pytest.mark.asyncio
+async def test_spill__failed_flush_is_replayed(tmp_path):
+    collection = make_collection()
+    writer = BufferedLogWriter(
+        collection, overflow="spill", spill_path=str(tmp_path / "spill.jsonl"),
+        spill_retry_interval=0,
+    )
+    document = {"user_id": uuid.uuid4(), "timestamp": datetime.datetime(2026, 1, 1), "endpoint": "x"}
+    collection.insert_many.side_effect = [AutoReconnect("down"), None]
+
+    await writer.flush([document])
+    assert not (tmp_path / "spill.jsonl").exists()
+    await write_spills(writer)
+    collection.insert_many.side_effect = None
+    collection.insert_many.return_value = SimpleNamespace(inserted_ids=[1])
+    await writer._replay_spill()
+
+    replayed = collection.insert_many.await_args.args[0][0]
+    assert replayed["user_id"] == document["user_id"]
+    assert replayed["timestamp"].replace(tzinfo=None) == document["timestamp"]
+    assert not (tmp_path / "spill.jsonl").exists()
+
+
+@pytest.mark.asyncio
+async def test_spill__replay_streams_batch_size_entries_at_a_time(tmp_path):
+    collection = make_collection()
+    writer = BufferedLogWriter(
+        collection, batch_size=2, max_queue=1, overflow="spill",
+        spill_path=str(tmp_path / "spill.jsonl"),
+    )
+    writer.submit({"n": 0})
+    for i in range(1, 6):
+        assert writer.submit({"n": i}) is True
+    await write_spills(writer)
+
+    await writer._replay_spill()
+
+    batches = [call.args[0] for call in collection.insert_many.await_args_list]
+    assert [[document["n"] for document in batch] for batch in batches] == [[1, 2], [3, 4], [5]]
+    assert not (tmp_path / "spill.jsonl.replaying").exists()
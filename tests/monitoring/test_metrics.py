@@ -0,0 +1,36 @@
+from app.monitoring.metrics import MetricsRegistry
+
+
+def test_render__prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", ("path",)).inc(path="/a")
+    registry.gauge("in_flight", "In flight").set(3)
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+
+    text = registry.render()
+
+    assert 'requests_total{path="/a"} 1.0' in text
+    assert "in_flight 3.0" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+
+def test_counter__rate_over_window():
+    registry = MetricsRegistry()
+    counter = registry.counter("messages_total", "Messages", rate_window=10)
+    counter.inc(50)
+
+    assert counter.rate() == 5.0
+
+
+def test_histogram__quantile_upper_bound():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("h", "H", buckets=(1, 2, 3))
+    for value in (0.5, 1.5, 1.5, 2.5):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(0.99) == 3
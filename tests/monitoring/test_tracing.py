@@ -0,0 +1,34 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.monitoring.tracing import RequestIdFilter, RequestIdMiddleware, get_request_id
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/request-id")
+    async def request_id():
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "msg", None, None)
+        RequestIdFilter().filter(record)
+        return {"request_id": get_request_id(), "logged": record.request_id}
+
+    return TestClient(app)
+
+
+def test_middleware__propagates_incoming_request_id():
+    response = make_client().get("/request-id", headers={"X-Request-ID": "req-1"})
+
+    assert response.json() == {"request_id": "req-1", "logged": "req-1"}
+    assert response.headers["x-request-id"] == "req-1"
+
+
+def test_middleware__generates_request_id():
+    response = make_client().get("/request-id")
+
+    request_id = response.json()["request_id"]
+    assert request_id and response.headers["x-request-id"] == request_id
+    assert get_request_id() is None
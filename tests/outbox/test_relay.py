@@ -0,0 +1,110 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.applications import ApplicationCreateSchema, ApplicationModel
+from app.applications.repository import ApplicationRepository
+from app.broker.events import TopicRouter
+from app.monitoring.tracing import request_id_var
+from app.outbox import OutboxModel, OutboxRelay, OutboxRepository
+
+
+async def _create_application(db_session: AsyncSession) -> ApplicationModel:
+    repository = ApplicationRepository(
+        db_session, outbox=OutboxRepository(TopicRouter(default="applications")))
+    return await repository.create_application(
+        ApplicationCreateSchema(title="outbox", description=None), uuid.uuid4()
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_application__writes_outbox_event(db_session: AsyncSession):
+    application = await _create_application(db_session)
+
+    events = (await db_session.execute(select(OutboxModel))).scalars().all()
+
+    assert len(events) == 1
+    assert events[0].key == str(application.user_id)
+    assert events[0].payload["type"] == "application.created"
+    assert events[0].payload["title"] == "outbox"
+    assert events[0].sent_at is None
+
+
+@pytest.mark.asyncio
+async def test_relay_batch__publishes_and_marks_sent(db_session: AsyncSession):
+    await _create_application(db_session)
+    await _create_application(db_session)
+
+    async def produce(**kwargs):
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_result(None)
+        return delivery
+
+    producer = AsyncMock()
+    producer.produce.side_effect = produce
+    relay = OutboxRelay(
+        async_sessionmaker(bind=db_session.bind, expire_on_commit=False),
+        producer,
+        batch_size=10,
+    )
+
+    assert await relay.relay_batch() == 2
+    assert producer.produce.await_count == 2
+    assert await relay.relay_batch() == 0
+
+
+@pytest.mark.asyncio
+async def test_relay_batch__keeps_events_on_failed_delivery(db_session: AsyncSession):
+    await _create_application(db_session)
+
+    async def produce(**kwargs):
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_exception(RuntimeError("broker down"))
+        return delivery
+
+    producer = AsyncMock()
+    producer.produce.side_effect = produce
+    relay = OutboxRelay(
+        async_sessionmaker(
+            bind=db_session.bind,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        ),
+        producer,
+    )
+
+    with pytest.raises(RuntimeError):
+        await relay.relay_batch()
+
+    events = (await db_session.execute(select(OutboxModel))).scalars().all()
+    assert [event.sent_at for event in events] == [None]
+
+
+@pytest.mark.asyncio
+async def test_relay_batch__forwards_request_id_and_write_time(db_session: AsyncSession):
+    token = request_id_var.set("req-1")
+    try:
+        await _create_application(db_session)
+    finally:
+        request_id_var.reset(token)
+
+    async def produce(**kwargs):
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_result(None)
+        return delivery
+
+    producer = AsyncMock()
+    producer.produce.side_effect = produce
+    relay = OutboxRelay(async_sessionmaker(bind=db_session.bind, expire_on_commit=False), producer)
+
+    await relay.relay_batch()
+
+    event = (await db_session.execute(select(OutboxModel))).scalars().one()
+    kwargs = producer.produce.await_args.kwargs
+    assert kwargs["request_id"] == "req-1"
+    assert kwargs["produced_at"] == event.created_at
+    assert dict(kwargs["headers"])["event-type"] == b"application.created"
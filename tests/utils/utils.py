@@ -1,8 +1,55 @@
 import random
 import string
+from contextlib import contextmanager
+from typing import Any, Callable
+from unittest.mock import AsyncMock
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.cache import TagsBuilder, cached
 
 kafka_error_detail = "Failed to send message, break..."
 
 
 def random_lower_string() -> str:
     return "".join(random.choices(string.ascii_lowercase, k=16))
+
+
+@contextmanager
+def count_statements(session: AsyncSession):
+    """Collects the SQL statements `session` sends to the database inside the block."""
+    statements = []
+    engine = session.bind.sync_engine
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def cached_repository(
+    namespace: str,
+    tags: TagsBuilder | None = None,
+    near: bool = False,
+    load: Callable[[str], Any] = lambda key: {"key": key},
+) -> type:
+    """A stub repository whose `get(key)` is `@cached` with these options and counts its loads."""
+
+    class Repository:
+        def __init__(self, db_session=None):
+            self.db_session = db_session
+            self.load = AsyncMock(side_effect=load)
+
+        async def get(self, key: str):
+            return await self.load(key)
+
+    # cache keys and metric prefixes are built from the qualified name
+    Repository.__qualname__ = "Repository"
+    Repository.get.__qualname__ = "Repository.get"
+    Repository.get = cached(expire=60, namespace=namespace, tags=tags, near=near)(Repository.get)
+    return Repository